@@ -6,6 +6,11 @@
   const PROFILE_IMAGE_DIR = "./assets/profile_image/";
   const PROFILE_IMAGE_LIST = "./assets/profile_image/profile_image.json";
 
+  // One static file per user, written by scripts/build_pick_history.py
+  // after each grading run and sharded by the first characters of the id.
+  const HISTORY_DIR = "./data/history/";
+  const HISTORY_SHARD_LENGTH = 2;
+
   const state = {
     session: null,
     profile: null,
@@ -111,6 +116,7 @@
   function showSignedOut() {
     setHidden(byId("signedOutSection"), false);
     setHidden(byId("profileSection"), true);
+    setHidden(byId("historySection"), true);
     setHidden(byId("emailSection"), true);
     setHidden(byId("passwordSection"), true);
     setHidden(byId("accountSection"), true);
@@ -119,6 +125,7 @@
   function showSignedIn() {
     setHidden(byId("signedOutSection"), true);
     setHidden(byId("profileSection"), false);
+    setHidden(byId("historySection"), false);
     setHidden(byId("emailSection"), false);
     setHidden(byId("passwordSection"), false);
     setHidden(byId("accountSection"), false);
@@ -237,6 +244,109 @@
     );
   }
 
+  function formatRecord(values) {
+    const [wins, losses, pushes] = values || [0, 0, 0];
+    return `${wins}-${losses}-${pushes}`;
+  }
+
+  function formatLine(value) {
+    if (value === null || value === undefined) {
+      return "";
+    }
+
+    return value > 0 ? `+${value}` : String(value);
+  }
+
+  function renderHistory(history) {
+    const container = byId("historyTable");
+
+    if (!container) {
+      return;
+    }
+
+    container.replaceChildren();
+
+    if (!history || !history.picks.length) {
+      setText(byId("historyRecord"), "No graded picks yet.");
+      return;
+    }
+
+    setText(
+      byId("historyRecord"),
+      `Spread ${formatRecord(history.record.spread)} · ` +
+        `Total ${formatRecord(history.record.total)}`
+    );
+
+    const column = Object.fromEntries(
+      history.columns.map((name, index) => [name, index])
+    );
+
+    const table = document.createElement("table");
+    const head = document.createElement("thead");
+    const headRow = document.createElement("tr");
+
+    for (const label of ["Week", "Game", "Score", "Spread", "Total"]) {
+      const th = document.createElement("th");
+      th.textContent = label;
+      headRow.appendChild(th);
+    }
+
+    head.appendChild(headRow);
+    table.appendChild(head);
+
+    const body = document.createElement("tbody");
+
+    // Newest first.
+    for (const row of history.picks.slice().reverse()) {
+      const spreadSide = row[column.spread_pick];
+      const spreadTeam =
+        spreadSide === "home" ? row[column.home_team] : row[column.away_team];
+      const spreadLine =
+        spreadSide === "home"
+          ? row[column.spread_home]
+          : -row[column.spread_home];
+
+      const cells = [
+        `${row[column.season]} wk ${row[column.week]}`,
+        `${row[column.away_team]} @ ${row[column.home_team]}`,
+        `${row[column.away_score] ?? ""}-${row[column.home_score] ?? ""}`,
+        `${spreadTeam} ${formatLine(spreadLine)} ${row[column.spread_result] || ""}`,
+        `${row[column.total_pick]} ${row[column.total]} ${row[column.total_result] || ""}`
+      ];
+
+      const tr = document.createElement("tr");
+
+      for (const value of cells) {
+        const td = document.createElement("td");
+        td.textContent = value.trim();
+        tr.appendChild(td);
+      }
+
+      body.appendChild(tr);
+    }
+
+    table.appendChild(body);
+    container.appendChild(table);
+  }
+
+  async function loadHistory(userId) {
+    const shard = userId.slice(0, HISTORY_SHARD_LENGTH);
+
+    try {
+      const response = await fetch(`${HISTORY_DIR}${shard}/${userId}.json`, {
+        cache: "no-cache"
+      });
+
+      // No file until the user has a graded pick.
+      renderHistory(response.ok ? await response.json() : null);
+    } catch (error) {
+      setText(
+        byId("historyRecord"),
+        `Could not load your pick history: ${error.message}`
+      );
+    }
+  }
+
   async function loadPage() {
     const { data, error } = await client.auth.getSession();
 
@@ -279,6 +389,7 @@
     pageMessage("");
     fillForm();
     showSignedIn();
+    await loadHistory(state.session.user.id);
   }
 
   bindClick("goToSignInBtn", () => {
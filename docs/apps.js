@@ -466,7 +466,7 @@
       error
     } = await client
       .from("games")
-      .select("id, game_id, kickoff_utc")
+      .select("id, game_id, kickoff_utc, season")
       .in("game_id", csvGameIds);
 
     if (error) {
@@ -1489,6 +1489,9 @@
             game_id:
               gameId,
 
+            season:
+              scheduleGame.game.season,
+
             spread_pick:
               draft.spread,
 
@@ -0,0 +1,70 @@
+"use strict";
+
+// Resolves files under ./data through ./data/manifest.json (written by
+// scripts/publish_data.py). The manifest is revalidated on every page
+// load; the content-hashed file it points at never changes, so the
+// browser may reuse a cached copy. Where DecompressionStream exists the
+// gzip copy is fetched and inflated here, since GitHub Pages serves it
+// as is; otherwise, or if that fails, the uncompressed hashed file.
+// Files the manifest does not list are fetched from their plain path
+// with revalidation.
+(() => {
+  const DATA_ROOT = "./data/";
+  let manifest = null;
+
+  function loadManifest() {
+    if (!manifest) {
+      manifest = fetch(`${DATA_ROOT}manifest.json`, { cache: "no-cache" })
+        .then((response) => (response.ok ? response.json() : {}))
+        .then((data) => data.files || {})
+        .catch(() => ({}));
+    }
+
+    return manifest;
+  }
+
+  async function fetchGzip(path) {
+    const response = await fetch(DATA_ROOT + path).catch(() => null);
+
+    if (!response || !response.ok || !response.body) {
+      return null;
+    }
+
+    try {
+      // Inflated in full before returning, so a corrupt copy falls back
+      // instead of failing halfway through the caller's read.
+      const inflated = await new Response(
+        response.body.pipeThrough(new DecompressionStream("gzip"))
+      ).arrayBuffer();
+
+      return new Response(inflated);
+    } catch {
+      return null;
+    }
+  }
+
+  async function fetchData(name) {
+    const files = await loadManifest();
+    const entry = files[name];
+
+    if (entry) {
+      if (entry.gzip && typeof DecompressionStream === "function") {
+        const inflated = await fetchGzip(entry.gzip);
+
+        if (inflated) {
+          return inflated;
+        }
+      }
+
+      const response = await fetch(DATA_ROOT + entry.path).catch(() => null);
+
+      if (response && response.ok) {
+        return response;
+      }
+    }
+
+    return fetch(DATA_ROOT + name, { cache: "no-cache" });
+  }
+
+  window.fetchData = fetchData;
+})();
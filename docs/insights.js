@@ -17,9 +17,19 @@
     fade: document.getElementById("fadeByTeam"),
     homeAway: document.getElementById("homeAway"),
     totalsTeam: document.getElementById("totalsByTeam"),
-    totalsAll: document.getElementById("totalsOverall")
+    totalsAll: document.getElementById("totalsOverall"),
+    market: document.getElementById("marketByTeam")
   };
 
+  const MARKET_COLUMNS = [
+    ["ats", "ATS"],
+    ["home_ats", "Home"],
+    ["away_ats", "Away"],
+    ["fav_ats", "Fav"],
+    ["dog_ats", "Dog"],
+    ["ou", "O/U/P"]
+  ];
+
   const state = {
     season: null,
     games: [],
@@ -32,7 +42,8 @@
     scope: "season",
     chosenWeek: null,
     team: "",
-    user: "all"
+    user: "all",
+    market: new Map()
   };
 
   function assertReady() {
@@ -51,6 +62,7 @@
     if (!boxes.homeAway) missing.push("#homeAway");
     if (!boxes.totalsTeam) missing.push("#totalsByTeam");
     if (!boxes.totalsAll) missing.push("#totalsOverall");
+    if (!boxes.market) missing.push("#marketByTeam");
 
     if (missing.length) {
       throw new Error("Missing required page elements: " + missing.join(", "));
@@ -104,27 +116,37 @@
   }
 
   async function loadData() {
-    const gamesResponse = await client
+    // Only the latest season is read, so picks and scores come from one
+    // season partition however many seasons are stored.
+    const latestResponse = await client
       .from("games")
-      .select("id, season, week, home_team, away_team");
+      .select("season")
+      .order("season", { ascending: false })
+      .limit(1);
 
-    if (gamesResponse.error) {
-      throw gamesResponse.error;
+    if (latestResponse.error) {
+      throw latestResponse.error;
     }
 
-    const allGames = gamesResponse.data || [];
+    const latest = latestResponse.data || [];
 
-    if (!allGames.length) {
+    if (!latest.length) {
       state.season = null;
       return;
     }
 
-    state.season = allGames.reduce(
-      (highest, game) => (game.season > highest ? game.season : highest),
-      allGames[0].season
-    );
+    state.season = latest[0].season;
 
-    state.games = allGames.filter((game) => game.season === state.season);
+    const gamesResponse = await client
+      .from("games")
+      .select("id, season, week, home_team, away_team")
+      .eq("season", state.season);
+
+    if (gamesResponse.error) {
+      throw gamesResponse.error;
+    }
+
+    state.games = gamesResponse.data || [];
     state.gamesById = new Map(state.games.map((game) => [game.id, game]));
 
     const gameIds = state.games.map((game) => game.id);
@@ -132,6 +154,7 @@
     const scoresResponse = await client
       .from("scores")
       .select("game_id")
+      .eq("season", state.season)
       .in("game_id", gameIds);
 
     if (scoresResponse.error) {
@@ -189,6 +212,7 @@
     const picksResponse = await client
       .from("picks")
       .select("user_id, game_id, spread_pick, total_pick, spread_result, total_result")
+      .eq("season", state.season)
       .in("game_id", gameIds);
 
     if (picksResponse.error) {
@@ -474,6 +498,98 @@
     );
   }
 
+  function marketPath() {
+    if (state.scope === "season") {
+      return "insights/" + state.season + ".json";
+    }
+
+    const week = weeksInScope()[0];
+
+    if (week === undefined) {
+      return null;
+    }
+
+    return (
+      "insights/weeks/" +
+      state.season +
+      "_wk" +
+      String(week).padStart(2, "0") +
+      ".json"
+    );
+  }
+
+  async function loadMarket(path) {
+    if (!state.market.has(path)) {
+      state.market.set(
+        path,
+        window.fetchData(path).then((response) =>
+          response.ok ? response.json() : null
+        )
+      );
+    }
+
+    return state.market.get(path);
+  }
+
+  function formatSplit(values) {
+    return values ? values.join("-") : "—";
+  }
+
+  async function renderMarket() {
+    const path = marketPath();
+    const data = path ? await loadMarket(path).catch(() => null) : null;
+
+    if (path !== marketPath()) {
+      return;
+    }
+
+    if (!data) {
+      boxes.market.replaceChildren(
+        createElement("div", "lb-message", "Nothing to show.")
+      );
+      return;
+    }
+
+    const rows = Object.keys(data.teams)
+      .filter((team) => !state.team || team === state.team)
+      .sort((a, b) => a.localeCompare(b))
+      .map((team) => [team, data.teams[team]]);
+
+    if (!state.team) {
+      rows.push(["All Teams", data.league]);
+    }
+
+    const table = createElement("table");
+    const head = createElement("thead");
+    const headRow = createElement("tr");
+
+    headRow.appendChild(createElement("th", "", "Team"));
+
+    for (const [, label] of MARKET_COLUMNS) {
+      headRow.appendChild(createElement("th", "", label));
+    }
+
+    head.appendChild(headRow);
+
+    const body = createElement("tbody");
+
+    for (const [label, splits] of rows) {
+      const line = createElement("tr");
+
+      line.appendChild(createElement("td", "", label));
+
+      for (const [key] of MARKET_COLUMNS) {
+        line.appendChild(createElement("td", "", formatSplit(splits[key])));
+      }
+
+      body.appendChild(line);
+    }
+
+    table.append(head, body);
+
+    boxes.market.replaceChildren(table);
+  }
+
   function renderControls() {
     for (const button of [seasonButton, lastWeekButton, weekButton]) {
       button.classList.remove("primary");
@@ -570,6 +686,7 @@
     messageBox.textContent = "";
 
     renderTables();
+    renderMarket();
   }
 
   function attachEvents() {
@@ -58,17 +58,21 @@
   }
 
   async function loadData() {
-    const gamesResponse = await client
+    // Only the latest season is read, so picks and scores come from one
+    // season partition however many seasons are stored.
+    const latestResponse = await client
       .from("games")
-      .select("id, season, week");
+      .select("season")
+      .order("season", { ascending: false })
+      .limit(1);
 
-    if (gamesResponse.error) {
-      throw gamesResponse.error;
+    if (latestResponse.error) {
+      throw latestResponse.error;
     }
 
-    const allGames = gamesResponse.data || [];
+    const latest = latestResponse.data || [];
 
-    if (!allGames.length) {
+    if (!latest.length) {
       state.season = null;
       state.games = [];
       state.completedWeeks = [];
@@ -77,18 +81,25 @@
       return;
     }
 
-    state.season = allGames.reduce(
-      (highest, game) => (game.season > highest ? game.season : highest),
-      allGames[0].season
-    );
+    state.season = latest[0].season;
+
+    const gamesResponse = await client
+      .from("games")
+      .select("id, season, week")
+      .eq("season", state.season);
+
+    if (gamesResponse.error) {
+      throw gamesResponse.error;
+    }
 
-    state.games = allGames.filter((game) => game.season === state.season);
+    state.games = gamesResponse.data || [];
 
     const gameIds = state.games.map((game) => game.id);
 
     const scoresResponse = await client
       .from("scores")
       .select("game_id")
+      .eq("season", state.season)
       .in("game_id", gameIds);
 
     if (scoresResponse.error) {
@@ -131,6 +142,7 @@
     const picksResponse = await client
       .from("picks")
       .select("user_id, game_id, spread_result, total_result")
+      .eq("season", state.season)
       .in("game_id", gameIds);
 
     if (picksResponse.error) {
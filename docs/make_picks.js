@@ -2,7 +2,7 @@
 
 (() => {
   const client = window.supabaseClient;
-  const CSV_URL = "./data/weekly/latest.csv";
+  const CSV_NAME = "weekly/latest.csv";
 
   const REQUIRED_HEADERS = [
     "season",
@@ -245,12 +245,10 @@
   }
 
   async function loadSchedule() {
-    const response = await fetch(`${CSV_URL}?v=${Date.now()}`, {
-      cache: "no-store"
-    });
+    const response = await window.fetchData(CSV_NAME);
 
     if (!response.ok) {
-      throw new Error(`Could not load ${CSV_URL}: HTTP ${response.status}`);
+      throw new Error(`Could not load ${CSV_NAME}: HTTP ${response.status}`);
     }
 
     const text = await response.text();
@@ -265,7 +263,7 @@
 
     const { data, error } = await client
       .from("games")
-      .select("id, game_id, kickoff_utc")
+      .select("id, game_id, kickoff_utc, season")
       .in("game_id", csvGameIds);
 
     if (error) {
@@ -735,6 +733,7 @@
         upserts.push({
           user_id: state.session.user.id,
           game_id: gameId,
+          season: scheduleGame.game.season,
           spread_pick: draft.spread,
           total_pick: draft.total
         });
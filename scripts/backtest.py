@@ -0,0 +1,440 @@
+#!/usr/bin/env python3
+# scripts/backtest.py
+
+"""Backtest declarative pick strategies over the odds and scores archive.
+
+A strategy is a small JSON object:
+
+    {
+        "name": "under when model is 3 below",
+        "market": "total",
+        "pick": "under",
+        "when": [["total_edge", "<=", -3]]
+    }
+
+market is "spread" or "total"; pick is home, away, favorite or
+underdog for spreads and over or under for totals. Each "when" entry
+compares a column with a number using <, <=, >, >=, == or !=. Columns
+are the numeric odds CSV columns plus everything market_analytics.py
+derives (spread_edge, total_edge, prob_edge, spread_move, ...). A list
+in place of the number makes a parameter grid: the strategy is expanded
+into one strategy per combination.
+
+Each season is loaded once into columns from the consensus rows of
+docs/data/weekly/*_odds.csv and docs/data/scores/*_scores.csv, and the
+home-cover and over results are graded once per game with grade_spread /
+grade_total. The columns are NumPy arrays and every strategy still to
+evaluate is one row of a strategies x games mask, built a condition at
+a time with array comparisons; wins, losses and units are masked sums
+over that mask, so a grid of hundreds of strategies costs a handful of
+array passes in all. Results are cached
+in .cache/backtest per (strategy, season) and keyed by the hash of the
+season's CSVs, so a rerun only evaluates what changed.
+
+    python scripts/backtest.py strategies.json --season 2026 --out out.json
+"""
+
+import argparse
+import csv
+import hashlib
+import itertools
+import json
+import operator
+import os
+import re
+import time
+from pathlib import Path
+
+import numpy
+
+from grade_picks import grade_spread, grade_total
+from market_analytics import TEXT_COLUMNS, derive, files_hash, load_columns
+
+
+ODDS_DIR = Path("docs/data/weekly")
+SCORES_DIR = Path("docs/data/scores")
+CACHE_DIR = Path(os.environ.get("BACKTEST_CACHE_DIR", ".cache/backtest"))
+
+WEEK_FILE_RE = re.compile(r"^(?P<season>\d{4})_wk\d{2}_(odds|scores)\.csv$")
+
+OPERATORS = {
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "==": operator.eq,
+    "!=": operator.ne,
+}
+
+PICKS = {
+    "spread": ("home", "away", "favorite", "underdog"),
+    "total": ("over", "under"),
+}
+
+# Graded results as numbers: +1 win, -1 loss, 0 push, for the home side
+# of the spread and the over of the total.
+RESULT_VALUE = {"W": 1, "L": -1, "P": 0}
+
+PRICE_COLUMNS = {
+    "home": "spread_home_odds",
+    "away": "spread_away_odds",
+    "over": "total_odds_over",
+    "under": "total_odds_under",
+}
+
+DEFAULT_PRICE = -110.0
+
+# Outcomes, not inputs: a strategy may not condition on them.
+RESULT_COLUMNS = ("home_cover", "over_result")
+
+
+def expand_grid(strategy: dict) -> list[dict]:
+    """One strategy per combination of the list values in "when"."""
+    conditions = strategy.get("when", [])
+    choices = [
+        value if isinstance(value, list) else [value]
+        for _, _, value in conditions
+    ]
+    expanded = []
+
+    for values in itertools.product(*choices):
+        when = [
+            [column, op, value]
+            for (column, op, _), value in zip(conditions, values)
+        ]
+        name = strategy.get("name") or strategy["pick"]
+
+        if any(len(choice) > 1 for choice in choices):
+            name += " [" + ", ".join(
+                f"{column} {op} {value}" for column, op, value in when
+            ) + "]"
+
+        expanded.append({**strategy, "name": name, "when": when})
+
+    return expanded
+
+
+def validate_strategy(strategy: dict, columns: dict) -> None:
+    market = strategy.get("market")
+
+    if market not in PICKS:
+        raise ValueError(f"{strategy.get('name')}: unknown market {market!r}")
+
+    if strategy.get("pick") not in PICKS[market]:
+        raise ValueError(
+            f"{strategy.get('name')}: pick must be one of {PICKS[market]}"
+        )
+
+    for column, op, value in strategy.get("when", []):
+        if (
+            column not in columns
+            or column in TEXT_COLUMNS
+            or column in RESULT_COLUMNS
+        ):
+            raise ValueError(
+                f"{strategy.get('name')}: unknown numeric column {column!r}"
+            )
+        if op not in OPERATORS:
+            raise ValueError(
+                f"{strategy.get('name')}: unknown operator {op!r}"
+            )
+        if not isinstance(value, (int, float)):
+            raise ValueError(
+                f"{strategy.get('name')}: {value!r} is not a number"
+            )
+
+
+def season_files(directory: Path, kind: str) -> dict:
+    seasons = {}
+
+    for path in sorted(directory.glob(f"*_{kind}.csv")):
+        match = WEEK_FILE_RE.fullmatch(path.name)
+        if match:
+            seasons.setdefault(int(match.group("season")), []).append(path)
+
+    return seasons
+
+
+def load_scores(paths: list[Path]) -> dict:
+    scores = {}
+
+    for path in paths:
+        with path.open("r", encoding="utf-8", newline="") as file:
+            for row in csv.DictReader(file):
+                try:
+                    scores[row["game_id"]] = (
+                        float(row["away_score"]),
+                        float(row["home_score"]),
+                    )
+                except (KeyError, TypeError, ValueError):
+                    continue
+
+    return scores
+
+
+def load_season(odds_paths: list[Path], score_paths: list[Path]) -> dict:
+    """Graded consensus rows of one season, as columns."""
+    columns = derive(load_columns(odds_paths))
+    scores = load_scores(score_paths)
+
+    keep = (
+        (columns["is_consensus"] == "1")
+        & numpy.isin(columns["game_id"], list(scores))
+        & ~numpy.isnan(columns["spread_home"])
+        & ~numpy.isnan(columns["total"])
+    )
+    season = {name: values[keep] for name, values in columns.items()}
+
+    home_cover = []
+    over = []
+
+    for game_id, spread_home, total_line in zip(
+        season["game_id"].tolist(),
+        season["spread_home"].tolist(),
+        season["total"].tolist(),
+    ):
+        away, home = scores[game_id]
+        home_cover.append(
+            RESULT_VALUE[grade_spread("home", spread_home, away, home)]
+        )
+        over.append(RESULT_VALUE[grade_total("over", total_line, away, home)])
+
+    season["home_cover"] = numpy.array(home_cover, dtype=numpy.int8)
+    season["over_result"] = numpy.array(over, dtype=numpy.int8)
+
+    return season
+
+
+def payout(prices: numpy.ndarray) -> numpy.ndarray:
+    """Units won on a one-unit stake at American prices."""
+    prices = numpy.where(
+        numpy.isnan(prices) | (prices == 0), DEFAULT_PRICE, prices
+    )
+    return numpy.where(prices < 0, 100 / -prices, prices / 100)
+
+
+def pick_outcomes(season: dict) -> dict:
+    """Per pick: the result of every game for that side, the payout of a
+    win, and whether the pick has a side at all (a pick'em spread has no
+    favorite or underdog)."""
+    home_cover = season["home_cover"]
+    over = season["over_result"]
+    spread = season["spread_home"]
+    home_payout = payout(season[PRICE_COLUMNS["home"]])
+    away_payout = payout(season[PRICE_COLUMNS["away"]])
+    every_game = numpy.ones(spread.shape, dtype=bool)
+    outcomes = {
+        "home": (home_cover, home_payout, every_game),
+        "away": (-home_cover, away_payout, every_game),
+        "over": (over, payout(season[PRICE_COLUMNS["over"]]), every_game),
+        "under": (-over, payout(season[PRICE_COLUMNS["under"]]), every_game),
+    }
+
+    for pick, home_side in (("favorite", spread < 0), ("underdog", spread > 0)):
+        outcomes[pick] = (
+            numpy.where(home_side, home_cover, -home_cover),
+            numpy.where(home_side, home_payout, away_payout),
+            spread != 0,
+        )
+
+    return outcomes
+
+
+def strategy_mask(strategies: list[dict], season: dict) -> numpy.ndarray:
+    """strategies x games: True where a game meets every condition.
+
+    Conditions are applied by position, and at each position the
+    strategies comparing the same column with the same operator are
+    compared at once, their values as a column against the games as a
+    row. A missing (NaN) cell never meets a condition."""
+    mask = numpy.ones(
+        (len(strategies), len(season["game_id"])), dtype=bool
+    )
+    depth = max((len(s.get("when", [])) for s in strategies), default=0)
+
+    for position in range(depth):
+        groups = {}
+
+        for row, strategy in enumerate(strategies):
+            when = strategy.get("when", [])
+            if position < len(when):
+                column, op, value = when[position]
+                rows, values = groups.setdefault((column, op), ([], []))
+                rows.append(row)
+                values.append(value)
+
+        for (column, op), (rows, values) in groups.items():
+            cells = season[column]
+            met = OPERATORS[op](
+                cells[numpy.newaxis, :],
+                numpy.array(values, dtype=numpy.float64)[:, numpy.newaxis],
+            )
+            mask[rows] &= met & ~numpy.isnan(cells)
+
+    return mask
+
+
+def evaluate(strategies: list[dict], season: dict) -> list[dict]:
+    """Results of every strategy, in order, over one season."""
+    mask = strategy_mask(strategies, season)
+    outcomes = pick_outcomes(season)
+    results = [None] * len(strategies)
+    by_pick = {}
+
+    for row, strategy in enumerate(strategies):
+        by_pick.setdefault(strategy["pick"], []).append(row)
+
+    for pick, rows in by_pick.items():
+        result, won, has_side = outcomes[pick]
+        picked = mask[rows] & has_side
+        win = picked & (result > 0)
+        loss = picked & (result < 0)
+        wins = win.sum(axis=1)
+        losses = loss.sum(axis=1)
+        pushes = (picked & (result == 0)).sum(axis=1)
+        units = numpy.where(win, won, 0.0).sum(axis=1) - losses
+
+        for index, row in enumerate(rows):
+            decided = int(wins[index] + losses[index])
+            results[row] = {
+                "picks": decided + int(pushes[index]),
+                "wins": int(wins[index]),
+                "losses": int(losses[index]),
+                "pushes": int(pushes[index]),
+                "win_pct": (
+                    round(int(wins[index]) / decided, 4) if decided else None
+                ),
+                "units": round(float(units[index]), 2),
+            }
+
+    return results
+
+
+def strategy_key(strategy: dict) -> str:
+    return hashlib.sha256(
+        json.dumps(strategy, sort_keys=True, separators=(",", ":")).encode(
+            "utf-8"
+        )
+    ).hexdigest()
+
+
+def read_cache(path: Path, data_hash: str) -> dict:
+    if not path.exists():
+        return {}
+
+    try:
+        cached = json.loads(path.read_text(encoding="utf-8"))
+    except json.JSONDecodeError:
+        return {}
+
+    if cached.get("hash") != data_hash:
+        return {}
+
+    return cached.get("results", {})
+
+
+def run(
+    strategies: list[dict],
+    odds_dir: Path,
+    scores_dir: Path,
+    seasons: list[int] | None,
+    cache_dir: Path = CACHE_DIR,
+) -> list[dict]:
+    odds_files = season_files(odds_dir, "odds")
+    score_files = season_files(scores_dir, "scores")
+    results = []
+
+    for season in sorted(seasons or odds_files):
+        odds_paths = odds_files.get(season, [])
+        score_paths = score_files.get(season, [])
+
+        if not odds_paths or not score_paths:
+            continue
+
+        data_hash = files_hash(odds_paths + score_paths)
+        cache_path = cache_dir / f"{season}.json"
+        cached = read_cache(cache_path, data_hash)
+        keys = [strategy_key(strategy) for strategy in strategies]
+        missing = {}
+
+        for key, strategy in zip(keys, strategies):
+            if key not in cached:
+                missing.setdefault(key, strategy)
+
+        if missing:
+            columns = load_season(odds_paths, score_paths)
+            for strategy in missing.values():
+                validate_strategy(strategy, columns)
+            cached.update(
+                zip(missing, evaluate(list(missing.values()), columns))
+            )
+
+        for key, strategy in zip(keys, strategies):
+            results.append(
+                {"season": season, "strategy": strategy["name"], **cached[key]}
+            )
+
+        if missing:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            cache_path.write_text(
+                json.dumps(
+                    {"hash": data_hash, "results": cached},
+                    separators=(",", ":"),
+                ),
+                encoding="utf-8",
+            )
+
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("strategies", help="JSON file: a strategy or a list")
+    parser.add_argument("--season", type=int, action="append")
+    parser.add_argument("--odds-dir", default=str(ODDS_DIR))
+    parser.add_argument("--scores-dir", default=str(SCORES_DIR))
+    parser.add_argument("--out")
+    args = parser.parse_args()
+
+    loaded = json.loads(Path(args.strategies).read_text(encoding="utf-8"))
+    if isinstance(loaded, dict):
+        loaded = [loaded]
+
+    strategies = [
+        expanded for strategy in loaded for expanded in expand_grid(strategy)
+    ]
+
+    started = time.perf_counter()
+    results = run(
+        strategies,
+        Path(args.odds_dir),
+        Path(args.scores_dir),
+        args.season,
+    )
+    elapsed = time.perf_counter() - started
+
+    for result in results:
+        win_pct = (
+            "—" if result["win_pct"] is None else f"{result['win_pct']:.1%}"
+        )
+        print(
+            f"{result['season']}  {result['strategy']:<60} "
+            f"{result['wins']}-{result['losses']}-{result['pushes']:<4} "
+            f"{win_pct:>6}  {result['units']:+.2f}u"
+        )
+
+    print(
+        f"BACKTESTED {len(strategies)} strategies, {len(results)} results "
+        f"in {elapsed:.3f}s"
+    )
+
+    if args.out:
+        Path(args.out).write_text(
+            json.dumps(results, indent=2),
+            encoding="utf-8",
+        )
+        print(f"WROTE {args.out}")
+
+
+if __name__ == "__main__":
+    main()
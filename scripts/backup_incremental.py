@@ -0,0 +1,441 @@
+#!/usr/bin/env python3
+# scripts/backup_incremental.py
+
+"""Incremental, watermark-based backup of Supabase tables.
+
+Three commands share one backup directory:
+
+    export   write the rows changed since the last watermark to a new
+             delta file and advance the watermark
+    compact  fold every delta into snapshot.jsonl and remove the deltas
+    restore  replay snapshot.jsonl and then every delta, in order, into
+             Supabase with an upsert on the primary key
+
+Each line of a delta or snapshot file is one compact JSON object:
+
+    {"table":"games","row":{...}}
+
+Deletes are not visible through updated_at, so a periodic full export
+(export --full followed by compact) is still needed to drop them. A full
+export's delta is named delta_<stamp>_full-<table>-<table>.jsonl; when
+folding, it replaces everything earlier for the tables it names, so a
+row missing from it is dropped from the snapshot.
+
+export and restore require two environment variables:
+    SUPABASE_URL
+    SUPABASE_SERVICE_ROLE_KEY
+"""
+
+import argparse
+import json
+import os
+import urllib.error
+import urllib.parse
+import urllib.request
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+
+BACKUP_DIR = Path("docs/supabase/backup/incremental")
+
+WATERMARK_FILE = "watermark.json"
+SNAPSHOT_FILE = "snapshot.jsonl"
+DELTA_GLOB = "delta_*.jsonl"
+FULL_MARKER = "_full-"
+
+# Tables in restore order. Each entry names the change-tracking column
+# and the column used when that one is null (picks.updated_at is
+# nullable).
+TABLES = {
+    "games": ("updated_at", "created_at"),
+    "scores": ("updated_at", "created_at"),
+    "picks": ("updated_at", "created_at"),
+}
+
+# Restores upsert on id until season is backfilled on every row; they
+# move to (id, season) for picks and scores before the partition swap
+# (step 3 of the season_partitions migration).
+CONFLICT_COLUMNS = {
+    "games": "id",
+    "scores": "id",
+    "picks": "id",
+}
+
+# picks are excluded from the public backup, so they may only be
+# exported outside docs/.
+PUBLIC_TABLES = ("games", "scores")
+
+PAGE_SIZE = 1000
+
+# Rows committed slightly out of timestamp order are picked up by
+# re-reading this much history on every run. Replays are idempotent.
+WATERMARK_OVERLAP = timedelta(seconds=60)
+
+RESTORE_BATCH_SIZE = 500
+
+
+def require_environment(name: str) -> str:
+    value = os.environ.get(name, "").strip()
+
+    if not value:
+        raise ValueError(f"Missing environment variable: {name}")
+
+    return value
+
+
+def request_supabase(
+    method: str,
+    path: str,
+    payload=None,
+    prefer: str | None = None,
+):
+    supabase_url = require_environment("SUPABASE_URL").rstrip("/")
+    service_role_key = require_environment("SUPABASE_SERVICE_ROLE_KEY")
+
+    headers = {
+        "apikey": service_role_key,
+        "Authorization": f"Bearer {service_role_key}",
+        "Accept": "application/json",
+    }
+
+    data = None
+
+    if payload is not None:
+        headers["Content-Type"] = "application/json"
+        data = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+
+    if prefer:
+        headers["Prefer"] = prefer
+
+    request = urllib.request.Request(
+        url=f"{supabase_url}{path}",
+        data=data,
+        headers=headers,
+        method=method,
+    )
+
+    try:
+        with urllib.request.urlopen(request, timeout=60) as response:
+            response_text = response.read().decode("utf-8").strip()
+    except urllib.error.HTTPError as error:
+        error_text = error.read().decode("utf-8", errors="replace")
+        raise RuntimeError(
+            f"Supabase request failed: {error.code} {error.reason}\n"
+            f"{error_text}"
+        ) from error
+
+    if not response_text:
+        return None
+
+    return json.loads(response_text)
+
+
+def parse_timestamp(value: str) -> datetime:
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+    if parsed.utcoffset() is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+
+    return parsed.astimezone(timezone.utc)
+
+
+def format_timestamp(value: datetime) -> str:
+    return value.astimezone(timezone.utc).isoformat(timespec="microseconds")
+
+
+def row_changed_at(row: dict, table: str) -> str | None:
+    changed_column, fallback_column = TABLES[table]
+    return row.get(changed_column) or row.get(fallback_column)
+
+
+def fetch_changed_rows(table: str, since: datetime | None) -> list[dict]:
+    """Read every row of table changed at or after since, oldest first."""
+    changed_column, fallback_column = TABLES[table]
+
+    params = {
+        "select": "*",
+        "order": f"{changed_column}.asc.nullsfirst,{fallback_column}.asc,id.asc",
+    }
+
+    if since is not None:
+        stamp = format_timestamp(since)
+        params["or"] = (
+            f"({changed_column}.gte.{stamp},"
+            f"and({changed_column}.is.null,{fallback_column}.gte.{stamp}))"
+        )
+
+    rows = []
+    offset = 0
+
+    while True:
+        query = urllib.parse.urlencode(
+            {
+                **params,
+                "offset": str(offset),
+                "limit": str(PAGE_SIZE),
+            },
+            safe=",.*()-:",
+        )
+
+        batch = request_supabase("GET", f"/rest/v1/{table}?{query}") or []
+        rows.extend(batch)
+
+        if len(batch) < PAGE_SIZE:
+            return rows
+
+        offset += PAGE_SIZE
+
+
+def read_watermarks(backup_dir: Path) -> dict[str, str]:
+    path = backup_dir / WATERMARK_FILE
+
+    if not path.exists():
+        return {}
+
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def write_watermarks(backup_dir: Path, watermarks: dict[str, str]) -> None:
+    path = backup_dir / WATERMARK_FILE
+    path.write_text(
+        json.dumps(watermarks, indent=2, sort_keys=True) + "\n",
+        encoding="utf-8",
+    )
+
+
+def write_records(path: Path, records: list[tuple[str, dict]]) -> None:
+    with path.open("w", encoding="utf-8", newline="\n") as file:
+        for table, row in records:
+            file.write(
+                json.dumps(
+                    {"table": table, "row": row},
+                    separators=(",", ":"),
+                    sort_keys=True,
+                )
+            )
+            file.write("\n")
+
+
+def read_records(path: Path):
+    with path.open("r", encoding="utf-8") as file:
+        for line_number, line in enumerate(file, start=1):
+            line = line.strip()
+
+            if not line:
+                continue
+
+            record = json.loads(line)
+
+            if record.get("table") not in TABLES or "row" not in record:
+                raise ValueError(f"{path}:{line_number}: malformed record")
+
+            yield record["table"], record["row"]
+
+
+def delta_paths(backup_dir: Path) -> list[Path]:
+    # Delta names embed a UTC timestamp, so name order is replay order.
+    return sorted(backup_dir.glob(DELTA_GLOB))
+
+
+def full_tables(path: Path) -> list[str]:
+    """The tables a delta holds in full (export --full), from its name."""
+    if FULL_MARKER not in path.stem:
+        return []
+
+    return path.stem.split(FULL_MARKER, 1)[1].split("-")
+
+
+def validate_tables(tables: list[str]) -> None:
+    unknown = [table for table in tables if table not in TABLES]
+
+    if unknown:
+        raise ValueError("Unknown tables: " + ", ".join(unknown))
+
+
+def validate_export_location(tables: list[str], backup_dir: Path) -> None:
+    resolved = backup_dir.resolve()
+    docs_dir = Path("docs").resolve()
+
+    if docs_dir in (resolved, *resolved.parents):
+        private = [table for table in tables if table not in PUBLIC_TABLES]
+
+        if private:
+            raise ValueError(
+                "Refusing to write sensitive tables under docs/: "
+                + ", ".join(private)
+            )
+
+
+def export(backup_dir: Path, tables: list[str], full: bool) -> None:
+    validate_tables(tables)
+    validate_export_location(tables, backup_dir)
+    backup_dir.mkdir(parents=True, exist_ok=True)
+
+    watermarks = read_watermarks(backup_dir)
+    run_stamp = datetime.now(timezone.utc)
+    records = []
+
+    for table in tables:
+        since = None
+
+        if not full and table in watermarks:
+            since = parse_timestamp(watermarks[table]) - WATERMARK_OVERLAP
+
+        rows = fetch_changed_rows(table, since)
+        records.extend((table, row) for row in rows)
+
+        stamps = [
+            parse_timestamp(stamp)
+            for stamp in (row_changed_at(row, table) for row in rows)
+            if stamp
+        ]
+
+        if stamps:
+            watermarks[table] = format_timestamp(max(stamps))
+
+        print(f"{table}: {len(rows)} changed rows")
+
+    # A full export is written even when empty: it records that its
+    # tables hold nothing else.
+    if records or full:
+        suffix = FULL_MARKER + "-".join(tables) if full else ""
+        delta_path = backup_dir / (
+            "delta_"
+            + run_stamp.strftime("%Y%m%dT%H%M%S%fZ")
+            + suffix
+            + ".jsonl"
+        )
+        write_records(delta_path, records)
+        print(f"WROTE DELTA: {delta_path} ({len(records)} rows)")
+    else:
+        print("No changed rows since the last watermark")
+
+    write_watermarks(backup_dir, watermarks)
+
+
+def fold_records(backup_dir: Path) -> dict[str, dict[str, dict]]:
+    """Return the latest version of every row, keyed by table and id.
+
+    A full export starts its tables over, so rows deleted before it was
+    taken are dropped.
+    """
+    folded = {table: {} for table in TABLES}
+    sources = [backup_dir / SNAPSHOT_FILE, *delta_paths(backup_dir)]
+
+    for path in sources:
+        if not path.exists():
+            continue
+
+        for table in full_tables(path):
+            folded[table] = {}
+
+        for table, row in read_records(path):
+            folded[table][row["id"]] = row
+
+    return folded
+
+
+def compact(backup_dir: Path) -> None:
+    deltas = delta_paths(backup_dir)
+
+    if not deltas:
+        print("No deltas to compact")
+        return
+
+    folded = fold_records(backup_dir)
+    records = [
+        (table, folded[table][row_id])
+        for table in TABLES
+        for row_id in sorted(folded[table])
+    ]
+
+    snapshot_path = backup_dir / SNAPSHOT_FILE
+    temporary_path = snapshot_path.with_suffix(".jsonl.tmp")
+    write_records(temporary_path, records)
+    temporary_path.replace(snapshot_path)
+
+    for path in deltas:
+        path.unlink()
+
+    print(
+        f"COMPACTED {len(deltas)} deltas into {snapshot_path} "
+        f"({len(records)} rows)"
+    )
+
+
+def restore(backup_dir: Path, tables: list[str], dry_run: bool) -> None:
+    validate_tables(tables)
+    sources = [backup_dir / SNAPSHOT_FILE, *delta_paths(backup_dir)]
+    sources = [path for path in sources if path.exists()]
+
+    if not sources:
+        raise FileNotFoundError(f"No backup files found in {backup_dir}")
+
+    # Replaying in file order keeps later versions of a row last; only
+    # the final version of each row needs to reach the database.
+    folded = fold_records(backup_dir)
+    game_seasons = {
+        row_id: row.get("season") for row_id, row in folded["games"].items()
+    }
+
+    for table in tables:
+        rows = list(folded[table].values())
+
+        if table != "games":
+            # Rows exported before the season column existed.
+            rows = [
+                row
+                if row.get("season") is not None
+                else {**row, "season": game_seasons.get(row.get("game_id"))}
+                for row in rows
+            ]
+
+        if dry_run:
+            print(f"{table}: {len(rows)} rows would be restored")
+            continue
+
+        for start in range(0, len(rows), RESTORE_BATCH_SIZE):
+            request_supabase(
+                "POST",
+                f"/rest/v1/{table}?on_conflict={CONFLICT_COLUMNS[table]}",
+                payload=rows[start:start + RESTORE_BATCH_SIZE],
+                prefer="resolution=merge-duplicates,return=minimal",
+            )
+
+        print(f"RESTORED {table}: {len(rows)} rows")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--backup-dir", default=str(BACKUP_DIR))
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    export_parser = commands.add_parser("export")
+    export_parser.add_argument(
+        "--tables",
+        default=",".join(PUBLIC_TABLES),
+    )
+    export_parser.add_argument("--full", action="store_true")
+
+    commands.add_parser("compact")
+
+    restore_parser = commands.add_parser("restore")
+    restore_parser.add_argument(
+        "--tables",
+        default=",".join(PUBLIC_TABLES),
+    )
+    restore_parser.add_argument("--dry-run", action="store_true")
+
+    args = parser.parse_args()
+    backup_dir = Path(args.backup_dir)
+
+    if args.command == "export":
+        export(backup_dir, args.tables.split(","), args.full)
+    elif args.command == "compact":
+        compact(backup_dir)
+    else:
+        restore(backup_dir, args.tables.split(","), args.dry_run)
+
+
+if __name__ == "__main__":
+    main()
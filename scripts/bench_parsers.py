@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+# scripts/bench_parsers.py
+
+"""Benchmark and check the paste parsers on synthetic pastes.
+
+    python scripts/bench_parsers.py --games 1000 --games 50000
+
+generates odds and score pastes of each size with paste_generator.py
+and reports rows per second and peak traced memory for parse_rows,
+merge_rows and write_csv of manual_nfl_odds.py and
+manual_nfl_final_scores.py. Each step is timed on its own and then run
+again under tracemalloc for the memory figure, so tracing does not slow
+the timing. The odds merge folds a second book into every game, which
+is the expensive case (consensus is rebuilt for every game).
+
+    python scripts/bench_parsers.py --check --trials 200
+
+is the equivalence check to run before and after a parser change:
+
+    round trip  for --trials random seeds and sizes, parse_rows on a
+                generated paste returns exactly the rows the generator
+                says it holds
+    golden      the CSV written for a fixed paste hashes to GOLDEN, so
+                any change to the output bytes (columns, formatting,
+                row order) is caught
+
+Exits 1 on a mismatch. If an output change is intended, update GOLDEN
+with the digests printed.
+"""
+
+import argparse
+import hashlib
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import manual_nfl_final_scores
+import manual_nfl_odds
+from paste_generator import UPDATED_AT_UTC, generate_odds, generate_scores
+
+
+SEASON = "2026"
+WEEK = "1"
+
+DEFAULT_SIZES = (1_000, 20_000)
+
+GOLDEN_GAMES = 64
+GOLDEN_SEED = 0
+GOLDEN = {
+    "odds": "b205fec5394a6ed45bb14af17c17d79bf3293ffcb5d1a4e6130d1bc3478f3d5c",
+    "scores": "502a6cefc5b0fff078d95fd723f9ed59d7066282a5d3d24c1ecb6283ba108274",
+}
+
+MAX_TRIAL_GAMES = 64
+
+
+def measure(function, *args):
+    """Return (result, seconds, peak traced bytes) for function(*args)."""
+    started = time.perf_counter()
+    result = function(*args)
+    elapsed = time.perf_counter() - started
+
+    del result
+    tracemalloc.start()
+    try:
+        result = function(*args)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return result, elapsed, peak
+
+
+def parse_odds(lines: list[str], book: str = "NA") -> list[dict]:
+    return manual_nfl_odds.parse_rows(
+        lines, SEASON, WEEK, UPDATED_AT_UTC, book
+    )
+
+
+def parse_scores(lines: list[str]) -> list[dict]:
+    return manual_nfl_final_scores.parse_rows(lines, SEASON, WEEK)
+
+
+def csv_digest(module, rows: list[dict]) -> str:
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "out.csv"
+        module.write_csv(path, rows)
+        return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def bench(games: int, seed: int) -> list[tuple]:
+    results = []
+
+    lines, _ = generate_odds(games, seed)
+    second_book, _ = generate_odds(games, seed, book="Book2")
+    rows, seconds, peak = measure(parse_odds, lines)
+    results.append(("odds", "parse_rows", len(rows), seconds, peak))
+
+    incoming = parse_odds(second_book, "Book2")
+    merged, seconds, peak = measure(
+        manual_nfl_odds.merge_rows, rows, incoming
+    )
+    results.append(("odds", "merge_rows", len(merged), seconds, peak))
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "odds.csv"
+        _, seconds, peak = measure(manual_nfl_odds.write_csv, path, merged)
+        results.append(("odds", "write_csv", len(merged), seconds, peak))
+
+    lines, _ = generate_scores(games, seed)
+    rows, seconds, peak = measure(parse_scores, lines)
+    results.append(("scores", "parse_rows", len(rows), seconds, peak))
+
+    merged, seconds, peak = measure(
+        manual_nfl_final_scores.merge_rows, rows, rows
+    )
+    results.append(("scores", "merge_rows", len(merged), seconds, peak))
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "scores.csv"
+        _, seconds, peak = measure(
+            manual_nfl_final_scores.write_csv, path, merged
+        )
+        results.append(("scores", "write_csv", len(merged), seconds, peak))
+
+    return results
+
+
+def round_trip(trials: int, seed: int) -> int:
+    rng = random.Random(seed)
+    failures = 0
+
+    for _ in range(trials):
+        trial_seed = rng.randrange(2**32)
+        games = rng.randrange(1, MAX_TRIAL_GAMES + 1)
+
+        for kind, generate, parse in (
+            ("odds", generate_odds, parse_odds),
+            ("scores", generate_scores, parse_scores),
+        ):
+            lines, expected = generate(games, trial_seed)
+            rows = parse(lines)
+
+            if rows != expected:
+                failures += 1
+                mismatch = next(
+                    (index for index, (row, want) in enumerate(
+                        zip(rows, expected)
+                    ) if row != want),
+                    min(len(rows), len(expected)),
+                )
+                print(
+                    f"MISMATCH {kind} seed {trial_seed} games {games} "
+                    f"at row {mismatch}"
+                )
+
+    return failures
+
+
+def golden() -> int:
+    failures = 0
+
+    lines, _ = generate_odds(GOLDEN_GAMES, GOLDEN_SEED)
+    odds_rows = manual_nfl_odds.merge_rows([], parse_odds(lines))
+
+    lines, _ = generate_scores(GOLDEN_GAMES, GOLDEN_SEED)
+    score_rows = parse_scores(lines)
+
+    for kind, module, rows in (
+        ("odds", manual_nfl_odds, odds_rows),
+        ("scores", manual_nfl_final_scores, score_rows),
+    ):
+        digest = csv_digest(module, rows)
+
+        if digest != GOLDEN[kind]:
+            failures += 1
+            print(f"GOLDEN {kind}: {digest} (expected {GOLDEN[kind]})")
+
+    return failures
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--games", type=int, action="append")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--check", action="store_true")
+    parser.add_argument("--trials", type=int, default=100)
+    args = parser.parse_args()
+
+    if args.check:
+        failures = round_trip(args.trials, args.seed) + golden()
+        print(
+            f"CHECKED {args.trials} round trips per parser and the golden "
+            f"CSVs: {failures} failures"
+        )
+        if failures:
+            sys.exit(1)
+        return
+
+    print(
+        f"{'paste':<7} {'step':<11} {'rows':>9} {'seconds':>9} "
+        f"{'rows/s':>11} {'peak MiB':>9}"
+    )
+
+    for games in args.games or DEFAULT_SIZES:
+        for kind, step, rows, seconds, peak in bench(games, args.seed):
+            rate = rows / seconds if seconds else float("inf")
+            print(
+                f"{kind:<7} {step:<11} {rows:>9} {seconds:>9.3f} "
+                f"{rate:>11,.0f} {peak / 2**20:>9.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
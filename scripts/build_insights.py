@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+# scripts/build_insights.py
+
+"""Publish team and market insights for the insights page.
+
+From games and final scores this computes, per season:
+
+    ats        each team's record against the spread
+    home_ats   ... as the home team
+    away_ats   ... as the away team
+    fav_ats    ... when favoured
+    dog_ats    ... as the underdog
+    ou         over / under / push in the team's games
+
+plus the same splits across the whole league under "league". Records
+are [W, L, P] lists; ou is [over, under, push].
+
+Each graded week is aggregated into
+docs/data/insights/weeks/<season>_wk<week>.json together with a hash of
+the rows it was built from. A week is rebuilt only when that hash
+changes, and docs/data/insights/<season>.json is the sum of its weeks.
+Teams are grouped by their teams.py id, so a season that mixes a team's
+old and new names is counted as one team, under its current name.
+
+Reads through grade_picks.SupabaseSource (and so the replica cache), or
+from backup files with --snapshot, exactly as grade_picks.py does.
+"""
+
+import argparse
+import hashlib
+import json
+from pathlib import Path
+
+from grade_picks import (
+    SnapshotSource,
+    SupabaseSource,
+    grade_spread,
+    grade_total,
+    to_number,
+)
+from teams import get_registry
+
+
+OUT_DIR = Path("docs/data/insights")
+
+GAME_COLUMNS = "id,season,week,home_team,away_team,spread_home,total"
+SCORE_COLUMNS = "game_id,away_score,home_score,status"
+
+TEAM_SPLITS = ("ats", "home_ats", "away_ats", "fav_ats", "dog_ats", "ou")
+LEAGUE_SPLITS = ("home_ats", "away_ats", "fav_ats", "dog_ats", "ou")
+
+# W / L / P, and for totals over / under / push.
+RESULT_INDEX = {"W": 0, "L": 1, "P": 2}
+
+
+def blank_splits(names) -> dict:
+    return {name: [0, 0, 0] for name in names}
+
+
+def graded_games(source) -> dict:
+    """Return final, lined games grouped by (season, week)."""
+    scores = {}
+
+    for row in source.get_all("scores", SCORE_COLUMNS):
+        if row.get("status") == "live":
+            continue
+
+        away = to_number(row.get("away_score"))
+        home = to_number(row.get("home_score"))
+
+        if away is not None and home is not None:
+            scores[row["game_id"]] = (away, home)
+
+    weeks = {}
+    team_key = get_registry().key
+
+    for game in source.get_all("games", GAME_COLUMNS):
+        spread_home = to_number(game.get("spread_home"))
+        total_line = to_number(game.get("total"))
+        score = scores.get(game["id"])
+
+        if score is None or spread_home is None or total_line is None:
+            continue
+
+        key = (int(game["season"]), int(game["week"]))
+        weeks.setdefault(key, []).append(
+            (
+                game["id"],
+                team_key(game["home_team"]),
+                team_key(game["away_team"]),
+                spread_home,
+                total_line,
+                score[0],
+                score[1],
+            )
+        )
+
+    for games in weeks.values():
+        games.sort()
+
+    return weeks
+
+
+def week_hash(games: list[tuple]) -> str:
+    return hashlib.sha256(
+        json.dumps(games, separators=(",", ":")).encode("utf-8")
+    ).hexdigest()
+
+
+def aggregate_week(games: list[tuple]) -> dict:
+    teams = {}
+    league = blank_splits(LEAGUE_SPLITS)
+
+    for _, home_team, away_team, spread_home, total_line, away, home in games:
+        home_result = grade_spread("home", spread_home, away, home)
+        away_result = grade_spread("away", spread_home, away, home)
+        total_index = RESULT_INDEX[grade_total("over", total_line, away, home)]
+
+        sides = (
+            (home_team, home_result, "home_ats", spread_home < 0),
+            (away_team, away_result, "away_ats", spread_home > 0),
+        )
+
+        for team, result, venue_split, favoured in sides:
+            splits = teams.setdefault(team, blank_splits(TEAM_SPLITS))
+            index = RESULT_INDEX[result]
+
+            splits["ats"][index] += 1
+            splits[venue_split][index] += 1
+            league[venue_split][index] += 1
+            splits["ou"][total_index] += 1
+
+            if spread_home != 0:
+                role = "fav_ats" if favoured else "dog_ats"
+                splits[role][index] += 1
+                league[role][index] += 1
+
+        league["ou"][total_index] += 1
+
+    label = get_registry().label
+
+    return {
+        "games": len(games),
+        "teams": {label(team): splits for team, splits in teams.items()},
+        "league": league,
+    }
+
+
+def add_splits(target: dict, source: dict) -> None:
+    for name, values in source.items():
+        totals = target.setdefault(name, [0, 0, 0])
+        for index, value in enumerate(values):
+            totals[index] += value
+
+
+def write_json(path: Path, document: dict) -> bool:
+    """Write compact JSON; return False when the file is already current."""
+    text = json.dumps(document, separators=(",", ":"), sort_keys=True)
+
+    if path.exists() and path.read_text(encoding="utf-8") == text:
+        return False
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text, encoding="utf-8")
+    return True
+
+
+def build(source, out_dir: Path) -> None:
+    weeks_dir = out_dir / "weeks"
+    seasons = {}
+    rebuilt = 0
+
+    for (season, week), games in sorted(graded_games(source).items()):
+        path = weeks_dir / f"{season}_wk{week:02d}.json"
+        digest = week_hash(games)
+        partial = None
+
+        if path.exists():
+            partial = json.loads(path.read_text(encoding="utf-8"))
+            if partial.get("hash") != digest:
+                partial = None
+
+        if partial is None:
+            partial = aggregate_week(games)
+            partial["hash"] = digest
+            write_json(path, partial)
+            rebuilt += 1
+
+        seasons.setdefault(season, []).append((week, partial))
+
+    for season, partials in seasons.items():
+        teams = {}
+        league = {}
+
+        for _, partial in partials:
+            for team, splits in partial["teams"].items():
+                add_splits(teams.setdefault(team, {}), splits)
+            add_splits(league, partial["league"])
+
+        document = {
+            "season": season,
+            "weeks": [week for week, _ in partials],
+            "games": sum(partial["games"] for _, partial in partials),
+            "teams": teams,
+            "league": league,
+        }
+
+        if write_json(out_dir / f"{season}.json", document):
+            print(f"WROTE {out_dir / f'{season}.json'}")
+
+    print(
+        f"INSIGHTS: {sum(len(p) for p in seasons.values())} weeks, "
+        f"{rebuilt} rebuilt"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--snapshot", action="append", default=[])
+    parser.add_argument("--out-dir", default=str(OUT_DIR))
+    args = parser.parse_args()
+
+    if args.snapshot:
+        source = SnapshotSource(args.snapshot)
+    else:
+        source = SupabaseSource()
+
+    try:
+        build(source, Path(args.out_dir))
+    finally:
+        source.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+# scripts/build_pick_history.py
+
+"""Publish each user's graded picks as a static file for the account page.
+
+Writes docs/data/history/<shard>/<user_id>.json, where the shard is the
+first two characters of the user id, so no directory holds more than
+1/256th of the users:
+
+    {"user_id": "...", "record": {"spread": [W, L, P], "total": [...]},
+     "columns": ["season", "week", ...], "picks": [[2026, 1, ...], ...]}
+
+Each pick row carries its game's teams, kickoff, lines and final score
+next to the pick and its results, oldest first. Only graded picks are
+published: a pick gets results once its game has a final score, so a
+pick still hidden until kickoff never appears here.
+
+Run after grade_picks.py --changed-out PATH with --changed PATH, which
+rewrites only the files of the users whose picks that run changed; the
+picks are read for those users alone. --all rebuilds every user's file
+and removes the files of users with no graded picks left. A file whose
+content would not change is not rewritten.
+
+Reads through grade_picks.SupabaseSource (and so the replica cache for
+games and scores), or from backup files with --snapshot, as
+build_insights.py does.
+"""
+
+import argparse
+from pathlib import Path
+
+from build_insights import RESULT_INDEX, write_json
+from grade_picks import SnapshotSource, SupabaseSource, to_number
+
+
+OUT_DIR = Path("docs/data/history")
+
+SHARD_LENGTH = 2
+
+GAME_COLUMNS = (
+    "id,season,week,kickoff_utc,away_team,home_team,spread_home,total"
+)
+SCORE_COLUMNS = "game_id,away_score,home_score,status"
+PICK_COLUMNS = (
+    "id,user_id,game_id,spread_pick,total_pick,spread_result,total_result"
+)
+
+HISTORY_COLUMNS = [
+    "season",
+    "week",
+    "kickoff_utc",
+    "away_team",
+    "home_team",
+    "spread_home",
+    "total",
+    "away_score",
+    "home_score",
+    "spread_pick",
+    "total_pick",
+    "spread_result",
+    "total_result",
+]
+
+
+def history_path(out_dir: Path, user_id: str) -> Path:
+    return out_dir / user_id[:SHARD_LENGTH] / f"{user_id}.json"
+
+
+def changed_users(source, path: Path) -> set:
+    pick_ids = [
+        line.strip()
+        for line in path.read_text(encoding="utf-8").splitlines()
+        if line.strip()
+    ]
+
+    return {
+        row["user_id"]
+        for row in source.get_in("picks", "user_id", "id", pick_ids)
+        if row.get("user_id")
+    }
+
+
+def to_score(value):
+    number = to_number(value)
+    return None if number is None else int(number)
+
+
+def load_games(source) -> dict:
+    scores = {
+        row["game_id"]: row
+        for row in source.get_all("scores", SCORE_COLUMNS)
+        if row.get("status") != "live"
+    }
+
+    games = {}
+
+    for game in source.get_all("games", GAME_COLUMNS):
+        score = scores.get(game["id"], {})
+        games[game["id"]] = (
+            int(game["season"]),
+            int(game["week"]),
+            game.get("kickoff_utc"),
+            game.get("away_team"),
+            game.get("home_team"),
+            to_number(game.get("spread_home")),
+            to_number(game.get("total")),
+            to_score(score.get("away_score")),
+            to_score(score.get("home_score")),
+        )
+
+    return games
+
+
+def build_history(user_id: str, picks: list[dict], games: dict) -> dict:
+    rows = []
+    record = {"spread": [0, 0, 0], "total": [0, 0, 0]}
+
+    for pick in picks:
+        game = games.get(pick["game_id"])
+
+        if game is None:
+            continue
+
+        spread_result = pick.get("spread_result")
+        total_result = pick.get("total_result")
+
+        if spread_result in RESULT_INDEX:
+            record["spread"][RESULT_INDEX[spread_result]] += 1
+        if total_result in RESULT_INDEX:
+            record["total"][RESULT_INDEX[total_result]] += 1
+
+        rows.append(
+            [
+                *game,
+                pick.get("spread_pick"),
+                pick.get("total_pick"),
+                spread_result,
+                total_result,
+            ]
+        )
+
+    # Season, week, kickoff, then teams: a stable order, so an unchanged
+    # history serialises to the same bytes.
+    rows.sort(
+        key=lambda row: tuple(
+            "" if value is None else value for value in row[:5]
+        )
+    )
+
+    return {
+        "user_id": user_id,
+        "record": record,
+        "columns": HISTORY_COLUMNS,
+        "picks": rows,
+    }
+
+
+def build(source, out_dir: Path, users=None) -> None:
+    """Rewrite the history files of users, or of everyone when None."""
+    if users is not None and not users:
+        print("PICK HISTORY: no picks changed")
+        return
+
+    if users is None:
+        rows = source.iter_all("picks", PICK_COLUMNS)
+    else:
+        rows = source.get_in(
+            "picks", PICK_COLUMNS, "user_id", sorted(users)
+        )
+
+    picks = {}
+
+    for pick in rows:
+        if not pick.get("user_id"):
+            continue
+        if (
+            pick.get("spread_result") is None
+            and pick.get("total_result") is None
+        ):
+            continue
+
+        picks.setdefault(pick["user_id"], []).append(pick)
+
+    games = load_games(source)
+    written = 0
+    removed = 0
+
+    for user_id, user_picks in sorted(picks.items()):
+        history = build_history(user_id, user_picks, games)
+
+        if write_json(history_path(out_dir, user_id), history):
+            written += 1
+
+    # Users left without a graded pick (picks deleted or regraded to
+    # none) lose their file.
+    if users is None:
+        stale = [
+            path
+            for path in out_dir.glob("*/*.json")
+            if path.stem not in picks
+        ]
+    else:
+        stale = [
+            history_path(out_dir, user_id)
+            for user_id in users
+            if user_id not in picks
+        ]
+
+    for path in stale:
+        if path.exists():
+            path.unlink()
+            removed += 1
+
+    print(
+        f"PICK HISTORY: {len(picks)} users, {written} rewritten, "
+        f"{removed} removed"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--snapshot", action="append", default=[])
+    parser.add_argument("--out-dir", default=str(OUT_DIR))
+    scope = parser.add_mutually_exclusive_group(required=True)
+    scope.add_argument("--changed", type=Path)
+    scope.add_argument("--all", action="store_true")
+    args = parser.parse_args()
+
+    if args.snapshot:
+        source = SnapshotSource(args.snapshot)
+    else:
+        source = SupabaseSource()
+
+    try:
+        users = None if args.all else changed_users(source, args.changed)
+        build(source, Path(args.out_dir), users)
+    finally:
+        source.close()
+
+
+if __name__ == "__main__":
+    main()
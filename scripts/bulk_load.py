@@ -0,0 +1,433 @@
+#!/usr/bin/env python3
+# scripts/bulk_load.py
+
+"""Bulk-load games and scores straight into Postgres with COPY.
+
+sync_games_to_supabase.py and sync_scores_to_supabase.py write a week
+at a time through PostgREST, as JSON batches of 500 rows, which is fine
+for a week and slow for a season backfill or a restore. This script
+streams rows over one psql session instead: COPY ... FROM STDIN into a
+temporary staging table, then one set-based upsert per table, all in
+one transaction.
+
+    games PATH...    weekly odds CSVs (docs/data/weekly/*_odds.csv),
+                     reduced to consensus rows exactly as
+                     sync_games_to_supabase.py does; upserted on game_id
+    scores PATH...   score CSVs (docs/data/scores/*_scores.csv), matched
+                     to games on season, week and game_id; upserted on
+                     game_id, and their games marked final
+    restore [PATH]   the games and scores COPY blocks of a pg_dump data
+                     file (default docs/supabase/backup/data.sql),
+                     upserted on id
+
+Rows identical to what is stored are skipped, so loading the same files
+twice writes nothing and leaves updated_at alone. Where several files
+have the same game, the last one named wins. A score whose game is
+missing fails the whole load.
+
+Throughput is set by the tables rather than by COPY, which stages about
+a million rows a second on a local Postgres. Measured there with
+200,000 rows per table and the season_partitions migration in: games
+load at about 17,000 rows/s, most of it the CSV validation shared with
+sync_games_to_supabase.py, and restore at about 50,000; scores load at
+about 7,500 rows/s and restore at about 12,000, since every score still
+passes the per-row set_row_season, updated_by and foreign key triggers,
+four unique indexes and the copy into scores_partitioned. A rerun that
+changes nothing only stages and compares.
+
+Requires psql, and SUPABASE_DB_URL unless --db-url is given; try a load
+against a local database (see explain_queries.py) first.
+"""
+
+import argparse
+import csv
+import io
+from pathlib import Path
+from typing import Iterable, Iterator
+
+from grade_picks import COPY_RE
+from postgres import psql_stream, require_environment
+from sync_games_to_supabase import load_consensus_games
+from sync_scores_to_supabase import REQUIRED_HEADERS, parse_score
+from teams import get_registry
+
+
+DATA_SQL_PATH = Path("docs/supabase/backup/data.sql")
+
+# Rows per chunk written to psql.
+COPY_CHUNK_ROWS = 10000
+
+# Staging columns and their types. Score rows name their game by the
+# text game_id of the CSVs, resolved to games.id in the merge.
+GAME_COLUMNS = {
+    "game_id": "text",
+    "season": "integer",
+    "week": "smallint",
+    "week_type": "text",
+    "away_team": "text",
+    "home_team": "text",
+    "kickoff_utc": "timestamp with time zone",
+    "spread_home": "numeric",
+    "total": "numeric",
+}
+
+SCORE_COLUMNS = {
+    "season": "integer",
+    "week": "smallint",
+    "game_id": "text",
+    "home_score": "smallint",
+    "away_score": "smallint",
+}
+
+# Conflict key per restorable table. Scores move to (id, season), and
+# the scores merge to (game_id, season), before the partition swap (step
+# 3 of the season_partitions migration); until every row has its season
+# those keys would miss it.
+RESTORE_KEYS = {
+    "games": ("id",),
+    "scores": ("id",),
+}
+
+# position orders the staged rows, so the last one loaded wins.
+STAGING_SQL = """
+CREATE TEMP TABLE "{table}_staging" (
+    "position" bigint NOT NULL,
+    {definitions}
+) ON COMMIT DROP;
+
+COPY "{table}_staging" ("position", {columns}) FROM STDIN WITH (FORMAT csv);
+"""
+
+MERGE_GAMES_SQL = """
+WITH staged AS (
+    SELECT DISTINCT ON ("game_id") {columns}
+    FROM "games_staging"
+    ORDER BY "game_id", "position" DESC
+), merged AS (
+    INSERT INTO "public"."games" AS games ({columns})
+    SELECT {columns} FROM staged
+    ON CONFLICT ("game_id") DO UPDATE SET {updates}
+    WHERE ({current}) IS DISTINCT FROM ({excluded})
+    RETURNING 1
+)
+SELECT (SELECT count(*) FROM staged) || '|' || (SELECT count(*) FROM merged);
+"""
+
+MERGE_SCORES_SQL = """
+DO $$
+DECLARE
+    missing text;
+BEGIN
+    SELECT string_agg(DISTINCT staging."game_id", E'\\n')
+    INTO missing
+    FROM "scores_staging" AS staging
+    LEFT JOIN "public"."games" AS games
+      ON games."game_id" = staging."game_id"
+     AND games."season" = staging."season"
+     AND games."week" = staging."week"
+    WHERE games."id" IS NULL;
+
+    IF missing IS NOT NULL THEN
+        RAISE EXCEPTION 'Scores cannot be loaded because these games are '
+            'missing from public.games:%', E'\\n' || missing;
+    END IF;
+END
+$$;
+
+WITH staged AS (
+    SELECT DISTINCT ON (games."id")
+        games."id" AS "game_id",
+        games."season",
+        staging."home_score",
+        staging."away_score"
+    FROM "scores_staging" AS staging
+    JOIN "public"."games" AS games
+      ON games."game_id" = staging."game_id"
+     AND games."season" = staging."season"
+     AND games."week" = staging."week"
+    ORDER BY games."id", staging."position" DESC
+), merged AS (
+    INSERT INTO "public"."scores" AS scores
+        ("game_id", "season", "home_score", "away_score", "status")
+    SELECT "game_id", "season", "home_score", "away_score", 'final'
+    FROM staged
+    ON CONFLICT ("game_id") DO UPDATE SET
+        "home_score" = EXCLUDED."home_score",
+        "away_score" = EXCLUDED."away_score",
+        "status" = EXCLUDED."status"
+    WHERE (scores."home_score", scores."away_score", scores."status")
+        IS DISTINCT FROM
+        (EXCLUDED."home_score", EXCLUDED."away_score", EXCLUDED."status")
+    RETURNING 1
+), finalized AS (
+    UPDATE "public"."games" AS games
+    SET "status" = 'final'
+    FROM staged
+    WHERE games."id" = staged."game_id"
+      AND games."status" IS DISTINCT FROM 'final'
+    RETURNING 1
+)
+SELECT (SELECT count(*) FROM staged) || '|' || (SELECT count(*) FROM merged)
+    || '|' || (SELECT count(*) FROM finalized);
+"""
+
+RESTORE_SQL = """
+WITH merged AS (
+    INSERT INTO "public"."{table}" AS target ({target})
+    SELECT {source}
+    FROM "{table}_staging" AS staging
+    {join}
+    ON CONFLICT ({key}) DO UPDATE SET {updates}
+    WHERE ({current}) IS DISTINCT FROM ({excluded})
+    RETURNING 1
+)
+SELECT '{table}|' || (SELECT count(*) FROM "{table}_staging")
+    || '|' || (SELECT count(*) FROM merged);
+"""
+
+
+def quoted(columns: Iterable[str]) -> str:
+    return ", ".join(f'"{column}"' for column in columns)
+
+
+def staging_sql(table: str, columns: dict) -> str:
+    return STAGING_SQL.format(
+        table=table,
+        columns=quoted(columns),
+        definitions=",\n    ".join(
+            f'"{column}" {column_type}'
+            for column, column_type in columns.items()
+        ),
+    )
+
+
+def copy_rows(rows: Iterable[Iterable]) -> Iterator[str]:
+    """CSV COPY data for rows, COPY_CHUNK_ROWS rows per chunk, then \\."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+
+    for position, row in enumerate(rows):
+        writer.writerow((position, *row))
+
+        if position % COPY_CHUNK_ROWS == COPY_CHUNK_ROWS - 1:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+    yield buffer.getvalue() + "\\.\n"
+
+
+def read_games(paths: list[Path]) -> Iterator[tuple]:
+    for path in paths:
+        for game in load_consensus_games(path):
+            yield tuple(game[column] for column in GAME_COLUMNS)
+
+
+def read_scores(paths: list[Path]) -> Iterator[tuple]:
+    """Score rows from CSVs that may span any number of weeks."""
+    canonical_game_id = get_registry().canonical_game_id
+
+    for path in paths:
+        with path.open("r", encoding="utf-8", newline="") as file:
+            reader = csv.DictReader(file)
+            missing_headers = REQUIRED_HEADERS - set(reader.fieldnames or [])
+
+            if missing_headers:
+                raise ValueError(
+                    f"{path} is missing headers: "
+                    + ", ".join(sorted(missing_headers))
+                )
+
+            for line_number, row in enumerate(reader, start=2):
+                game_id = canonical_game_id(row["game_id"].strip())
+
+                if not game_id:
+                    raise ValueError(
+                        f"{path} line {line_number}: game_id is empty"
+                    )
+
+                yield (
+                    int(row["season"]),
+                    int(row["week"]),
+                    game_id,
+                    parse_score(
+                        row["home_score"],
+                        f"{path} line {line_number} home_score",
+                    ),
+                    parse_score(
+                        row["away_score"],
+                        f"{path} line {line_number} away_score",
+                    ),
+                )
+
+
+def load_games(db_url: str, paths: list[Path]) -> None:
+    columns = quoted(GAME_COLUMNS)
+    updated = [column for column in GAME_COLUMNS if column != "game_id"]
+
+    def script() -> Iterator[str]:
+        yield "BEGIN;\n"
+        yield staging_sql("games", GAME_COLUMNS)
+        yield from copy_rows(read_games(paths))
+        yield MERGE_GAMES_SQL.format(
+            columns=columns,
+            updates=", ".join(
+                f'"{column}" = EXCLUDED."{column}"' for column in updated
+            ),
+            current=", ".join(f'games."{column}"' for column in updated),
+            excluded=", ".join(f'EXCLUDED."{column}"' for column in updated),
+        )
+        yield "COMMIT;\n"
+
+    staged, written = psql_stream(db_url, script()).strip().split("|")
+
+    print(
+        f"UPSERTED {written} games "
+        f"({int(staged) - int(written)} unchanged) from {len(paths)} files"
+    )
+
+
+def load_scores(db_url: str, paths: list[Path]) -> None:
+    def script() -> Iterator[str]:
+        yield "BEGIN;\n"
+        yield staging_sql("scores", SCORE_COLUMNS)
+        yield from copy_rows(read_scores(paths))
+        yield MERGE_SCORES_SQL
+        yield "COMMIT;\n"
+
+    staged, written, finalized = (
+        psql_stream(db_url, script()).strip().split("|")
+    )
+
+    print(
+        f"UPSERTED {written} scores "
+        f"({int(staged) - int(written)} unchanged) from {len(paths)} files; "
+        f"{finalized} games marked final"
+    )
+
+
+def restore_block(table: str, columns: list[str]) -> str:
+    """Upsert a restored COPY block from its staging table into table."""
+    key = RESTORE_KEYS[table]
+    source = [f'staging."{column}"' for column in columns]
+    target = list(columns)
+    join = ""
+
+    # Dumps from before the season_partitions migration have no
+    # scores.season; it comes from the score's game.
+    if table == "scores" and "season" not in columns:
+        source.append('games."season"')
+        target.append("season")
+        join = (
+            'JOIN "public"."games" AS games '
+            'ON games."id" = staging."game_id"'
+        )
+
+    updated = [column for column in target if column not in key]
+    # The tables' triggers stamp updated_at on every write, so it never
+    # matches the dump after a restore and must not count as a change.
+    compared = [column for column in updated if column != "updated_at"]
+
+    return RESTORE_SQL.format(
+        table=table,
+        target=quoted(target),
+        source=", ".join(source),
+        join=join,
+        key=quoted(key),
+        updates=", ".join(
+            f'"{column}" = EXCLUDED."{column}"' for column in updated
+        ),
+        current=", ".join(f'target."{column}"' for column in compared),
+        excluded=", ".join(f'EXCLUDED."{column}"' for column in compared),
+    )
+
+
+def restore_script(path: Path) -> Iterator[str]:
+    """The dump's COPY data, passed through unparsed into staging."""
+    yield "BEGIN;\n"
+
+    with path.open("r", encoding="utf-8") as file:
+        table = None
+        columns = None
+        lines = []
+
+        for line in file:
+            if table is None:
+                match = COPY_RE.match(line.rstrip("\n"))
+
+                if match and match.group("table") in RESTORE_KEYS:
+                    table = match.group("table")
+                    columns = [
+                        name.strip().strip('"')
+                        for name in match.group("columns").split(",")
+                    ]
+                    # The dump's own text format goes straight into a
+                    # copy of the table's columns.
+                    yield (
+                        f'CREATE TEMP TABLE "{table}_staging" '
+                        "ON COMMIT DROP AS "
+                        f'SELECT {quoted(columns)} FROM "public"."{table}" '
+                        "WITH NO DATA;\n"
+                        f'COPY "{table}_staging" ({quoted(columns)}) '
+                        "FROM STDIN;\n"
+                    )
+                continue
+
+            lines.append(line)
+
+            if line.rstrip("\n") == "\\.":
+                yield "".join(lines)
+                yield restore_block(table, columns)
+                table = None
+                lines = []
+            elif len(lines) >= COPY_CHUNK_ROWS:
+                yield "".join(lines)
+                lines = []
+
+    yield "COMMIT;\n"
+
+
+def restore(db_url: str, path: Path) -> None:
+    for line in psql_stream(db_url, restore_script(path)).splitlines():
+        if not line.strip():
+            continue
+
+        table, staged, written = line.split("|")
+        print(
+            f"RESTORED {written} {table} "
+            f"({int(staged) - int(written)} unchanged) from {path}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--db-url",
+        help="Postgres connection string (default: $SUPABASE_DB_URL)",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    games_command = commands.add_parser("games")
+    games_command.add_argument("paths", nargs="+", type=Path)
+
+    scores_command = commands.add_parser("scores")
+    scores_command.add_argument("paths", nargs="+", type=Path)
+
+    restore_command = commands.add_parser("restore")
+    restore_command.add_argument(
+        "path", nargs="?", type=Path, default=DATA_SQL_PATH
+    )
+
+    args = parser.parse_args()
+    db_url = args.db_url or require_environment("SUPABASE_DB_URL")
+
+    if args.command == "games":
+        load_games(db_url, args.paths)
+    elif args.command == "scores":
+        load_scores(db_url, args.paths)
+    else:
+        restore(db_url, args.path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+# scripts/check_pick_splits.py
+
+"""Recount per-game pick splits and compare them with pick_splits.
+
+pick_splits is maintained by the picks_track_splits trigger (see
+supabase/migrations/20261019000000_pick_splits.sql), which applies +1 /
+-1 deltas as picks are inserted, changed and deleted. This script
+reports every game whose stored counters differ from a full recount of
+picks. Against Supabase the recount and the comparison are the
+pick_split_drift() function, one statement on one snapshot, so picks
+written while it runs never show up as drift. --fix then calls the
+recount_pick_splits() function, which overwrites the drifted rows in
+one statement while writes to picks wait, so no trigger delta is lost
+in between; games without picks are reset to zero.
+
+Exits 1 when drift was found and not fixed.
+
+Reads through grade_picks.SupabaseSource, or from backup files with
+--snapshot (report only; the recount is done here), exactly as
+grade_picks.py does.
+"""
+
+import argparse
+import sys
+
+from grade_picks import TIMEOUT, SnapshotSource, SupabaseSource
+
+
+SPLIT_COLUMNS = ("home_picks", "away_picks", "over_picks", "under_picks")
+
+PICK_SPLIT_COLUMNS = {
+    ("spread_pick", "home"): "home_picks",
+    ("spread_pick", "away"): "away_picks",
+    ("total_pick", "over"): "over_picks",
+    ("total_pick", "under"): "under_picks",
+}
+
+
+def blank_split() -> dict:
+    return {column: 0 for column in SPLIT_COLUMNS}
+
+
+def recount(source) -> dict:
+    counts = {}
+
+    for pick in source.get_all("picks", "game_id,spread_pick,total_pick"):
+        if pick.get("game_id") is None:
+            continue
+
+        split = counts.setdefault(pick["game_id"], blank_split())
+
+        for field in ("spread_pick", "total_pick"):
+            column = PICK_SPLIT_COLUMNS.get((field, pick.get(field)))
+            if column:
+                split[column] += 1
+
+    return counts
+
+
+def stored_splits(source) -> dict:
+    return {
+        row["game_id"]: {column: int(row[column]) for column in SPLIT_COLUMNS}
+        for row in source.get_all(
+            "pick_splits", "game_id," + ",".join(SPLIT_COLUMNS)
+        )
+    }
+
+
+def find_drift(expected: dict, stored: dict) -> list[dict]:
+    drift = []
+
+    for game_id in sorted(set(expected) | set(stored)):
+        want = expected.get(game_id, blank_split())
+        have = stored.get(game_id)
+
+        if have is None and not any(want.values()):
+            continue
+
+        if have != want:
+            drift.append({"game_id": game_id, **want})
+
+    return drift
+
+
+def call_function(source: SupabaseSource, name: str):
+    response = source.requests.post(
+        source.url + "/rest/v1/rpc/" + name,
+        headers=source.headers,
+        json={},
+        timeout=TIMEOUT,
+    )
+
+    if response.status_code != 200:
+        sys.exit(
+            f"{name} failed: HTTP {response.status_code} {response.text}"
+        )
+
+    return response.json()
+
+
+def database_drift(source: SupabaseSource) -> list[dict]:
+    """find_drift(), computed inside the database on one snapshot."""
+    return [
+        {
+            "game_id": row["game_id"],
+            **{column: int(row[column]) for column in SPLIT_COLUMNS},
+        }
+        for row in call_function(source, "pick_split_drift")
+    ]
+
+
+def fix_splits(source: SupabaseSource) -> int:
+    """Recount and repair pick_splits inside the database; returns the
+    number of rows it fixed."""
+    return int(call_function(source, "recount_pick_splits"))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--snapshot", action="append", default=[])
+    parser.add_argument("--fix", action="store_true")
+    args = parser.parse_args()
+
+    if args.snapshot and args.fix:
+        parser.error("--fix writes to Supabase and cannot be used with --snapshot")
+
+    if args.snapshot:
+        source = SnapshotSource(args.snapshot)
+        drift = find_drift(recount(source), stored_splits(source))
+    else:
+        source = SupabaseSource(use_cache=False)
+        drift = database_drift(source)
+
+    for row in drift:
+        print(
+            "DRIFT {game_id}: home {home_picks} away {away_picks} "
+            "over {over_picks} under {under_picks}".format(**row)
+        )
+
+    print(f"CHECKED pick splits: {len(drift)} games drifted")
+
+    if drift and args.fix:
+        print(f"FIXED {fix_splits(source)} games")
+    elif drift:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
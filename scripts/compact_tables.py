@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+# scripts/compact_tables.py
+
+"""Compact in-memory tables for grading.
+
+grade_picks.py used to hold every pick as a JSON dict keyed by UUID
+strings, several hundred bytes a row. These tables keep the same data in
+typed arrays instead:
+
+    GameTable   game UUIDs interned to dense ints; spread_home, total
+                and the final score in array("d"), NaN when missing
+    PickTable   pick UUIDs packed as 16 raw bytes; the game as an int
+                index; sides and results as one-byte codes
+
+A pick costs about 24 bytes, so tens of millions fit on a CI runner.
+PickRow is a __slots__ view of one pick for the few places that need a
+row (conditional writes, the diff report); it answers pick["id"] and
+pick.get("spread_result") like the dicts it replaces.
+"""
+
+import math
+import uuid
+from array import array
+
+
+NAN = float("nan")
+
+SIDE_CODES = {None: 0, "home": 1, "away": 2, "over": 1, "under": 2}
+SPREAD_SIDES = (None, "home", "away")
+TOTAL_SIDES = (None, "over", "under")
+
+RESULT_CODES = {None: 0, "W": 1, "L": 2, "P": 3}
+RESULTS = (None, "W", "L", "P")
+
+UUID_BYTES = 16
+
+
+def to_float(value) -> float:
+    if value is None:
+        return NAN
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return NAN
+
+
+class GameTable:
+    """Lines and final scores per game, indexed by interned game id."""
+
+    __slots__ = (
+        "index",
+        "ids",
+        "known",
+        "spread_home",
+        "total",
+        "away_score",
+        "home_score",
+    )
+
+    def __init__(self):
+        self.index = {}
+        self.ids = []
+        self.known = array("b")
+        self.spread_home = array("d")
+        self.total = array("d")
+        self.away_score = array("d")
+        self.home_score = array("d")
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def intern(self, game_id: str) -> int:
+        """Dense id for a game UUID, adding an unknown game if needed."""
+        position = self.index.get(game_id)
+
+        if position is None:
+            position = self.index[game_id] = len(self.ids)
+            self.ids.append(game_id)
+            self.known.append(0)
+            for column in (
+                self.spread_home,
+                self.total,
+                self.away_score,
+                self.home_score,
+            ):
+                column.append(NAN)
+
+        return position
+
+    def add_games(self, rows) -> None:
+        for row in rows:
+            position = self.intern(row["id"])
+            self.known[position] = 1
+            self.spread_home[position] = to_float(row.get("spread_home"))
+            self.total[position] = to_float(row.get("total"))
+
+    def add_scores(self, rows) -> None:
+        """Record final scores; in-progress (live) rows are skipped."""
+        for row in rows:
+            if row.get("status") == "live":
+                continue
+
+            away = to_float(row.get("away_score"))
+            home = to_float(row.get("home_score"))
+
+            if math.isnan(away) or math.isnan(home):
+                continue
+
+            position = self.intern(row["game_id"])
+            self.away_score[position] = away
+            self.home_score[position] = home
+
+
+class PickRow:
+    """A read-only view of one pick, standing in for its dict."""
+
+    __slots__ = (
+        "id",
+        "game_id",
+        "spread_pick",
+        "total_pick",
+        "spread_result",
+        "total_result",
+    )
+
+    def __init__(
+        self,
+        id,
+        game_id,
+        spread_pick,
+        total_pick,
+        spread_result,
+        total_result,
+    ):
+        self.id = id
+        self.game_id = game_id
+        self.spread_pick = spread_pick
+        self.total_pick = total_pick
+        self.spread_result = spread_result
+        self.total_result = total_result
+
+    def __getitem__(self, name):
+        return getattr(self, name)
+
+    def get(self, name, default=None):
+        return getattr(self, name, default)
+
+
+class PickTable:
+    """Picks as parallel typed arrays, appended to one row at a time."""
+
+    __slots__ = (
+        "games",
+        "id_bytes",
+        "other_ids",
+        "game",
+        "spread_pick",
+        "total_pick",
+        "spread_result",
+        "total_result",
+    )
+
+    def __init__(self, games: GameTable):
+        self.games = games
+        self.id_bytes = bytearray()
+        # Ids that are not UUIDs (test fixtures, hand-made snapshots).
+        self.other_ids = {}
+        self.game = array("i")
+        self.spread_pick = array("b")
+        self.total_pick = array("b")
+        self.spread_result = array("b")
+        self.total_result = array("b")
+
+    def __len__(self) -> int:
+        return len(self.game)
+
+    def append(self, row) -> None:
+        position = len(self.game)
+        pick_id = str(row["id"])
+
+        packed = None
+
+        # Postgres returns UUIDs in canonical lowercase form, which packs
+        # and unpacks without change; anything else is kept as given.
+        if len(pick_id) == 36 and pick_id == pick_id.lower():
+            try:
+                packed = bytes.fromhex(pick_id.replace("-", ""))
+            except ValueError:
+                pass
+
+        if packed is None or len(packed) != UUID_BYTES:
+            packed = bytes(UUID_BYTES)
+            self.other_ids[position] = pick_id
+
+        self.id_bytes += packed
+
+        self.game.append(self.games.intern(row["game_id"]))
+        self.spread_pick.append(SIDE_CODES.get(row.get("spread_pick"), 0))
+        self.total_pick.append(SIDE_CODES.get(row.get("total_pick"), 0))
+        self.spread_result.append(
+            RESULT_CODES.get(row.get("spread_result"), 0)
+        )
+        self.total_result.append(
+            RESULT_CODES.get(row.get("total_result"), 0)
+        )
+
+    def extend(self, rows) -> None:
+        for row in rows:
+            self.append(row)
+
+    def pick_id(self, position: int) -> str:
+        other = self.other_ids.get(position)
+        if other is not None:
+            return other
+
+        start = position * UUID_BYTES
+        packed = bytes(self.id_bytes[start:start + UUID_BYTES])
+        return str(uuid.UUID(bytes=packed))
+
+    def row(self, position: int) -> PickRow:
+        return PickRow(
+            self.pick_id(position),
+            self.games.ids[self.game[position]],
+            SPREAD_SIDES[self.spread_pick[position]],
+            TOTAL_SIDES[self.total_pick[position]],
+            RESULTS[self.spread_result[position]],
+            RESULTS[self.total_result[position]],
+        )
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+# scripts/consensus.py
+
+"""Consensus lines across sportsbooks for the weekly odds CSVs.
+
+The weekly CSV holds one row per (game_id, book). build_consensus()
+groups those rows by game in a single pass and leaves exactly one row
+per game with is_consensus = 1:
+
+    one book     that book's row is marked as the consensus row
+    more books   a derived row with book = "consensus" is added, and
+                 the book rows are marked 0
+
+A derived row takes the median spread and totals (rounded to the half
+point), the low median of each price, and the median no-vig home win
+probability across books. Every row also gets its own no-vig
+probabilities from its moneylines.
+
+OPENING_FIELDS pairs each *_open column with the line it records: the
+first value seen for that (game_id, book), kept across later pastes so
+market_analytics.py can measure line movement.
+"""
+
+from decimal import ROUND_HALF_UP, Decimal
+from statistics import median, median_low
+
+
+CONSENSUS_BOOK = "consensus"
+
+PRICE_FIELDS = (
+    "moneyline_home",
+    "moneyline_away",
+    "spread_home_odds",
+    "spread_away_odds",
+    "total_odds_over",
+    "total_odds_under",
+)
+
+OPENING_FIELDS = {
+    "spread_home_open": "spread_home",
+    "total_open": "total",
+    "moneyline_home_open": "moneyline_home",
+    "moneyline_away_open": "moneyline_away",
+}
+
+OPENING_PRICE_FIELDS = ("moneyline_home_open", "moneyline_away_open")
+
+
+def to_float(value) -> float | None:
+    try:
+        return float(str(value).strip().replace("½", ".5"))
+    except (TypeError, ValueError):
+        return None
+
+
+def implied_probability(american: float) -> float:
+    if american < 0:
+        return -american / (-american + 100)
+
+    return 100 / (american + 100)
+
+
+def no_vig_home_probability(row: dict) -> float | None:
+    home = to_float(row.get("moneyline_home"))
+    away = to_float(row.get("moneyline_away"))
+
+    if home is None or away is None or home == 0 or away == 0:
+        return None
+
+    home_implied = implied_probability(home)
+    away_implied = implied_probability(away)
+    return home_implied / (home_implied + away_implied)
+
+
+def format_spread(value: float) -> str:
+    if value == 0:
+        return "0.0"
+
+    return f"{value:+.1f}"
+
+
+def format_total(value: float) -> str:
+    return f"{value:.1f}"
+
+
+def format_price(value: float) -> str:
+    return f"{int(value):+d}"
+
+
+def half_point(value: float) -> float:
+    # Halves round away from zero (not to even), so a home and an away
+    # spread of the same size land on the same line.
+    doubled = Decimal(repr(value)) * 2
+    return float(doubled.quantize(Decimal(1), rounding=ROUND_HALF_UP) / 2)
+
+
+def derive_consensus(rows: list[dict]) -> dict:
+    consensus = dict(rows[0])
+    consensus["book"] = CONSENSUS_BOOK
+    consensus["is_consensus"] = "1"
+    consensus["updated_at_utc"] = max(
+        row.get("updated_at_utc") or "" for row in rows
+    )
+
+    spreads = [
+        value
+        for value in (to_float(row.get("spread_home")) for row in rows)
+        if value is not None
+    ]
+    totals = [
+        value
+        for value in (to_float(row.get("total")) for row in rows)
+        if value is not None
+    ]
+
+    if spreads:
+        spread_home = half_point(median(spreads))
+        consensus["spread_home"] = format_spread(spread_home)
+        consensus["spread_away"] = format_spread(-spread_home)
+
+    if totals:
+        consensus["total"] = format_total(half_point(median(totals)))
+
+    for field, formatter in (
+        ("spread_home_open", format_spread),
+        ("total_open", format_total),
+    ):
+        values = [
+            value
+            for value in (to_float(row.get(field)) for row in rows)
+            if value is not None
+        ]
+        consensus[field] = (
+            formatter(half_point(median(values))) if values else ""
+        )
+
+    for field in ("total_over", "total_under"):
+        values = [
+            value
+            for value in (to_float(row.get(field)) for row in rows)
+            if value is not None
+        ]
+        if values:
+            consensus[field] = format_total(half_point(median(values)))
+
+    for field in PRICE_FIELDS + OPENING_PRICE_FIELDS:
+        prices = [
+            value
+            for value in (to_float(row.get(field)) for row in rows)
+            if value is not None
+        ]
+        consensus[field] = format_price(median_low(prices)) if prices else ""
+
+    probabilities = [
+        value
+        for value in (no_vig_home_probability(row) for row in rows)
+        if value is not None
+    ]
+
+    if probabilities:
+        home = median(probabilities)
+        consensus["home_novig_prob"] = f"{home:.3f}"
+        consensus["away_novig_prob"] = f"{1 - home:.3f}"
+    else:
+        consensus["home_novig_prob"] = ""
+        consensus["away_novig_prob"] = ""
+
+    return consensus
+
+
+def build_consensus(rows: list[dict]) -> list[dict]:
+    """Return rows with exactly one consensus row per game.
+
+    Earlier derived rows are dropped and recomputed, so the result only
+    depends on the book rows. Games keep their first-seen order, with
+    the consensus row ahead of its books.
+    """
+    games = {}
+
+    for row in rows:
+        if (row.get("book") or "").strip() == CONSENSUS_BOOK:
+            continue
+
+        row = dict(row)
+        probability = no_vig_home_probability(row)
+
+        if probability is None:
+            row["home_novig_prob"] = ""
+            row["away_novig_prob"] = ""
+        else:
+            row["home_novig_prob"] = f"{probability:.3f}"
+            row["away_novig_prob"] = f"{1 - probability:.3f}"
+
+        games.setdefault(row.get("game_id", ""), []).append(row)
+
+    result = []
+
+    for book_rows in games.values():
+        if len(book_rows) == 1:
+            book_rows[0]["is_consensus"] = "1"
+            result.append(book_rows[0])
+            continue
+
+        for row in book_rows:
+            row["is_consensus"] = "0"
+
+        result.append(derive_consensus(book_rows))
+        result.extend(book_rows)
+
+    return result
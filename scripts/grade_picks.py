@@ -7,51 +7,150 @@ spread and total selections, and writes the results back to picks.
 Requires two environment variables:
     SUPABASE_URL
     SUPABASE_SERVICE_ROLE_KEY
+
+games and scores are read through the local replica cache in
+replica_cache.py; --no-cache reads them straight from Supabase.
+
+Only the current season (the latest in games) is graded by default, so
+picks are read from that season's partition alone; --season picks
+another and --all-seasons grades everything.
+
+With --snapshot the rows come from local backup files instead
+(docs/supabase/backup/data.sql, a pg_dump with COPY blocks, or a
+backup_incremental.py snapshot / delta in JSON lines). Nothing is
+written anywhere; the picks whose results would change are reported,
+and with --diff-out written to a CSV. --snapshot may be repeated, for
+example once for data.sql and once for a private file holding picks.
+
+--changed-out writes the ids of the picks whose results this run
+changed, one per line, so build_pick_history.py can rewrite just the
+history files of their users.
+
+--shards N --shard-index I grades only the picks whose game_id hashes
+to shard I, so N runners can split one regrade. Writes go through
+write_scheduler.WriteScheduler, which raises the number in flight while
+Supabase keeps up and backs off on 429 / 503 and timeouts; --workers
+caps it. Every write is conditional on the pick's stored results still
+being the ones that were read (or already being the new ones, so a
+retried write is harmless), so two overlapping runs never overwrite
+each other; conflicting picks are re-read and regraded, and any left
+over are reported with exit status 1.
+
+Picks are streamed into the typed-array tables of compact_tables.py
+rather than kept as dicts, so memory grows by about 24 bytes a pick.
 """
 
+import argparse
+import csv
+import json
+import math
 import os
+import re
 import sys
-
-import requests
+import threading
+import time
+import zlib
+
+from compact_tables import (
+    RESULT_CODES,
+    SPREAD_SIDES,
+    TOTAL_SIDES,
+    GameTable,
+    PickTable,
+)
+from json_stream import CHUNK_SIZE, iter_array, loads
+from replica_cache import ReplicaCache
+from write_scheduler import (
+    MAX_CONCURRENCY,
+    RETRY_STATUSES,
+    Throttled,
+    WriteScheduler,
+    retry_after,
+)
 
 TIMEOUT = 30
 
+CACHED_TABLES = ("games", "scores")
 
-def env(name):
-    value = os.environ.get(name, "").strip()
-    if not value:
-        sys.exit("Missing environment variable: " + name)
-    return value
+# grade_all(season=CURRENT_SEASON) grades the latest season in games.
+CURRENT_SEASON = "current"
 
+PICK_COLUMNS = "id,game_id,spread_pick,total_pick,spread_result,total_result"
 
-SUPABASE_URL = env("SUPABASE_URL").rstrip("/")
-SERVICE_KEY = env("SUPABASE_SERVICE_ROLE_KEY")
+# A pick that keeps conflicting after this many attempts is reported and
+# left for the next run.
+MAX_WRITE_ATTEMPTS = 3
 
-HEADERS = {
-    "apikey": SERVICE_KEY,
-    "Authorization": "Bearer " + SERVICE_KEY,
-    "Content-Type": "application/json",
+COPY_RE = re.compile(
+    r'^COPY\s+(?:"?(?P<schema>\w+)"?\.)?"?(?P<table>\w+)"?\s*'
+    r'\((?P<columns>[^)]*)\)\s+FROM\s+stdin;\s*$',
+    re.IGNORECASE,
+)
+
+COPY_ESCAPES = {
+    "b": "\b",
+    "f": "\f",
+    "n": "\n",
+    "r": "\r",
+    "t": "\t",
+    "v": "\v",
+    "\\": "\\",
 }
 
+COPY_ESCAPE_RE = re.compile(r"\\(.)")
 
-def get_all(table, select):
-    """Fetch every row of a table, 1000 at a time."""
-    rows = []
-    offset = 0
-    page = 1000
 
-    while True:
-        response = requests.get(
-            SUPABASE_URL + "/rest/v1/" + table,
-            headers=HEADERS,
-            params={
-                "select": select,
-                "offset": str(offset),
-                "limit": str(page),
-            },
+def env(name):
+    value = os.environ.get(name, "").strip()
+    if not value:
+        sys.exit("Missing environment variable: " + name)
+    return value
+
+
+class SupabaseSource:
+    """Reads from and writes to the live database over PostgREST."""
+
+    def __init__(self, use_cache=True):
+        # Imported here so offline grading runs without requests installed.
+        import requests
+
+        self.requests = requests
+        self.url = env("SUPABASE_URL").rstrip("/")
+        service_key = env("SUPABASE_SERVICE_ROLE_KEY")
+        self.headers = {
+            "apikey": service_key,
+            "Authorization": "Bearer " + service_key,
+            "Content-Type": "application/json",
+        }
+        self.cache = ReplicaCache(self.fetch_page) if use_cache else None
+
+    def close(self):
+        if self.cache is not None:
+            self.cache.close()
+
+    def fetch_page(self, table, params):
+        response = self.requests.get(
+            self.url + "/rest/v1/" + table,
+            headers=self.headers,
+            params=params,
             timeout=TIMEOUT,
         )
+        self.check_read(table, response)
+        return loads(response.content)
+
+    def stream_page(self, table, params):
+        """Like fetch_page, but yield rows as the response arrives."""
+        with self.requests.get(
+            self.url + "/rest/v1/" + table,
+            headers=self.headers,
+            params=params,
+            timeout=TIMEOUT,
+            stream=True,
+        ) as response:
+            self.check_read(table, response)
+            yield from iter_array(response.iter_content(CHUNK_SIZE))
 
+    def check_read(self, table, response):
         if response.status_code != 200:
             sys.exit(
                 "Read failed on {}: HTTP {} {}".format(
@@ -59,30 +158,266 @@ def get_all(table, select):
                 )
             )
 
-        batch = response.json()
-        rows.extend(batch)
+    def get_all(self, table, select, season=None):
+        """Fetch every row of a table, 1000 at a time; with season, only
+        that season's rows (one partition of picks or scores).
 
-        if len(batch) < page:
-            return rows
+        games and scores are served from the local replica cache, which
+        only asks Supabase for rows changed since its last refresh.
+        """
+        if (
+            self.cache is not None
+            and table in CACHED_TABLES
+            and season is None
+        ):
+            return self.cache.rows(table, select.split(","))
 
-        offset += page
+        return list(self.iter_all(table, select, season))
 
+    def iter_all(self, table, select, season=None):
+        """Yield every row of a table, decoding each page as it streams
+        in; at most one row of the table is held here at a time."""
+        offset = 0
+        page = 1000
+        params = {"select": select}
 
-def patch_pick(pick_id, spread_result, total_result):
-    response = requests.patch(
-        SUPABASE_URL + "/rest/v1/picks",
-        headers=HEADERS,
-        params={"id": "eq." + str(pick_id)},
-        json={"spread_result": spread_result, "total_result": total_result},
-        timeout=TIMEOUT,
-    )
+        if season is not None:
+            params["season"] = "eq.{}".format(season)
+
+        while True:
+            count = 0
+
+            for row in self.stream_page(
+                table,
+                dict(params, offset=str(offset), limit=str(page)),
+            ):
+                count += 1
+                yield row
+
+            if count < page:
+                return
 
-    if response.status_code not in (200, 204):
-        sys.exit(
-            "Write failed on pick {}: HTTP {} {}".format(
-                pick_id, response.status_code, response.text
+            offset += page
+
+    def get_picks(self, pick_ids):
+        return self.get_in("picks", PICK_COLUMNS, "id", pick_ids)
+
+    def get_in(self, table, select, column, values):
+        """Fetch the rows whose column is one of values, 100 values per
+        filter (well under URL length limits). Each filter is read in
+        pages ordered by id, as iter_all does, since 100 values can
+        match more rows than PostgREST returns at once."""
+        rows = []
+        values = [str(value) for value in values]
+        page = 1000
+
+        for start in range(0, len(values), 100):
+            params = {
+                "select": select,
+                column: "in.({})".format(",".join(values[start:start + 100])),
+                "order": "id",
+            }
+            offset = 0
+
+            while True:
+                batch = self.fetch_page(
+                    table,
+                    dict(params, offset=str(offset), limit=str(page)),
+                )
+                rows.extend(batch)
+
+                if len(batch) < page:
+                    break
+
+                offset += page
+
+        return rows
+
+    def patch_pick(self, pick, spread_result, total_result):
+        """Write the new results only if the stored ones are still the
+        values we graded from, or already the new ones (a retry after a
+        lost response). Returns False on a conflict."""
+
+        def match(spread_value, total_value):
+            return "and(spread_result.{},total_result.{})".format(
+                "is.null" if spread_value is None else "eq." + spread_value,
+                "is.null" if total_value is None else "eq." + total_value,
             )
-        )
+
+        params = {
+            "id": "eq." + str(pick["id"]),
+            "or": "({},{})".format(
+                match(pick.get("spread_result"), pick.get("total_result")),
+                match(spread_result, total_result),
+            ),
+        }
+
+        try:
+            response = self.requests.patch(
+                self.url + "/rest/v1/picks",
+                headers=dict(self.headers, Prefer="return=representation"),
+                params=params,
+                json={
+                    "spread_result": spread_result,
+                    "total_result": total_result,
+                },
+                timeout=TIMEOUT,
+            )
+        except (
+            self.requests.exceptions.Timeout,
+            self.requests.exceptions.ConnectionError,
+        ) as error:
+            raise Throttled("Write on pick {}: {}".format(pick["id"], error))
+
+        if response.status_code in RETRY_STATUSES:
+            raise Throttled(
+                "Write on pick {}: HTTP {}".format(
+                    pick["id"], response.status_code
+                ),
+                retry_after(response.headers.get("Retry-After")),
+            )
+
+        if response.status_code not in (200, 204):
+            sys.exit(
+                "Write failed on pick {}: HTTP {} {}".format(
+                    pick["id"], response.status_code, response.text
+                )
+            )
+
+        return response.status_code == 200 and bool(response.json())
+
+
+class SnapshotSource:
+    """Reads rows from local backup files into memory; never writes.
+
+    Rows are indexed by table and id, so later files (and later lines
+    of a delta) replace earlier versions of the same row. Writes update
+    the in-memory rows under the same conditional rule as Supabase and
+    are collected in self.changes for the diff report.
+    """
+
+    def __init__(self, paths):
+        self.tables = {}
+        self.changes = []
+        self.lock = threading.Lock()
+
+        for path in paths:
+            if path.endswith(".sql"):
+                self.load_sql(path)
+            else:
+                self.load_jsonl(path)
+
+    def close(self):
+        """Nothing to release; lets callers close either source."""
+
+    def add_row(self, table, row):
+        rows = self.tables.setdefault(table, {})
+        key = row.get("id")
+        rows[key if key is not None else len(rows)] = row
+
+    def load_sql(self, path):
+        with open(path, "r", encoding="utf-8") as file:
+            table = None
+            columns = None
+
+            for line in file:
+                line = line.rstrip("\n")
+
+                if table is None:
+                    match = COPY_RE.match(line)
+                    if match:
+                        table = match.group("table")
+                        columns = [
+                            name.strip().strip('"')
+                            for name in match.group("columns").split(",")
+                        ]
+                    continue
+
+                if line == "\\.":
+                    table = None
+                    continue
+
+                values = [
+                    None if value == "\\N" else unescape_copy(value)
+                    for value in line.split("\t")
+                ]
+                self.add_row(table, dict(zip(columns, values)))
+
+    def load_jsonl(self, path):
+        with open(path, "r", encoding="utf-8") as file:
+            for line in file:
+                line = line.strip()
+                if line:
+                    record = json.loads(line)
+                    self.add_row(record["table"], record["row"])
+
+    def season_of(self, table, row):
+        """A row's season; rows backed up before picks and scores had
+        one take it from their game."""
+        if row.get("season") is None and table != "games":
+            row = self.tables.get("games", {}).get(row.get("game_id")) or {}
+
+        season = row.get("season")
+        return None if season is None else int(season)
+
+    def get_all(self, table, select, season=None):
+        columns = [name.strip() for name in select.split(",")]
+        return [
+            {name: row.get(name) for name in columns}
+            for row in self.tables.get(table, {}).values()
+            if season is None or self.season_of(table, row) == season
+        ]
+
+    def iter_all(self, table, select, season=None):
+        return iter(self.get_all(table, select, season))
+
+    def get_picks(self, pick_ids):
+        columns = PICK_COLUMNS.split(",")
+        stored = self.tables.get("picks", {})
+        return [
+            {name: stored[pick_id].get(name) for name in columns}
+            for pick_id in pick_ids
+            if pick_id in stored
+        ]
+
+    def get_in(self, table, select, column, values):
+        columns = [name.strip() for name in select.split(",")]
+        values = {str(value) for value in values}
+        return [
+            {name: row.get(name) for name in columns}
+            for row in self.tables.get(table, {}).values()
+            if str(row.get(column)) in values
+        ]
+
+    def patch_pick(self, pick, spread_result, total_result):
+        with self.lock:
+            stored = self.tables["picks"][pick["id"]]
+
+            if (
+                stored.get("spread_result") == spread_result
+                and stored.get("total_result") == total_result
+            ):
+                return True
+
+            if (
+                stored.get("spread_result") != pick.get("spread_result")
+                or stored.get("total_result") != pick.get("total_result")
+            ):
+                return False
+
+            stored["spread_result"] = spread_result
+            stored["total_result"] = total_result
+            self.changes.append((pick, spread_result, total_result))
+            return True
+
+
+def unescape_copy(value):
+    if "\\" not in value:
+        return value
+    return COPY_ESCAPE_RE.sub(
+        lambda match: COPY_ESCAPES.get(match.group(1), match.group(1)),
+        value,
+    )
 
 
 def to_number(value):
@@ -129,74 +464,284 @@ def grade_total(pick, total_line, away_score, home_score):
     return None
 
 
-def main():
-    games = get_all("games", "id,game_id,spread_home,total")
-    scores = get_all("scores", "game_id,away_score,home_score")
-    picks = get_all(
-        "picks",
-        "id,game_id,spread_pick,total_pick,spread_result,total_result",
-    )
+def shard_of(game_id, shards):
+    """Stable shard number for a game, the same in every process."""
+    return zlib.crc32(str(game_id).encode("utf-8")) % shards
+
 
-    games_by_id = {row["id"]: row for row in games}
+def grade_pick(picks, position):
+    """Return (outcome, spread_result, total_result) for one pick of a
+    PickTable."""
+    games = picks.games
+    game = picks.game[position]
 
-    scores_by_game = {}
-    for row in scores:
-        away = to_number(row.get("away_score"))
-        home = to_number(row.get("home_score"))
-        if away is None or home is None:
-            continue
-        scores_by_game[row["game_id"]] = (away, home)
+    if not games.known[game]:
+        return "no_game", None, None
 
-    updated = 0
-    skipped_no_score = 0
-    skipped_no_game = 0
-    skipped_no_line = 0
-    unchanged = 0
+    away_score = games.away_score[game]
+    home_score = games.home_score[game]
 
-    for pick in picks:
-        game = games_by_id.get(pick["game_id"])
+    if math.isnan(away_score) or math.isnan(home_score):
+        return "no_score", None, None
 
-        if game is None:
-            skipped_no_game += 1
-            continue
+    spread_home = games.spread_home[game]
+    total_line = games.total[game]
 
-        score = scores_by_game.get(pick["game_id"])
+    if math.isnan(spread_home) or math.isnan(total_line):
+        return "no_line", None, None
 
-        if score is None:
-            skipped_no_score += 1
-            continue
+    new_spread = grade_spread(
+        SPREAD_SIDES[picks.spread_pick[position]],
+        spread_home,
+        away_score,
+        home_score,
+    )
+    new_total = grade_total(
+        TOTAL_SIDES[picks.total_pick[position]],
+        total_line,
+        away_score,
+        home_score,
+    )
 
-        away_score, home_score = score
-        spread_home = to_number(game.get("spread_home"))
-        total_line = to_number(game.get("total"))
+    if (
+        RESULT_CODES[new_spread] == picks.spread_result[position]
+        and RESULT_CODES[new_total] == picks.total_result[position]
+    ):
+        return "unchanged", new_spread, new_total
+
+    return "changed", new_spread, new_total
+
+
+def current_season(games):
+    """The latest season in games, or None when there are none."""
+    return max((int(game["season"]) for game in games), default=None)
+
+
+def grade_all(
+    source,
+    shards=1,
+    shard_index=0,
+    workers=MAX_CONCURRENCY,
+    season=CURRENT_SEASON,
+    changed=None,
+):
+    """Grade every pick of season in this shard and write the changed
+    ones back; season=None grades every season.
+
+    Writes are conditional on the stored results still matching what was
+    read. Conflicting picks are re-read and regraded; any still
+    conflicting after MAX_WRITE_ATTEMPTS are reported. Returns the
+    number of unresolved conflicts. The ids of the picks written are
+    appended to the list changed, when one is given.
+    """
+    game_rows = source.get_all("games", "id,season,spread_home,total")
+
+    if season == CURRENT_SEASON:
+        season = current_season(game_rows)
+
+    if season is not None:
+        game_rows = [
+            game for game in game_rows if int(game["season"]) == season
+        ]
+
+    game_ids = {game["id"] for game in game_rows}
+
+    games = GameTable()
+    games.add_games(game_rows)
+    # In-progress scores are graded provisionally by sync_live_scores.py,
+    # so add_scores skips them.
+    games.add_scores(
+        row
+        for row in source.get_all(
+            "scores", "game_id,away_score,home_score,status"
+        )
+        if row["game_id"] in game_ids
+    )
 
-        if spread_home is None or total_line is None:
-            skipped_no_line += 1
-            continue
+    rows = source.iter_all("picks", PICK_COLUMNS, season)
 
-        new_spread = grade_spread(
-            pick.get("spread_pick"), spread_home, away_score, home_score
+    if shards > 1:
+        rows = (
+            pick
+            for pick in rows
+            if shard_of(pick["game_id"], shards) == shard_index
         )
-        new_total = grade_total(
-            pick.get("total_pick"), total_line, away_score, home_score
+
+    picks = PickTable(games)
+    picks.extend(rows)
+
+    counts = {
+        "changed": 0,
+        "unchanged": 0,
+        "no_score": 0,
+        "no_game": 0,
+        "no_line": 0,
+    }
+    picks_read = len(picks)
+    retried = 0
+    pending = picks
+    scheduler = WriteScheduler(max_concurrency=workers)
+
+    for attempt in range(1, MAX_WRITE_ATTEMPTS + 1):
+        writes = []
+
+        for position in range(len(pending)):
+            outcome, new_spread, new_total = grade_pick(pending, position)
+
+            if outcome == "changed":
+                writes.append((pending.row(position), new_spread, new_total))
+            elif attempt == 1:
+                counts[outcome] += 1
+
+        applied = scheduler.map(
+            lambda write: source.patch_pick(*write), writes
         )
+        counts["changed"] += sum(applied)
 
-        if (
-            new_spread == pick.get("spread_result")
-            and new_total == pick.get("total_result")
-        ):
-            unchanged += 1
-            continue
-
-        patch_pick(pick["id"], new_spread, new_total)
-        updated += 1
-
-    print("Picks read:              {}".format(len(picks)))
-    print("Picks updated:           {}".format(updated))
-    print("Already correct:         {}".format(unchanged))
-    print("Skipped, no final score: {}".format(skipped_no_score))
-    print("Skipped, no game row:    {}".format(skipped_no_game))
-    print("Skipped, missing line:   {}".format(skipped_no_line))
+        if changed is not None:
+            changed.extend(
+                pick["id"]
+                for (pick, _, _), ok in zip(writes, applied)
+                if ok
+            )
+
+        conflicts = [
+            pick["id"]
+            for (pick, _, _), ok in zip(writes, applied)
+            if not ok
+        ]
+
+        if not conflicts or attempt == MAX_WRITE_ATTEMPTS:
+            break
+
+        retried += len(conflicts)
+        pending = PickTable(games)
+        pending.extend(source.get_picks(conflicts))
+
+    print("Season:                  {}".format(season or "all"))
+    print("Picks read:              {}".format(picks_read))
+    print("Picks updated:           {}".format(counts["changed"]))
+    print("Already correct:         {}".format(counts["unchanged"]))
+    print("Skipped, no final score: {}".format(counts["no_score"]))
+    print("Skipped, no game row:    {}".format(counts["no_game"]))
+    print("Skipped, missing line:   {}".format(counts["no_line"]))
+
+    if scheduler.requests:
+        scheduler.report()
+
+    if shards > 1 or retried or conflicts:
+        print("Shard:                   {} of {}".format(shard_index, shards))
+        print("Conflicts retried:       {}".format(retried))
+        print("Conflicts unresolved:    {}".format(len(conflicts)))
+
+        for pick_id in conflicts:
+            print("  conflict on pick {}".format(pick_id))
+
+    return len(conflicts)
+
+
+def write_diff(path, changes):
+    with open(path, "w", encoding="utf-8", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(
+            [
+                "pick_id",
+                "game_id",
+                "old_spread_result",
+                "new_spread_result",
+                "old_total_result",
+                "new_total_result",
+            ]
+        )
+        for pick, spread_result, total_result in changes:
+            writer.writerow(
+                [
+                    pick["id"],
+                    pick["game_id"],
+                    pick.get("spread_result") or "",
+                    spread_result or "",
+                    pick.get("total_result") or "",
+                    total_result or "",
+                ]
+            )
+
+
+def write_changed(path, pick_ids):
+    """Write the ids of the picks this run changed, one per line, for
+    build_pick_history.py."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    with open(path, "w", encoding="utf-8") as file:
+        for pick_id in pick_ids:
+            file.write("{}\n".format(pick_id))
+
+    print("Wrote changed picks:     {}".format(path))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--snapshot", action="append", default=[])
+    parser.add_argument("--diff-out")
+    parser.add_argument("--changed-out")
+    parser.add_argument("--no-cache", action="store_true")
+    parser.add_argument("--shards", type=int, default=1)
+    parser.add_argument("--shard-index", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=MAX_CONCURRENCY)
+    seasons = parser.add_mutually_exclusive_group()
+    seasons.add_argument("--season", type=int)
+    seasons.add_argument("--all-seasons", action="store_true")
+    args = parser.parse_args()
+
+    if not 0 <= args.shard_index < args.shards:
+        sys.exit("--shard-index must be between 0 and --shards - 1")
+
+    if args.all_seasons:
+        season = None
+    elif args.season is not None:
+        season = args.season
+    else:
+        season = CURRENT_SEASON
+
+    changed = []
+
+    if not args.snapshot:
+        source = SupabaseSource(use_cache=not args.no_cache)
+        try:
+            conflicts = grade_all(
+                source,
+                args.shards,
+                args.shard_index,
+                args.workers,
+                season,
+                changed,
+            )
+        finally:
+            source.close()
+        if args.changed_out:
+            write_changed(args.changed_out, changed)
+        if conflicts:
+            sys.exit(1)
+        return
+
+    started = time.perf_counter()
+    source = SnapshotSource(args.snapshot)
+    loaded = time.perf_counter()
+    grade_all(
+        source, args.shards, args.shard_index, args.workers, season, changed
+    )
+    graded = time.perf_counter()
+
+    if args.changed_out:
+        write_changed(args.changed_out, changed)
+
+    if args.diff_out:
+        write_diff(args.diff_out, source.changes)
+        print("Wrote diff:              {}".format(args.diff_out))
+
+    print("Snapshot load seconds:   {:.3f}".format(loaded - started))
+    print("Grading seconds:         {:.3f}".format(graded - loaded))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+# scripts/inbox_daemon.py
+
+"""Watch a local inbox for raw pastes and run the whole pipeline in-process.
+
+Drop a paste into the inbox named
+
+    <season>_wk<week>_odds.txt
+    <season>_wk<week>_odds_<book>.txt
+    <season>_wk<week>_scores.txt
+
+(odds without a book are filed under manual_nfl_odds.DEFAULT_BOOK) and
+the daemon runs the same stages as manual_data_input.yml without a
+workflow round trip: parse and merge the weekly CSV, copy odds to
+latest.csv, sync games or scores to Supabase, and grade picks after any
+scores. A file is picked up once its size and mtime have been stable for
+--debounce seconds, so a burst of pastes is handled as one batch with a
+single grading pass. Processed files move to inbox/processed/, failures
+to inbox/failed/ next to a .error note. Pastes go through
+submission_cache.py first: a resubmitted paste is skipped, and a
+corrected one syncs only the games that changed.
+
+With --commit the generated CSVs are committed (and with --push pushed)
+at most once every --commit-interval seconds, covering every batch
+since the last commit.
+
+Requires two environment variables:
+    SUPABASE_URL
+    SUPABASE_SERVICE_ROLE_KEY
+"""
+
+import argparse
+import re
+import shutil
+import subprocess
+import time
+import traceback
+from pathlib import Path
+
+import manual_nfl_final_scores
+import manual_nfl_odds
+from grade_picks import SupabaseSource, grade_all
+from sync_games_to_supabase import (
+    load_consensus_games,
+    require_environment_variable,
+    upsert_games,
+)
+from submission_cache import SKIP_STATUSES, SubmissionCache
+from sync_scores_to_supabase import sync_scores
+
+
+INBOX_DIR = Path("inbox")
+LATEST_PATH = Path("docs/data/weekly/latest.csv")
+
+INBOX_RE = re.compile(
+    r"^(?P<season>\d{4})_wk(?P<week>\d{1,2})_(?P<kind>odds|scores)"
+    r"(?:_(?P<book>[A-Za-z0-9-]+))?\.txt$"
+)
+
+# Odds create the games that scores are attached to.
+KIND_ORDER = {"odds": 0, "scores": 1}
+
+POLL_SECONDS = 0.2
+
+
+def ready_files(inbox: Path, seen: dict, debounce: float) -> list[Path]:
+    """Return inbox files that have not changed for debounce seconds."""
+    now = time.monotonic()
+    ready = []
+    present = set()
+
+    for path in inbox.glob("*.txt"):
+        present.add(path)
+        stat = path.stat()
+        signature = (stat.st_size, stat.st_mtime_ns)
+
+        if seen.get(path, (None,))[0] != signature:
+            seen[path] = (signature, now)
+            continue
+
+        if now - seen[path][1] >= debounce:
+            ready.append(path)
+
+    for path in list(seen):
+        if path not in present:
+            del seen[path]
+
+    if ready and len(ready) != len(present):
+        # Something in the burst is still being written; wait for it.
+        return []
+
+    return sorted(ready, key=batch_order)
+
+
+def batch_order(path: Path) -> tuple:
+    match = INBOX_RE.fullmatch(path.name)
+
+    if not match:
+        return (1, 0, 0, 0, path.name)
+
+    return (
+        0,
+        int(match.group("season")),
+        int(match.group("week")),
+        KIND_ORDER[match.group("kind")],
+        path.name,
+    )
+
+
+def process_file(path: Path) -> list[Path]:
+    """Run one paste through parse and sync; return files to commit."""
+    match = INBOX_RE.fullmatch(path.name)
+
+    if not match:
+        raise ValueError(
+            f"Unrecognised inbox file name {path.name!r}; expected "
+            "<season>_wk<week>_odds[_<book>].txt or "
+            "<season>_wk<week>_scores.txt"
+        )
+
+    if match.group("book") and match.group("kind") != "odds":
+        raise ValueError(f"Only odds take a book: {path.name!r}")
+
+    season = match.group("season")
+    week = str(int(match.group("week")))
+    kind = match.group("kind")
+    book = manual_nfl_odds.book_name(match.group("book") or "")
+    text = path.read_text(
+        encoding="utf-8",
+        errors="replace",
+    )
+    raw_lines = text.splitlines()
+
+    cache = SubmissionCache()
+    submission = cache.check(kind, "NFL", season, week, text, book)
+
+    if submission["status"] in SKIP_STATUSES:
+        print(f"SKIPPED {path.name}: {submission['status']} submission")
+        return []
+
+    changed = set(submission["changed"])
+
+    if kind == "odds":
+        output_path, row_count = manual_nfl_odds.write_week_csv(
+            raw_lines, season, week, book
+        )
+        shutil.copyfile(output_path, LATEST_PATH)
+        print(f"WROTE CSV: {output_path} ({row_count} rows)")
+
+        games = [
+            game
+            for game in load_consensus_games(LATEST_PATH)
+            if game["game_id"] in changed
+        ]
+        upsert_games(
+            require_environment_variable("SUPABASE_URL"),
+            require_environment_variable("SUPABASE_SERVICE_ROLE_KEY"),
+            games,
+        )
+        print(f"UPSERTED {len(games)} games from {LATEST_PATH}")
+        cache.record(submission["key"])
+        return [output_path, LATEST_PATH]
+
+    output_path, row_count = manual_nfl_final_scores.write_week_csv(
+        raw_lines, season, week
+    )
+    print(f"WROTE CSV: {output_path} ({row_count} rows)")
+
+    synced = sync_scores(output_path, int(season), int(week), changed)
+    print(f"SYNCED SCORES: {synced} rows")
+    cache.record(submission["key"])
+    return [output_path]
+
+
+def move_to(path: Path, folder: str) -> Path:
+    target_dir = path.parent / folder
+    target_dir.mkdir(exist_ok=True)
+    target = target_dir / f"{time.strftime('%Y%m%dT%H%M%S')}_{path.name}"
+    path.replace(target)
+    return target
+
+
+def commit_files(paths: set[Path], push: bool) -> None:
+    subprocess.run(
+        ["git", "add", "--", *sorted(str(path) for path in paths)],
+        check=True,
+    )
+
+    staged = subprocess.run(["git", "diff", "--cached", "--quiet"])
+
+    if staged.returncode == 0:
+        print("No CSV changes to commit")
+        return
+
+    subprocess.run(
+        ["git", "commit", "-m", f"Update NFL data: {len(paths)} files"],
+        check=True,
+    )
+
+    if push:
+        subprocess.run(["git", "push"], check=True)
+
+
+def grade_seasons(seasons: list[int]) -> None:
+    """Grade the partitions of the seasons whose scores changed.
+
+    A failed grading pass is logged and left for the next batch; the
+    source exits on a failed read, so SystemExit is caught as well. Each
+    batch gets a fresh source: the replica cache refreshes a table only
+    once per source, so a reused one would grade against old scores.
+    """
+    source = None
+
+    try:
+        source = SupabaseSource()
+
+        for season in seasons:
+            try:
+                grade_all(source, season=season)
+            except (Exception, SystemExit) as error:
+                print(f"GRADING FAILED for season {season}: {error}")
+                traceback.print_exc()
+    except (Exception, SystemExit) as error:
+        print(f"GRADING FAILED: {error}")
+    finally:
+        if source is not None:
+            source.close()
+
+
+def run_batch(paths: list[Path]) -> set[Path]:
+    started = time.perf_counter()
+    changed = set()
+    seasons = set()
+
+    for path in paths:
+        try:
+            files = process_file(path)
+        except Exception as error:
+            failed = move_to(path, "failed")
+            failed.with_suffix(".error").write_text(
+                "".join(traceback.format_exception(error)),
+                encoding="utf-8",
+            )
+            print(f"FAILED {path.name}: {error}")
+            continue
+
+        changed.update(files)
+        move_to(path, "processed")
+        if path.stem.endswith("_scores") and files:
+            seasons.add(batch_order(path)[1])
+
+    if seasons:
+        grade_seasons(sorted(seasons))
+
+    print(
+        f"BATCH DONE: {len(paths)} files in "
+        f"{time.perf_counter() - started:.2f}s"
+    )
+    return changed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--inbox", default=str(INBOX_DIR))
+    parser.add_argument("--debounce", type=float, default=0.5)
+    parser.add_argument("--commit", action="store_true")
+    parser.add_argument("--push", action="store_true")
+    parser.add_argument("--commit-interval", type=float, default=60.0)
+    args = parser.parse_args()
+
+    inbox = Path(args.inbox)
+    inbox.mkdir(parents=True, exist_ok=True)
+
+    seen = {}
+    uncommitted = set()
+    last_commit = time.monotonic()
+
+    print(f"WATCHING {inbox}")
+
+    try:
+        while True:
+            paths = ready_files(inbox, seen, args.debounce)
+
+            if paths:
+                uncommitted.update(run_batch(paths))
+
+            if (
+                args.commit
+                and uncommitted
+                and time.monotonic() - last_commit >= args.commit_interval
+            ):
+                commit_files(uncommitted, args.push)
+                uncommitted = set()
+                last_commit = time.monotonic()
+
+            time.sleep(POLL_SECONDS)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if args.commit and uncommitted:
+            commit_files(uncommitted, args.push)
+
+
+if __name__ == "__main__":
+    main()
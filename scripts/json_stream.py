@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+# scripts/json_stream.py
+
+"""JSON decoding for PostgREST responses.
+
+loads() and dumps() use orjson when it is installed and the standard
+json module otherwise; both accept and return the same values either
+way (dumps() always returns UTF-8 bytes).
+
+iter_array() decodes a top-level JSON array incrementally from byte
+chunks and yields each element as soon as its closing bracket has
+arrived, so callers can work through a page of rows while the rest of
+it is still downloading and never hold more than one undecoded chunk
+plus one row. orjson has no incremental API, so elements are decoded
+with the standard library's C scanner (json.JSONDecoder.raw_decode).
+"""
+
+import codecs
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+CHUNK_SIZE = 64 * 1024
+
+# Drop consumed text from the buffer once this much has piled up.
+COMPACT_AT = 256 * 1024
+
+WHITESPACE = " \t\n\r"
+
+# What may follow an element: a number or literal has only ended once
+# one of these (or the end of the body) has arrived.
+DELIMITERS = WHITESPACE + ",]"
+
+_decoder = json.JSONDecoder()
+
+
+def loads(data):
+    if orjson is not None:
+        return orjson.loads(data)
+    if isinstance(data, (bytes, bytearray)):
+        data = data.decode("utf-8")
+    return json.loads(data)
+
+
+def dumps(value) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, separators=(",", ":")).encode("utf-8")
+
+
+def read_chunks(response, size: int = CHUNK_SIZE):
+    """Yield a file-like response (urllib) in chunks of up to size."""
+    while True:
+        chunk = response.read(size)
+        if not chunk:
+            return
+        yield chunk
+
+
+def iter_array(chunks):
+    """Yield the elements of a JSON array spread over byte chunks.
+
+    An empty body yields nothing, like an empty array.
+    """
+    text = codecs.getincrementaldecoder("utf-8")()
+    chunks = iter(chunks)
+    buffer = ""
+    position = 0
+    finished = False
+    # "start" before "[", "value" after "[" or ",", "next" after a value.
+    state = "start"
+
+    def more() -> bool:
+        nonlocal buffer, position, finished
+
+        if finished:
+            return False
+
+        if position >= COMPACT_AT:
+            buffer = buffer[position:]
+            position = 0
+
+        chunk = next(chunks, None)
+
+        if chunk is None:
+            finished = True
+            buffer += text.decode(b"", final=True)
+        else:
+            buffer += text.decode(chunk)
+
+        return True
+
+    while True:
+        while position < len(buffer) and buffer[position] in WHITESPACE:
+            position += 1
+
+        if position >= len(buffer):
+            if more():
+                continue
+            if state == "start":
+                return
+            raise ValueError("JSON array ended before its closing bracket")
+
+        character = buffer[position]
+
+        if state == "start":
+            if character != "[":
+                raise ValueError(f"Expected a JSON array, found {character!r}")
+            position += 1
+            state = "first"
+            continue
+
+        if character == "]" and state in ("first", "next"):
+            return
+
+        if state == "next":
+            if character != ",":
+                raise ValueError(f"Expected ',' or ']', found {character!r}")
+            position += 1
+            state = "value"
+            continue
+
+        try:
+            value, end = _decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError:
+            if more():
+                continue
+            raise
+
+        # A number or literal cut off by the end of the buffer may go on
+        # in the next chunk ("44." then "5"), even when its head already
+        # decodes; objects, arrays and strings are self-delimiting.
+        if not finished and not isinstance(value, (dict, list, str)):
+            delimiter = end
+            while (
+                delimiter < len(buffer)
+                and buffer[delimiter] not in DELIMITERS
+            ):
+                delimiter += 1
+
+            if delimiter == len(buffer):
+                more()
+                continue
+
+        position = end
+        state = "next"
+        yield value
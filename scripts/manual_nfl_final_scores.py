@@ -7,8 +7,9 @@ import re
 from datetime import datetime
 from pathlib import Path
 
+from parser_engine import LAYOUTS, get_layout, parse_blocks
+from teams import get_registry
 
-OUT_DIR = Path("docs/data/scores")
 
 CSV_HEADERS = [
     "season",
@@ -21,58 +22,13 @@ CSV_HEADERS = [
     "away_score",
 ]
 
-DATE_RE = re.compile(r"^\d{2}/\d{2}/\d{4}$")
 INTEGER_RE = re.compile(r"^\d+$")
 
-IGNORE_LINES = {
-    "Time\tTeams\tWin\tBest",
-    "ML\tBest",
-    "Spread\tFinal",
-    "Points\tSportsbook",
-    "Log Loss\tDRatings",
-    "Log Loss",
-}
-
 
 def split_tabs(value: str) -> list[str]:
     return [part.strip() for part in value.split("\t") if part.strip()]
 
 
-def clean_raw_lines(raw_lines: list[str]) -> list[str]:
-    cleaned = []
-
-    for raw_line in raw_lines:
-        line = raw_line.strip()
-
-        if not line:
-            continue
-
-        if line in IGNORE_LINES:
-            continue
-
-        cleaned.append(line)
-
-    return cleaned
-
-
-def split_into_game_blocks(lines: list[str]) -> list[list[str]]:
-    blocks = []
-    current = []
-
-    for line in lines:
-        if DATE_RE.fullmatch(line):
-            if current:
-                blocks.append(current)
-            current = [line]
-        elif current:
-            current.append(line)
-
-    if current:
-        blocks.append(current)
-
-    return blocks
-
-
 def normalize_game_date(value: str) -> str:
     parsed = datetime.strptime(value.strip(), "%m/%d/%Y")
     return parsed.strftime("%Y_%m_%d")
@@ -114,15 +70,18 @@ def build_game_id(game_date: str, home_team: str, away_team: str) -> str:
     return f"{game_date}_{home_team}_{away_team}"
 
 
-def parse_game_block(block: list[str], season: str, week: str) -> dict:
-    if len(block) < 10:
-        raise ValueError(f"Incomplete NFL final-score game block: {block}")
-
-    game_date = normalize_game_date(block[0])
-    away_team = parse_away_team(block[1])
-    home_team = parse_home_team(block[2])
-    away_score = parse_score(block[8], "away_score")
-    home_score = parse_score(block[9], "home_score")
+def parse_game_block(
+    fields: dict,
+    season: str,
+    week: str,
+    league: str = "NFL",
+) -> dict:
+    teams = get_registry(league)
+    game_date = normalize_game_date(fields["game_date"])
+    away_team = teams.canonical(parse_away_team(fields["away_team"]))
+    home_team = teams.canonical(parse_home_team(fields["home_team"]))
+    away_score = parse_score(fields["away_score"], "away_score")
+    home_score = parse_score(fields["home_score"], "home_score")
 
     return {
         "season": season,
@@ -136,16 +95,22 @@ def parse_game_block(block: list[str], season: str, week: str) -> dict:
     }
 
 
-def parse_rows(raw_lines: list[str], season: str, week: str) -> list[dict]:
-    cleaned_lines = clean_raw_lines(raw_lines)
-    blocks = split_into_game_blocks(cleaned_lines)
-
-    rows = []
-
-    for block in blocks:
-        rows.append(parse_game_block(block, season, week))
-
-    return rows
+def parse_rows(
+    raw_lines,
+    season: str,
+    week: str,
+    league: str = "NFL",
+) -> list[dict]:
+    return list(
+        parse_blocks(
+            raw_lines,
+            get_layout(league, "scores"),
+            parse_game_block,
+            season,
+            week,
+            league,
+        )
+    )
 
 
 def read_existing_rows(path: Path) -> list[dict]:
@@ -203,12 +168,37 @@ def validate_numeric(value: str, field_name: str) -> str:
     return value
 
 
+def write_week_csv(
+    raw_lines: list[str],
+    season: str,
+    week: str,
+    league: str = "NFL",
+) -> tuple[Path, int]:
+    incoming_rows = parse_rows(raw_lines, season, week, league)
+
+    if not incoming_rows:
+        raise ValueError(
+            f"No {league} final-score rows were parsed from raw input"
+        )
+
+    out_dir = get_layout(league, "scores").out_dir / "scores"
+    output_path = out_dir / f"{season}_wk{int(week):02d}_scores.csv"
+
+    existing_rows = read_existing_rows(output_path)
+    final_rows = merge_rows(existing_rows, incoming_rows)
+
+    write_csv(output_path, final_rows)
+
+    return output_path, len(final_rows)
+
+
 def main() -> None:
     parser = argparse.ArgumentParser()
 
     parser.add_argument("--season", required=True)
     parser.add_argument("--week", required=True)
     parser.add_argument("--raw-file", required=True)
+    parser.add_argument("--league", default="NFL", choices=sorted(LAYOUTS))
 
     args = parser.parse_args()
 
@@ -224,19 +214,11 @@ def main() -> None:
         errors="replace",
     ).splitlines()
 
-    incoming_rows = parse_rows(raw_lines, season, week)
-
-    if not incoming_rows:
-        raise ValueError("No NFL final-score rows were parsed from raw input")
-
-    output_path = OUT_DIR / f"{season}_wk{int(week):02d}_scores.csv"
-
-    existing_rows = read_existing_rows(output_path)
-    final_rows = merge_rows(existing_rows, incoming_rows)
-
-    write_csv(output_path, final_rows)
+    output_path, row_count = write_week_csv(
+        raw_lines, season, week, args.league
+    )
 
-    print(f"WROTE CSV: {output_path} ({len(final_rows)} rows)")
+    print(f"WROTE CSV: {output_path} ({row_count} rows)")
 
 
 if __name__ == "__main__":
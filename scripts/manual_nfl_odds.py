@@ -8,8 +8,10 @@ from datetime import datetime, timezone
 from pathlib import Path
 from zoneinfo import ZoneInfo
 
+from consensus import CONSENSUS_BOOK, OPENING_FIELDS, build_consensus
+from parser_engine import LAYOUTS, get_layout, parse_blocks
+from teams import get_registry
 
-OUT_DIR = Path("docs/data/weekly")
 
 CSV_HEADERS = [
     "season",
@@ -39,10 +41,13 @@ CSV_HEADERS = [
     "away_projected_score",
     "home_projected_score",
     "total_projected_score",
+    "home_novig_prob",
+    "away_novig_prob",
+    *OPENING_FIELDS,
 ]
 
-DATE_RE = re.compile(r"^\d{2}/\d{2}/\d{4}$")
-TIME_RE = re.compile(r"^\d{1,2}:\d{2}\s*(AM|PM)$", re.IGNORECASE)
+DEFAULT_BOOK = "NA"
+
 PERCENT_RE = re.compile(r"(\d+(?:\.\d+)?)%")
 MONEYLINE_RE = re.compile(r"^[+-]\d+$")
 MARKET_RE = re.compile(
@@ -52,55 +57,11 @@ MARKET_RE = re.compile(
 )
 RECORD_RE = re.compile(r"\s*\([^)]*\)\s*$")
 
-IGNORE_LINES = {
-    "Time\tTeams\tQuarterbacks\tWin\tBest",
-    "ML\tBest",
-    "Spread\tPoints\tTotal",
-    "Points\tBest",
-    "O/U\tBet",
-    "Value\tMore Details",
-}
-
 
 def split_tabs(value: str) -> list[str]:
     return [part.strip() for part in value.split("\t") if part.strip()]
 
 
-def clean_raw_lines(raw_lines: list[str]) -> list[str]:
-    cleaned = []
-
-    for raw_line in raw_lines:
-        line = raw_line.strip()
-
-        if not line:
-            continue
-
-        if line in IGNORE_LINES:
-            continue
-
-        cleaned.append(line)
-
-    return cleaned
-
-
-def split_into_game_blocks(lines: list[str]) -> list[list[str]]:
-    blocks = []
-    current = []
-
-    for line in lines:
-        if DATE_RE.fullmatch(line):
-            if current:
-                blocks.append(current)
-            current = [line]
-        elif current:
-            current.append(line)
-
-    if current:
-        blocks.append(current)
-
-    return blocks
-
-
 def clean_team(value: str) -> str:
     parts = split_tabs(value)
     first_field = parts[0] if parts else value.strip()
@@ -201,40 +162,40 @@ def build_game_id(game_date: str, home_team: str, away_team: str) -> str:
 
 
 def parse_game_block(
-    block: list[str],
+    fields: dict,
     season: str,
     week: str,
     updated_at_utc: str,
+    book: str = DEFAULT_BOOK,
+    league: str = "NFL",
 ) -> dict:
-    if len(block) < 14:
-        raise ValueError(f"Incomplete NFL odds game block: {block}")
-
-    game_date_raw = block[0]
-    game_time_raw = block[1]
-
-    if not DATE_RE.fullmatch(game_date_raw):
-        raise ValueError(f"Invalid game date: {game_date_raw}")
+    game_date_raw = fields["game_date"]
+    game_time_raw = fields["game_time"]
 
-    if not TIME_RE.fullmatch(game_time_raw):
-        raise ValueError(f"Invalid game time: {game_time_raw}")
+    teams = get_registry(league)
+    away_team = teams.canonical(clean_team(fields["away_team"]))
+    home_team = teams.canonical(clean_team(fields["home_team"]))
 
-    away_team = clean_team(block[2])
-    home_team = clean_team(block[3])
+    away_prob = probability_to_decimal(fields["away_prob"])
+    home_prob = probability_to_decimal(fields["home_prob"])
 
-    away_prob = probability_to_decimal(block[4])
-    home_prob = probability_to_decimal(block[5])
+    moneyline_away = parse_moneyline(fields["moneyline_away"])
+    moneyline_home = parse_moneyline(fields["moneyline_home"])
 
-    moneyline_away = parse_moneyline(block[6])
-    moneyline_home = parse_moneyline(block[7])
+    spread_away, spread_away_odds = parse_market_line(fields["spread_away"])
+    spread_home, spread_home_odds = parse_market_line(fields["spread_home"])
 
-    spread_away, spread_away_odds = parse_market_line(block[8])
-    spread_home, spread_home_odds = parse_market_line(block[9])
+    away_projected_score = fields["away_projected_score"].strip()
+    home_projected_score, total_projected_score = parse_projected_pair(
+        fields["home_total_projected"]
+    )
 
-    away_projected_score = block[10].strip()
-    home_projected_score, total_projected_score = parse_projected_pair(block[11])
-
-    total_over, total_odds_over = parse_market_line(block[12], expected_prefix="o")
-    total_under, total_odds_under = parse_market_line(block[13], expected_prefix="u")
+    total_over, total_odds_over = parse_market_line(
+        fields["total_over"], expected_prefix="o"
+    )
+    total_under, total_odds_under = parse_market_line(
+        fields["total_under"], expected_prefix="u"
+    )
 
     game_date = normalize_game_date(game_date_raw)
     game_time = normalize_game_time(game_time_raw)
@@ -246,7 +207,7 @@ def parse_game_block(
         "commence_time_utc": to_utc_iso(game_date_raw, game_time_raw),
         "home_team": home_team,
         "away_team": away_team,
-        "book": "NA",
+        "book": book,
         "spread_home": spread_home,
         "spread_away": spread_away,
         "total": total_over,
@@ -271,18 +232,25 @@ def parse_game_block(
 
 
 def parse_rows(
-    raw_lines: list[str],
+    raw_lines,
     season: str,
     week: str,
     updated_at_utc: str,
+    book: str = DEFAULT_BOOK,
+    league: str = "NFL",
 ) -> list[dict]:
-    cleaned_lines = clean_raw_lines(raw_lines)
-    blocks = split_into_game_blocks(cleaned_lines)
-
-    return [
-        parse_game_block(block, season, week, updated_at_utc)
-        for block in blocks
-    ]
+    return list(
+        parse_blocks(
+            raw_lines,
+            get_layout(league, "odds"),
+            parse_game_block,
+            season,
+            week,
+            updated_at_utc,
+            book,
+            league,
+        )
+    )
 
 
 def read_existing_rows(path: Path) -> list[dict]:
@@ -293,25 +261,56 @@ def read_existing_rows(path: Path) -> list[dict]:
         return list(csv.DictReader(file))
 
 
+def book_name(value: str) -> str:
+    """The book a paste is filed under; DEFAULT_BOOK when blank."""
+    book = value.strip() or DEFAULT_BOOK
+
+    if book == CONSENSUS_BOOK:
+        raise ValueError(f"Book name {CONSENSUS_BOOK!r} is reserved")
+
+    return book
+
+
+def row_key(row: dict) -> tuple[str, str]:
+    return row.get("game_id", ""), row.get("book") or DEFAULT_BOOK
+
+
+def with_opening(row: dict, previous: dict | None) -> dict:
+    """Keep the first line seen for this (game_id, book) in *_open."""
+    row = dict(row)
+
+    for open_field, field in OPENING_FIELDS.items():
+        if previous is None:
+            row[open_field] = row.get(field, "")
+        else:
+            row[open_field] = previous.get(open_field) or previous.get(field, "")
+
+    return row
+
+
 def merge_rows(existing_rows: list[dict], incoming_rows: list[dict]) -> list[dict]:
-    incoming_by_id = {row["game_id"]: row for row in incoming_rows}
+    """Replace or add one row per (game_id, book), then rebuild consensus."""
+    incoming_by_key = {row_key(row): row for row in incoming_rows}
     merged = []
-    replaced_ids = set()
+    replaced_keys = set()
 
     for row in existing_rows:
-        game_id = row.get("game_id", "")
+        if row.get("book") == CONSENSUS_BOOK:
+            continue
+
+        key = row_key(row)
 
-        if game_id in incoming_by_id:
-            merged.append(incoming_by_id[game_id])
-            replaced_ids.add(game_id)
+        if key in incoming_by_key:
+            merged.append(with_opening(incoming_by_key[key], row))
+            replaced_keys.add(key)
         else:
-            merged.append(row)
+            merged.append(with_opening(row, row))
 
     for row in incoming_rows:
-        if row["game_id"] not in replaced_ids:
-            merged.append(row)
+        if row_key(row) not in replaced_keys:
+            merged.append(with_opening(row, None))
 
-    return merged
+    return build_consensus(merged)
 
 
 def write_csv(path: Path, rows: list[dict]) -> None:
@@ -336,11 +335,37 @@ def validate_numeric(value: str, field_name: str) -> str:
     return value
 
 
+def write_week_csv(
+    raw_lines: list[str],
+    season: str,
+    week: str,
+    book: str = DEFAULT_BOOK,
+    league: str = "NFL",
+) -> tuple[Path, int]:
+    updated_at_utc = datetime.now(timezone.utc).isoformat(timespec="seconds")
+    incoming_rows = parse_rows(
+        raw_lines, season, week, updated_at_utc, book, league
+    )
+
+    if not incoming_rows:
+        raise ValueError(f"No {league} odds rows were parsed from raw input")
+
+    out_dir = get_layout(league, "odds").out_dir / "weekly"
+    output_path = out_dir / f"{season}_wk{int(week):02d}_odds.csv"
+    existing_rows = read_existing_rows(output_path)
+    final_rows = merge_rows(existing_rows, incoming_rows)
+
+    write_csv(output_path, final_rows)
+    return output_path, len(final_rows)
+
+
 def main() -> None:
     parser = argparse.ArgumentParser()
     parser.add_argument("--season", required=True)
     parser.add_argument("--week", required=True)
     parser.add_argument("--raw-file", required=True)
+    parser.add_argument("--book", default=DEFAULT_BOOK)
+    parser.add_argument("--league", default="NFL", choices=sorted(LAYOUTS))
     args = parser.parse_args()
 
     season = validate_numeric(args.season, "Season")
@@ -355,18 +380,10 @@ def main() -> None:
         errors="replace",
     ).splitlines()
 
-    updated_at_utc = datetime.now(timezone.utc).isoformat(timespec="seconds")
-    incoming_rows = parse_rows(raw_lines, season, week, updated_at_utc)
-
-    if not incoming_rows:
-        raise ValueError("No NFL odds rows were parsed from raw input")
-
-    output_path = OUT_DIR / f"{season}_wk{int(week):02d}_odds.csv"
-    existing_rows = read_existing_rows(output_path)
-    final_rows = merge_rows(existing_rows, incoming_rows)
-
-    write_csv(output_path, final_rows)
-    print(f"WROTE CSV: {output_path} ({len(final_rows)} rows)")
+    output_path, row_count = write_week_csv(
+        raw_lines, season, week, book_name(args.book), args.league
+    )
+    print(f"WROTE CSV: {output_path} ({row_count} rows)")
 
 
 if __name__ == "__main__":
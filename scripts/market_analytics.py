@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+# scripts/market_analytics.py
+
+"""Market analytics over the weekly odds archive.
+
+Loads every docs/data/weekly/<season>_wk<week>_odds.csv of a season
+into NumPy columns (float64 for numbers, NaN where a value is missing)
+and derives, a column at a time, with array operations:
+
+    implied / no-vig probabilities from the moneylines
+    hold of the moneyline, spread and total markets
+    model edges: projected margin + spread_home, projected total - total,
+                 and home_prob - no-vig home probability
+    line movement from the *_open columns to the latest line
+
+The result is published to docs/data/market/<season>.json: per-game
+columns for the consensus rows, average hold per book and a season
+summary. A season is only recomputed when the hash of its CSVs changes.
+
+    python scripts/market_analytics.py                 every season
+    python scripts/market_analytics.py --season 2026   one season
+"""
+
+import argparse
+import csv
+import hashlib
+import json
+import re
+import time
+from pathlib import Path
+
+import numpy
+
+from consensus import CONSENSUS_BOOK
+
+
+DATA_DIR = Path("docs/data/weekly")
+OUT_DIR = Path("docs/data/market")
+
+# Bump when the derived columns change so cached seasons are rebuilt.
+ANALYTICS_VERSION = 1
+
+WEEK_FILE_RE = re.compile(r"^(?P<season>\d{4})_wk(?P<week>\d{2})_odds\.csv$")
+
+NAN = float("nan")
+
+NUMERIC_COLUMNS = (
+    "week",
+    "spread_home",
+    "total",
+    "moneyline_home",
+    "moneyline_away",
+    "home_prob",
+    "away_prob",
+    "spread_home_odds",
+    "spread_away_odds",
+    "total_odds_over",
+    "total_odds_under",
+    "away_projected_score",
+    "home_projected_score",
+    "total_projected_score",
+    "spread_home_open",
+    "total_open",
+    "moneyline_home_open",
+    "moneyline_away_open",
+)
+
+TEXT_COLUMNS = ("game_id", "book", "home_team", "away_team", "is_consensus")
+
+GAME_EXPORT_COLUMNS = (
+    "game_id",
+    "week",
+    "home_team",
+    "away_team",
+    "spread_home",
+    "total",
+    "home_prob",
+    "home_novig_prob",
+    "prob_edge",
+    "projected_margin",
+    "spread_edge",
+    "total_edge",
+    "spread_move",
+    "total_move",
+    "home_prob_move",
+    "moneyline_hold",
+    "spread_hold",
+    "total_hold",
+)
+
+HOLD_COLUMNS = ("moneyline_hold", "spread_hold", "total_hold")
+
+
+def to_value(text: str | None) -> float:
+    try:
+        return float(str(text).strip().replace("½", ".5"))
+    except (TypeError, ValueError):
+        return NAN
+
+
+def implied(prices: numpy.ndarray) -> numpy.ndarray:
+    """American prices to implied probabilities; NaN for 0 or missing."""
+    with numpy.errstate(divide="ignore", invalid="ignore"):
+        return numpy.where(
+            prices < 0,
+            -prices / (100 - prices),
+            numpy.where(prices > 0, 100 / (prices + 100), NAN),
+        )
+
+
+def divided(first: numpy.ndarray, second: numpy.ndarray) -> numpy.ndarray:
+    """first / second, NaN where second is 0."""
+    with numpy.errstate(divide="ignore", invalid="ignore"):
+        return numpy.where(second != 0, first / second, NAN)
+
+
+def mean(values: numpy.ndarray) -> float | None:
+    present = values[~numpy.isnan(values)]
+    return round(float(present.mean()), 4) if present.size else None
+
+
+def load_columns(paths: list[Path]) -> dict:
+    """Read the CSVs into one set of columns, in file then row order."""
+    values = {name: [] for name in NUMERIC_COLUMNS + TEXT_COLUMNS}
+
+    for path in paths:
+        with path.open("r", encoding="utf-8", newline="") as file:
+            for row in csv.DictReader(file):
+                for name in NUMERIC_COLUMNS:
+                    values[name].append(to_value(row.get(name)))
+                for name in TEXT_COLUMNS:
+                    values[name].append(row.get(name) or "")
+
+    columns = {
+        name: numpy.array(values[name], dtype=numpy.float64)
+        for name in NUMERIC_COLUMNS
+    }
+    columns.update(
+        {name: numpy.array(values[name], dtype=str) for name in TEXT_COLUMNS}
+    )
+    return columns
+
+
+def derive(columns: dict) -> dict:
+    """Add the probability, hold, edge and movement columns."""
+    home_implied = implied(columns["moneyline_home"])
+    away_implied = implied(columns["moneyline_away"])
+    moneyline_book = home_implied + away_implied
+    home_novig = divided(home_implied, moneyline_book)
+
+    spread_book = implied(columns["spread_home_odds"]) + implied(
+        columns["spread_away_odds"]
+    )
+    total_book = implied(columns["total_odds_over"]) + implied(
+        columns["total_odds_under"]
+    )
+
+    open_home_implied = implied(columns["moneyline_home_open"])
+    open_novig = divided(
+        open_home_implied,
+        open_home_implied + implied(columns["moneyline_away_open"]),
+    )
+
+    projected_margin = (
+        columns["home_projected_score"] - columns["away_projected_score"]
+    )
+
+    columns["home_implied_prob"] = home_implied
+    columns["away_implied_prob"] = away_implied
+    columns["home_novig_prob"] = home_novig
+    columns["moneyline_hold"] = moneyline_book - 1.0
+    columns["spread_hold"] = spread_book - 1.0
+    columns["total_hold"] = total_book - 1.0
+    columns["projected_margin"] = projected_margin
+    # Positive: the model likes the home side against the spread.
+    columns["spread_edge"] = projected_margin + columns["spread_home"]
+    # Positive: the model projects more points than the market total.
+    columns["total_edge"] = columns["total_projected_score"] - columns["total"]
+    columns["prob_edge"] = columns["home_prob"] - home_novig
+    columns["spread_move"] = columns["spread_home"] - columns["spread_home_open"]
+    columns["total_move"] = columns["total"] - columns["total_open"]
+    columns["home_prob_move"] = home_novig - open_novig
+    return columns
+
+
+def export_column(values: numpy.ndarray) -> list:
+    """A column as JSON values: floats to 4 places, NaN as null."""
+    if values.dtype.kind != "f":
+        return values.tolist()
+
+    rounded = numpy.round(values, 4).tolist()
+    return [None if value != value else value for value in rounded]
+
+
+def summarize(columns: dict) -> dict:
+    consensus = columns["is_consensus"] == "1"
+
+    games = {
+        name: export_column(columns[name][consensus])
+        for name in GAME_EXPORT_COLUMNS
+    }
+    # A row whose week is missing keeps a null week.
+    games["week"] = [
+        None if week is None else int(week) for week in games["week"]
+    ]
+
+    books = columns["book"]
+    book_holds = {}
+
+    for book in sorted(set(books.tolist()) - {"", CONSENSUS_BOOK}):
+        rows = books == book
+        book_holds[book] = {
+            "rows": int(numpy.count_nonzero(rows)),
+            **{name: mean(columns[name][rows]) for name in HOLD_COLUMNS},
+        }
+
+    def consensus_mean(name: str, transform=numpy.abs) -> float | None:
+        return mean(transform(columns[name][consensus]))
+
+    def consensus_count(name: str) -> int:
+        # NaN != 0 is true, so missing values are excluded first.
+        values = columns[name][consensus]
+        return int(numpy.count_nonzero(~numpy.isnan(values) & (values != 0)))
+
+    return {
+        "games": games,
+        "books": book_holds,
+        "summary": {
+            "games": int(numpy.count_nonzero(consensus)),
+            "mean_abs_spread_edge": consensus_mean("spread_edge"),
+            "mean_abs_total_edge": consensus_mean("total_edge"),
+            "mean_abs_prob_edge": consensus_mean("prob_edge"),
+            "mean_moneyline_hold": consensus_mean(
+                "moneyline_hold", numpy.asarray
+            ),
+            "spread_moved": consensus_count("spread_move"),
+            "total_moved": consensus_count("total_move"),
+        },
+    }
+
+
+def season_files(data_dir: Path) -> dict:
+    seasons = {}
+
+    for path in sorted(data_dir.glob("*_odds.csv")):
+        match = WEEK_FILE_RE.fullmatch(path.name)
+        if match:
+            seasons.setdefault(int(match.group("season")), []).append(path)
+
+    return seasons
+
+
+def files_hash(paths: list[Path]) -> str:
+    digest = hashlib.sha256(f"v{ANALYTICS_VERSION}".encode("utf-8"))
+
+    for path in paths:
+        digest.update(path.name.encode("utf-8"))
+        digest.update(path.read_bytes())
+
+    return digest.hexdigest()
+
+
+def build_season(season: int, paths: list[Path], out_dir: Path) -> bool:
+    """Recompute one season; return False when its export is current."""
+    out_path = out_dir / f"{season}.json"
+    digest = files_hash(paths)
+
+    if out_path.exists():
+        try:
+            current = json.loads(out_path.read_text(encoding="utf-8"))
+        except json.JSONDecodeError:
+            current = {}
+
+        if current.get("hash") == digest:
+            return False
+
+    document = {
+        "season": season,
+        "hash": digest,
+        **summarize(derive(load_columns(paths))),
+    }
+
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    out_path.write_text(
+        json.dumps(document, separators=(",", ":"), sort_keys=True),
+        encoding="utf-8",
+    )
+    return True
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--season", type=int)
+    parser.add_argument("--data-dir", default=str(DATA_DIR))
+    parser.add_argument("--out-dir", default=str(OUT_DIR))
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    seasons = season_files(Path(args.data_dir))
+
+    if args.season is not None:
+        seasons = {args.season: seasons.get(args.season, [])}
+
+    rebuilt = 0
+
+    for season, paths in sorted(seasons.items()):
+        if not paths:
+            print(f"No odds CSVs for {season}")
+            continue
+
+        if build_season(season, paths, Path(args.out_dir)):
+            rebuilt += 1
+            print(f"WROTE {Path(args.out_dir) / f'{season}.json'}")
+
+    print(
+        f"MARKET ANALYTICS: {len(seasons)} seasons, {rebuilt} rebuilt "
+        f"in {time.perf_counter() - started:.3f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
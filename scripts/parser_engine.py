@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+# scripts/parser_engine.py
+
+"""League layouts for the raw DRatings-style pastes.
+
+A paste is a run of game blocks. Each block starts on a line matching
+the layout's block_start pattern and continues until the next one.
+Lines that are blank or listed in ignore_lines are skipped. A layout
+names the line of the block each field comes from and, optionally, a
+pattern that line must match.
+
+LAYOUTS holds plain specs; get_layout() compiles one on first use and
+caches it, so the patterns are compiled once per process. iter_blocks()
+and parse_blocks() stream: they read the raw lines once and never hold
+more than the current block.
+
+    python scripts/parser_engine.py --check Football NFL
+
+exits 0 when a sport and league have layouts, for the workflow's
+validation step; --out-dir LEAGUE prints where that league's CSVs go.
+"""
+
+import argparse
+import re
+from functools import lru_cache
+from pathlib import Path
+
+
+DATE_PATTERN = r"^\d{2}/\d{2}/\d{4}$"
+TIME_PATTERN = r"^\d{1,2}:\d{2}\s*(AM|PM)$"
+
+DRATINGS_ODDS_FIELDS = [
+    ("game_date", 0, DATE_PATTERN),
+    ("game_time", 1, TIME_PATTERN),
+    ("away_team", 2, None),
+    ("home_team", 3, None),
+    ("away_prob", 4, None),
+    ("home_prob", 5, None),
+    ("moneyline_away", 6, None),
+    ("moneyline_home", 7, None),
+    ("spread_away", 8, None),
+    ("spread_home", 9, None),
+    ("away_projected_score", 10, None),
+    ("home_total_projected", 11, None),
+    ("total_over", 12, None),
+    ("total_under", 13, None),
+]
+
+DRATINGS_SCORES_FIELDS = [
+    ("game_date", 0, DATE_PATTERN),
+    ("away_team", 1, None),
+    ("home_team", 2, None),
+    ("away_score", 8, None),
+    ("home_score", 9, None),
+]
+
+DRATINGS_SCORES_IGNORE = [
+    "Time\tTeams\tWin\tBest",
+    "ML\tBest",
+    "Spread\tFinal",
+    "Points\tSportsbook",
+    "Log Loss\tDRatings",
+    "Log Loss",
+]
+
+LAYOUTS = {
+    "NFL": {
+        "sport": "Football",
+        "out_dir": "docs/data",
+        # Canonical names and ids for teams.py.
+        "team_file": "docs/mappings/team_abbr.csv",
+        "alias_file": "docs/mappings/team_aliases.csv",
+        "week_types": [
+            ("regular", 1, 18),
+            ("playoff", 19, 22),
+        ],
+        "odds": {
+            "block_start": DATE_PATTERN,
+            "ignore_lines": [
+                "Time\tTeams\tQuarterbacks\tWin\tBest",
+                "ML\tBest",
+                "Spread\tPoints\tTotal",
+                "Points\tBest",
+                "O/U\tBet",
+                "Value\tMore Details",
+            ],
+            "fields": DRATINGS_ODDS_FIELDS,
+        },
+        "scores": {
+            "block_start": DATE_PATTERN,
+            "ignore_lines": DRATINGS_SCORES_IGNORE,
+            "fields": DRATINGS_SCORES_FIELDS,
+        },
+    },
+    # College pages use the NFL block shape without the quarterbacks
+    # column; bowls and the playoff follow the regular season.
+    "NCAAF": {
+        "sport": "Football",
+        "out_dir": "docs/data/ncaaf",
+        "week_types": [
+            ("regular", 1, 16),
+            ("playoff", 17, 22),
+        ],
+        "odds": {
+            "block_start": DATE_PATTERN,
+            "ignore_lines": [
+                "Time\tTeams\tWin\tBest",
+                "ML\tBest",
+                "Spread\tPoints\tTotal",
+                "Points\tBest",
+                "O/U\tBet",
+                "Value\tMore Details",
+            ],
+            "fields": DRATINGS_ODDS_FIELDS,
+        },
+        "scores": {
+            "block_start": DATE_PATTERN,
+            "ignore_lines": DRATINGS_SCORES_IGNORE,
+            "fields": DRATINGS_SCORES_FIELDS,
+        },
+    },
+}
+
+
+class Layout:
+    __slots__ = (
+        "league",
+        "kind",
+        "out_dir",
+        "block_start",
+        "ignore_lines",
+        "fields",
+        "min_lines",
+    )
+
+    def __init__(self, league: str, kind: str, spec: dict, out_dir: str):
+        self.league = league
+        self.kind = kind
+        self.out_dir = Path(out_dir)
+        self.block_start = re.compile(spec["block_start"])
+        self.ignore_lines = frozenset(spec["ignore_lines"])
+        self.fields = tuple(
+            (
+                name,
+                position,
+                re.compile(pattern, re.IGNORECASE) if pattern else None,
+            )
+            for name, position, pattern in spec["fields"]
+        )
+        self.min_lines = max(position for _, position, _ in self.fields) + 1
+
+
+@lru_cache(maxsize=None)
+def get_layout(league: str, kind: str) -> Layout:
+    try:
+        league_spec = LAYOUTS[league]
+        spec = league_spec[kind]
+    except KeyError as error:
+        raise ValueError(f"No {kind} layout for league {league!r}") from error
+
+    return Layout(league, kind, spec, league_spec["out_dir"])
+
+
+def iter_blocks(raw_lines, layout: Layout):
+    """Yield each game block of a paste; raw_lines may be a file."""
+    current = []
+    block_start = layout.block_start.fullmatch
+    ignore_lines = layout.ignore_lines
+
+    for raw_line in raw_lines:
+        line = raw_line.strip()
+
+        if not line or line in ignore_lines:
+            continue
+
+        if block_start(line):
+            if current:
+                yield current
+            current = [line]
+        elif current:
+            current.append(line)
+
+    if current:
+        yield current
+
+
+def extract_fields(block: list[str], layout: Layout) -> dict:
+    if len(block) < layout.min_lines:
+        raise ValueError(
+            f"Incomplete {layout.league} {layout.kind} game block: {block}"
+        )
+
+    fields = {}
+
+    for name, position, pattern in layout.fields:
+        value = block[position]
+
+        if pattern is not None and not pattern.fullmatch(value):
+            raise ValueError(f"Invalid {name}: {value}")
+
+        fields[name] = value
+
+    return fields
+
+
+def parse_blocks(raw_lines, layout: Layout, parse_fields, *context):
+    """Stream parse_fields(fields, *context) over every block."""
+    for block in iter_blocks(raw_lines, layout):
+        yield parse_fields(extract_fields(block, layout), *context)
+
+
+def week_type(league: str, week_number: int) -> str | None:
+    for name, first, last in LAYOUTS[league]["week_types"]:
+        if first <= week_number <= last:
+            return name
+
+    return None
+
+
+def week_bounds(league: str) -> tuple[int, int]:
+    ranges = LAYOUTS[league]["week_types"]
+    return (
+        min(first for _, first, _ in ranges),
+        max(last for _, _, last in ranges),
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--check", nargs=2, metavar=("SPORT", "LEAGUE"))
+    parser.add_argument("--out-dir", metavar="LEAGUE")
+    args = parser.parse_args()
+
+    if args.out_dir:
+        print(LAYOUTS[args.out_dir]["out_dir"])
+
+    if args.check:
+        sport, league = args.check
+
+        if league not in LAYOUTS or LAYOUTS[league]["sport"] != sport:
+            raise SystemExit(f"Unsupported sport/league: {sport} {league}")
+
+        print(f"Layouts available for {sport} {league}")
+
+
+if __name__ == "__main__":
+    main()
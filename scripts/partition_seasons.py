@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+# scripts/partition_seasons.py
+
+"""Move picks and scores onto their season partitions.
+
+The migration supabase/migrations/20261019000200_season_partitions.sql
+adds picks.season and scores.season, the partitioned twins
+picks_partitioned and scores_partitioned, and triggers that mirror every
+write into the twins. This script does the rest, without taking the
+site down:
+
+    status    rows per table still missing season, rows in each twin,
+              and rows per season partition
+    backfill  fill season on existing rows, --batch rows per
+              transaction, current season first; the mirror
+              triggers copy each filled batch into its partitions
+    swap      check the twins hold every row and swap them in (see
+              swap_season_partitions() in the migration); the only
+              step that locks the tables, for as long as two counts
+
+Between backfill and swap the writers move to the new conflict targets
+that include season (step 3 in the migration); before the backfill they
+would miss rows without a season, and after the swap the old targets
+are gone.
+
+Rows whose game is missing never get a season and make swap refuse;
+status lists how many there are.
+
+Requires SUPABASE_DB_URL and psql.
+"""
+
+import argparse
+import time
+
+from postgres import psql, require_environment
+
+
+TABLES = ("picks", "scores")
+
+BATCH_ROWS = 5000
+
+# One batch: the next --batch rows of a season still missing season,
+# by id, so each batch starts where the last one stopped.
+BACKFILL_SQL = """
+WITH batch AS (
+    SELECT source."id", games."season"
+    FROM "public"."{table}" AS source
+    JOIN "public"."games" AS games ON games."id" = source."game_id"
+    WHERE source."season" IS NULL
+      AND games."season" = {season}
+      AND source."id" > {after}
+    ORDER BY source."id"
+    LIMIT {batch}
+), updated AS (
+    UPDATE "public"."{table}" AS target
+    SET "season" = batch."season"
+    FROM batch
+    WHERE target."id" = batch."id"
+    RETURNING target."id"
+)
+SELECT count(*) || '|' || coalesce(
+    (SELECT "id"::text FROM updated ORDER BY "id" DESC LIMIT 1), ''
+)
+FROM updated;
+"""
+
+FIRST_ID = "00000000-0000-0000-0000-000000000000"
+
+
+def query_rows(db_url: str, sql: str) -> list[list[str]]:
+    return [
+        line.split("|")
+        for line in psql(db_url, sql).splitlines()
+        if line.strip()
+    ]
+
+
+def partitioned(db_url: str) -> bool:
+    output = psql(
+        db_url,
+        "SELECT relkind FROM pg_catalog.pg_class "
+        "WHERE oid = 'public.picks'::regclass;",
+    )
+    return output.strip() == "p"
+
+
+def status(db_url: str) -> None:
+    if partitioned(db_url):
+        for table in TABLES:
+            for season, rows in query_rows(
+                db_url,
+                f'SELECT "season", count(*) FROM "public"."{table}" '
+                'GROUP BY "season" ORDER BY "season";',
+            ):
+                print(f"{table} {season}: {rows} rows")
+        print("SWAPPED: picks and scores are partitioned by season")
+        return
+
+    for table in TABLES:
+        [[total, missing, orphaned]] = query_rows(
+            db_url,
+            "SELECT count(*), count(*) FILTER (WHERE source.\"season\" IS NULL), "
+            'count(*) FILTER (WHERE games."id" IS NULL) '
+            f'FROM "public"."{table}" AS source '
+            'LEFT JOIN "public"."games" AS games '
+            'ON games."id" = source."game_id";',
+        )
+        [[copied]] = query_rows(
+            db_url, f'SELECT count(*) FROM "public"."{table}_partitioned";'
+        )
+
+        print(
+            f"{table}: {total} rows, {missing} without season "
+            f"({orphaned} without a game), {copied} in {table}_partitioned"
+        )
+
+        for season, rows in query_rows(
+            db_url,
+            f'SELECT "season", count(*) FROM "public"."{table}_partitioned" '
+            'GROUP BY "season" ORDER BY "season";',
+        ):
+            print(f"  {table}_{season}: {rows} rows")
+
+
+def backfill(db_url: str, batch: int, pause: float) -> None:
+    if partitioned(db_url):
+        print("Already partitioned; nothing to backfill")
+        return
+
+    seasons = [
+        int(season)
+        for [season] in query_rows(
+            db_url,
+            'SELECT DISTINCT "season" FROM "public"."games" '
+            'ORDER BY "season" DESC;',
+        )
+    ]
+
+    for table in TABLES:
+        for season in seasons:
+            after = FIRST_ID
+            filled = 0
+
+            while True:
+                [[count, last_id]] = query_rows(
+                    db_url,
+                    BACKFILL_SQL.format(
+                        table=table,
+                        season=season,
+                        after=f"'{after}'",
+                        batch=batch,
+                    ),
+                )
+
+                if not int(count):
+                    break
+
+                filled += int(count)
+                after = last_id
+                time.sleep(pause)
+
+            if filled:
+                print(f"BACKFILLED {table} {season}: {filled} rows")
+
+    status(db_url)
+
+
+def swap(db_url: str) -> None:
+    psql(db_url, 'SELECT "public"."swap_season_partitions"();')
+    status(db_url)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    commands.add_parser("status")
+
+    backfill_command = commands.add_parser("backfill")
+    backfill_command.add_argument("--batch", type=int, default=BATCH_ROWS)
+    # Seconds between batches, to leave room for the site's own writes.
+    backfill_command.add_argument("--pause", type=float, default=0.1)
+
+    commands.add_parser("swap")
+
+    args = parser.parse_args()
+    db_url = require_environment("SUPABASE_DB_URL")
+
+    if args.command == "status":
+        status(db_url)
+    elif args.command == "backfill":
+        backfill(db_url, args.batch, args.pause)
+    else:
+        swap(db_url)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+# scripts/paste_generator.py
+
+"""Generate synthetic DRatings-style pastes for the parsers.
+
+generate_odds() and generate_scores() build a raw paste of any number of
+games in the layouts parser_engine.py describes for NFL, with the
+things real pastes have: table header lines, blank lines, team records
+and quarterbacks, times with and without a leading zero, ½ lines, o/u
+prefixes in either case and spaces inside market lines. Each
+returns (lines, expected), where expected holds the rows
+manual_nfl_odds.parse_rows / manual_nfl_final_scores.parse_rows should
+produce, worked out from the generated numbers rather than by the
+parsers' own helpers.
+
+Games are 16 to a day with every team playing once a day, so game_ids
+are unique at any size. The same seed always gives the same paste.
+
+    python scripts/paste_generator.py odds --games 5000 --out raw.txt
+"""
+
+import argparse
+import random
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from zoneinfo import ZoneInfo
+
+from parser_engine import LAYOUTS
+from teams import get_registry
+
+
+EASTERN = ZoneInfo("America/New_York")
+
+KICKOFFS = ((9, 30), (13, 0), (16, 5), (16, 25), (20, 15), (20, 20))
+PRICES = ("-125", "-120", "-115", "-110", "-105", "+100", "+105")
+QUARTERBACKS = ("J. Allen", "P. Mahomes", "L. Jackson", "J. Burrow", "")
+FILLER = ("Bet Now", "Details")
+
+UPDATED_AT_UTC = "2026-09-01T12:00:00+00:00"
+
+
+def team_names() -> list[str]:
+    registry = get_registry("NFL")
+    return [name for name in registry.names if name]
+
+
+def half_text(halves: int, signed: bool) -> str:
+    """Raw DRatings text for halves / 2: -3½, +7, ½, 44½."""
+    whole, half = divmod(abs(halves), 2)
+    sign = ("-" if halves < 0 else "+") if signed and halves else ""
+
+    if half:
+        return f"{sign}{whole or ''}½"
+
+    return f"{sign}{whole}"
+
+
+def half_value(halves: int, signed: bool) -> str:
+    """What the parser writes for halves / 2: -3.5, +7.0, 0.0, 44.5."""
+    whole, half = divmod(abs(halves), 2)
+    text = f"{whole}.{5 if half else 0}"
+
+    if not signed:
+        return text
+    if halves == 0:
+        return "0.0"
+    return ("-" if halves < 0 else "+") + text
+
+
+def market_text(rng: random.Random, prefix: str, value: str, price: str):
+    if prefix and rng.random() < 0.3:
+        prefix = prefix.upper()
+    separator = " " if rng.random() < 0.2 else ""
+    return f"{prefix}{separator}{value}{separator}{price}"
+
+
+def record(rng: random.Random) -> str:
+    if rng.random() < 0.2:
+        return ""
+    wins, losses = rng.randrange(17), rng.randrange(17)
+    ties = f"-{rng.randrange(2)}" if rng.random() < 0.1 else ""
+    return f" ({wins}-{losses}{ties})"
+
+
+def schedule(rng: random.Random, games: int, season: int):
+    """Yield (game_day, away_team, home_team), 16 games a day."""
+    names = team_names()
+    first_day = date(season, 9, 10)
+
+    for day in range((games + 15) // 16):
+        order = list(names)
+        rng.shuffle(order)
+        game_day = first_day + timedelta(days=day)
+
+        for slot in range(min(16, games - day * 16)):
+            yield game_day, order[2 * slot], order[2 * slot + 1]
+
+
+def kickoff(rng: random.Random, game_day: date) -> tuple[str, str, str]:
+    """(raw time text, normalized game_time, commence_time_utc)."""
+    hour, minute = rng.choice(KICKOFFS)
+    twelve = hour % 12 or 12
+    meridiem = "PM" if hour >= 12 else "AM"
+
+    raw = f"{twelve}:{minute:02d} {meridiem}"
+    if rng.random() < 0.5:
+        raw = f"{twelve:02d}:{minute:02d} {meridiem}"
+    if rng.random() < 0.1:
+        raw = raw.lower()
+
+    local = datetime(
+        game_day.year,
+        game_day.month,
+        game_day.day,
+        hour,
+        minute,
+        tzinfo=EASTERN,
+    )
+    utc = local.astimezone(timezone.utc).isoformat(timespec="seconds")
+
+    return raw, f"{twelve:02d}:{minute:02d} {meridiem}", utc
+
+
+def generate_odds(
+    games: int,
+    seed: int = 0,
+    season: int = 2026,
+    week: int = 1,
+    book: str = "NA",
+    updated_at_utc: str = UPDATED_AT_UTC,
+) -> tuple[list[str], list[dict]]:
+    rng = random.Random(seed)
+    lines = list(LAYOUTS["NFL"]["odds"]["ignore_lines"])
+    expected = []
+
+    for game_day, away, home in schedule(rng, games, season):
+        time_raw, game_time, commence = kickoff(rng, game_day)
+
+        # Probabilities in tenths of a percent.
+        away_tenths = rng.randrange(50, 951)
+        home_tenths = 1000 - away_tenths
+        moneyline_away = f"{rng.choice('+-')}{rng.randrange(100, 400)}"
+        moneyline_home = f"{rng.choice('+-')}{rng.randrange(100, 400)}"
+
+        spread_halves = rng.randrange(-28, 29)
+        total_halves = rng.randrange(70, 111)
+        under_halves = total_halves + rng.choice((0, 0, 0, 1, -1))
+        prices = [rng.choice(PRICES) for _ in range(4)]
+
+        away_projected = f"{rng.randrange(100, 350) / 10:.1f}"
+        home_projected = f"{rng.randrange(100, 350) / 10:.1f}"
+        total_projected = f"{float(away_projected) + float(home_projected):.1f}"
+
+        game_date = game_day.strftime("%Y_%m_%d")
+
+        lines += [
+            game_day.strftime("%m/%d/%Y"),
+            time_raw,
+            f"{away}{record(rng)}\t{rng.choice(QUARTERBACKS)}".rstrip(),
+            f"{home}{record(rng)}\t{rng.choice(QUARTERBACKS)}".rstrip(),
+            f"{away_tenths / 10:.1f}%",
+            f"{home_tenths / 10:.1f}%",
+            moneyline_away,
+            moneyline_home,
+            market_text(rng, "", half_text(-spread_halves, True), prices[0]),
+            market_text(rng, "", half_text(spread_halves, True), prices[1]),
+            away_projected,
+            f"{home_projected}\t{total_projected}",
+            market_text(rng, "o", half_text(total_halves, False), prices[2]),
+            market_text(rng, "u", half_text(under_halves, False), prices[3]),
+        ]
+
+        if rng.random() < 0.3:
+            lines.append("")
+        if rng.random() < 0.2:
+            lines.append(rng.choice(FILLER))
+
+        expected.append(
+            {
+                "season": str(season),
+                "week": str(week),
+                "game_id": f"{game_date}_{home}_{away}",
+                "commence_time_utc": commence,
+                "home_team": home,
+                "away_team": away,
+                "book": book,
+                "spread_home": half_value(spread_halves, True),
+                "spread_away": half_value(-spread_halves, True),
+                "total": half_value(total_halves, False),
+                "moneyline_home": moneyline_home,
+                "moneyline_away": moneyline_away,
+                "updated_at_utc": updated_at_utc,
+                "is_consensus": "1",
+                "game_date": game_date,
+                "game_time": game_time,
+                "home_prob": f"{home_tenths // 1000}.{home_tenths % 1000:03d}",
+                "away_prob": f"{away_tenths // 1000}.{away_tenths % 1000:03d}",
+                "spread_home_odds": prices[1],
+                "spread_away_odds": prices[0],
+                "total_over": half_value(total_halves, False),
+                "total_under": half_value(under_halves, False),
+                "total_odds_over": prices[2],
+                "total_odds_under": prices[3],
+                "away_projected_score": away_projected,
+                "home_projected_score": home_projected,
+                "total_projected_score": total_projected,
+            }
+        )
+
+    return lines, expected
+
+
+def generate_scores(
+    games: int,
+    seed: int = 0,
+    season: int = 2026,
+    week: int = 1,
+) -> tuple[list[str], list[dict]]:
+    rng = random.Random(seed)
+    lines = list(LAYOUTS["NFL"]["scores"]["ignore_lines"])
+    expected = []
+
+    for game_day, away, home in schedule(rng, games, season):
+        away_score = rng.randrange(0, 50)
+        home_score = rng.randrange(0, 50)
+        game_date = game_day.strftime("%Y_%m_%d")
+
+        lines += [
+            game_day.strftime("%m/%d/%Y"),
+            f"Final\t{away}{record(rng)}",
+            f"{home}{record(rng)}",
+            f"{rng.randrange(50, 951) / 10:.1f}%",
+            f"{rng.randrange(50, 951) / 10:.1f}%",
+            f"{rng.choice('+-')}{rng.randrange(100, 400)}",
+            half_text(rng.randrange(-28, 29), True),
+            half_text(rng.randrange(70, 111), False),
+            f"{away_score}\t{rng.randrange(100, 350) / 10:.1f}",
+            f"{home_score}\t{rng.randrange(100, 350) / 10:.1f}",
+        ]
+
+        if rng.random() < 0.3:
+            lines.append("")
+
+        expected.append(
+            {
+                "season": str(season),
+                "week": str(week),
+                "game_date": game_date,
+                "game_id": f"{game_date}_{home}_{away}",
+                "home_team": home,
+                "away_team": away,
+                "home_score": str(home_score),
+                "away_score": str(away_score),
+            }
+        )
+
+    return lines, expected
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("kind", choices=("odds", "scores"))
+    parser.add_argument("--games", type=int, default=16)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--season", type=int, default=2026)
+    parser.add_argument("--week", type=int, default=1)
+    parser.add_argument("--out", required=True)
+    args = parser.parse_args()
+
+    generate = generate_odds if args.kind == "odds" else generate_scores
+    lines, expected = generate(args.games, args.seed, args.season, args.week)
+
+    Path(args.out).write_text("\n".join(lines) + "\n", encoding="utf-8")
+    print(f"WROTE {args.out} ({len(expected)} games, {len(lines)} lines)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+# scripts/postgres.py
+
+"""Run SQL on a Postgres database through psql.
+
+For the scripts that talk to Postgres directly rather than through
+PostgREST: explain_queries.py against a local database, and
+partition_seasons.py and bulk_load.py against the Supabase database at
+SUPABASE_DB_URL (the session pooler or direct connection string from
+the dashboard).
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+from typing import Iterable
+
+
+def require_environment(name: str) -> str:
+    value = os.environ.get(name, "").strip()
+
+    if not value:
+        raise ValueError(f"Missing environment variable: {name}")
+
+    return value
+
+
+def psql_command(db_url: str) -> list[str]:
+    return [
+        "psql",
+        db_url,
+        "--no-psqlrc",
+        "--quiet",
+        "--tuples-only",
+        "--no-align",
+        "--set",
+        "ON_ERROR_STOP=1",
+    ]
+
+
+def psql(db_url: str, sql: str) -> str:
+    """Run sql in one psql session; return its unaligned tuples output.
+
+    Exits on the first error, so a multi-statement script stops there
+    (and rolls back if it opened a transaction).
+    """
+    try:
+        result = subprocess.run(
+            psql_command(db_url),
+            input=sql,
+            capture_output=True,
+            text=True,
+        )
+    except FileNotFoundError:
+        sys.exit("psql is not installed")
+
+    if result.returncode != 0:
+        sys.exit(f"psql failed: {result.stderr.strip()}")
+
+    return result.stdout
+
+
+def psql_stream(db_url: str, chunks: Iterable[str]) -> str:
+    """Like psql(), but write the script to psql as chunks arrive.
+
+    For scripts with COPY ... FROM STDIN data inline, which can be far
+    larger than is worth holding in memory. psql's output goes to
+    temporary files so it can never block the writes.
+    """
+    with tempfile.TemporaryFile("w+") as stdout, \
+            tempfile.TemporaryFile("w+") as stderr:
+        try:
+            process = subprocess.Popen(
+                psql_command(db_url),
+                stdin=subprocess.PIPE,
+                stdout=stdout,
+                stderr=stderr,
+                text=True,
+            )
+        except FileNotFoundError:
+            sys.exit("psql is not installed")
+
+        try:
+            for chunk in chunks:
+                process.stdin.write(chunk)
+        except BrokenPipeError:
+            # psql stopped on an error; its stderr says which.
+            pass
+        finally:
+            # Closing stdin before the script's COMMIT (when chunks
+            # raised) ends the session, which rolls the load back.
+            try:
+                process.stdin.close()
+            except BrokenPipeError:
+                pass
+
+            returncode = process.wait()
+
+        stdout.seek(0)
+        stderr.seek(0)
+
+        if returncode != 0:
+            sys.exit(f"psql failed: {stderr.read().strip()}")
+
+        return stdout.read()
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+# scripts/publish_data.py
+
+"""Publish docs/data under content-hashed names with gzip copies.
+
+For every CSV and JSON file under docs/data (except the per-user files
+in docs/data/history) this writes
+
+    docs/data/published/<dir>/<stem>.<hash><suffix>
+    ... .gz    gzip, level 9, reproducible (no timestamp)
+
+and records it in docs/data/manifest.json:
+
+    {"files": {"weekly/latest.csv": {"path": "published/weekly/latest.
+      1a2b3c4d5e6f.csv", "hash": "...", "bytes": 1234, "gzip": "...gz"}}}
+
+A hashed file never changes, so the site can cache it forever and only
+revalidate the manifest. docs/data-manifest.js fetches the .gz copy and
+inflates it with DecompressionStream, or the plain copy in browsers
+without one. There is no brotli copy: GitHub Pages serves files as they
+are, and browsers cannot decode brotli from script. Files whose hash
+matches the current manifest entry are skipped. Hashed copies that
+neither the new nor the previous manifest mentions are deleted, so a
+page loaded just before a publish can still fetch what it was given.
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+from pathlib import Path
+
+
+DATA_DIR = Path("docs/data")
+PUBLISHED_DIR = "published"
+MANIFEST_FILE = "manifest.json"
+
+# One file per user (build_pick_history.py): far too many for the
+# manifest, and each is fetched by its own user alone.
+UNPUBLISHED_DIRS = ("history",)
+
+SUFFIXES = (".csv", ".json")
+
+HASH_LENGTH = 12
+
+
+def source_files(data_dir: Path) -> list[Path]:
+    skipped = [data_dir / PUBLISHED_DIR] + [
+        data_dir / name for name in UNPUBLISHED_DIRS
+    ]
+    manifest = data_dir / MANIFEST_FILE
+
+    return sorted(
+        path
+        for path in data_dir.rglob("*")
+        if path.is_file()
+        and path.suffix in SUFFIXES
+        and path != manifest
+        and not any(directory in path.parents for directory in skipped)
+    )
+
+
+def read_manifest(data_dir: Path) -> dict:
+    path = data_dir / MANIFEST_FILE
+
+    if not path.exists():
+        return {}
+
+    return json.loads(path.read_text(encoding="utf-8")).get("files", {})
+
+
+def hashed_name(logical: str, digest: str) -> str:
+    path = Path(PUBLISHED_DIR) / logical
+    return (
+        path.with_name(f"{path.stem}.{digest[:HASH_LENGTH]}{path.suffix}")
+    ).as_posix()
+
+
+def publish_file(data_dir: Path, source: Path, digest: str) -> dict:
+    logical = source.relative_to(data_dir).as_posix()
+    content = source.read_bytes()
+    relative = hashed_name(logical, digest)
+    target = data_dir / relative
+    target.parent.mkdir(parents=True, exist_ok=True)
+
+    target.write_bytes(content)
+
+    entry = {
+        "path": relative,
+        "hash": digest,
+        "bytes": len(content),
+    }
+
+    gzip_path = target.with_name(target.name + ".gz")
+    gzip_path.write_bytes(gzip.compress(content, compresslevel=9, mtime=0))
+    entry["gzip"] = relative + ".gz"
+
+    return entry
+
+
+def entry_files(entry: dict) -> set[str]:
+    return {entry[key] for key in ("path", "gzip") if entry.get(key)}
+
+
+def entry_present(data_dir: Path, entry: dict) -> bool:
+    return all((data_dir / name).exists() for name in entry_files(entry))
+
+
+def publish(data_dir: Path) -> tuple[int, int]:
+    previous = read_manifest(data_dir)
+    files = {}
+    written = 0
+
+    for source in source_files(data_dir):
+        logical = source.relative_to(data_dir).as_posix()
+        digest = hashlib.sha256(source.read_bytes()).hexdigest()
+        entry = previous.get(logical)
+
+        if (
+            entry is None
+            or entry.get("hash") != digest
+            or not entry_present(data_dir, entry)
+        ):
+            entry = publish_file(data_dir, source, digest)
+            written += 1
+            print(f"PUBLISHED {logical} -> {entry['path']}")
+
+        files[logical] = entry
+
+    keep = set()
+    for entry in list(files.values()) + list(previous.values()):
+        keep |= entry_files(entry)
+
+    removed = 0
+    published = data_dir / PUBLISHED_DIR
+
+    if published.exists():
+        for path in sorted(published.rglob("*")):
+            if (
+                path.is_file()
+                and path.relative_to(data_dir).as_posix() not in keep
+            ):
+                path.unlink()
+                removed += 1
+
+    if files != previous:
+        (data_dir / MANIFEST_FILE).write_text(
+            json.dumps({"files": files}, indent=2, sort_keys=True) + "\n",
+            encoding="utf-8",
+        )
+
+    return written, removed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--data-dir", default=str(DATA_DIR))
+    args = parser.parse_args()
+
+    written, removed = publish(Path(args.data_dir))
+    print(f"PUBLISH: {written} written, {removed} removed")
+
+
+if __name__ == "__main__":
+    main()
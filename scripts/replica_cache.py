@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+# scripts/replica_cache.py
+
+"""On-disk SQLite replica of slow-changing Supabase tables.
+
+Each cached table keeps a high-water mark on updated_at. A refresh asks
+PostgREST only for rows at or after that mark, so a steady-state read
+is one small delta query per table. Deletes never move updated_at, so
+once per RECONCILE_INTERVAL the ids and updated_at values of the whole
+table are fetched, checksummed against the replica, and any missing or
+stale rows are dropped or refetched.
+
+The cache lives under REPLICA_CACHE_DIR (default .cache/replica).
+Callers supply fetch_page(table, params), which performs one PostgREST
+GET with the given query parameters and returns its rows as a list or
+any iterable (a streaming decoder, for example).
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+
+CACHE_DIR = Path(os.environ.get("REPLICA_CACHE_DIR", ".cache/replica"))
+CACHE_FILE = "replica.sqlite3"
+
+PAGE_SIZE = 1000
+
+# Re-read this much history on every refresh so rows committed slightly
+# out of updated_at order are not missed. Upserts make this harmless.
+HIGH_WATER_OVERLAP = timedelta(seconds=60)
+
+RECONCILE_INTERVAL = timedelta(hours=24)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS replica_rows (
+    table_name TEXT NOT NULL,
+    id TEXT NOT NULL,
+    updated_at TEXT,
+    data TEXT NOT NULL,
+    PRIMARY KEY (table_name, id)
+);
+
+CREATE TABLE IF NOT EXISTS replica_meta (
+    table_name TEXT PRIMARY KEY,
+    high_water TEXT,
+    reconciled_at TEXT
+);
+"""
+
+
+def parse_timestamp(value: str) -> datetime:
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+    if parsed.utcoffset() is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+
+    return parsed.astimezone(timezone.utc)
+
+
+def format_timestamp(value: datetime) -> str:
+    return value.astimezone(timezone.utc).isoformat(timespec="microseconds")
+
+
+def checksum(pairs) -> str:
+    digest = hashlib.sha256()
+
+    for row_id, updated_at in sorted(pairs):
+        digest.update(f"{row_id}\t{updated_at or ''}\n".encode("utf-8"))
+
+    return digest.hexdigest()
+
+
+class ReplicaCache:
+    def __init__(self, fetch_page, cache_dir: Path = CACHE_DIR):
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        self.fetch_page = fetch_page
+        self.connection = sqlite3.connect(cache_dir / CACHE_FILE)
+        self.connection.executescript(SCHEMA)
+        self.refreshed = set()
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def fetch_all(self, table: str, params: dict) -> list[dict]:
+        rows = []
+        offset = 0
+
+        while True:
+            before = len(rows)
+            rows.extend(
+                self.fetch_page(
+                    table,
+                    {
+                        **params,
+                        "offset": str(offset),
+                        "limit": str(PAGE_SIZE),
+                    },
+                )
+                or ()
+            )
+
+            if len(rows) - before < PAGE_SIZE:
+                return rows
+
+            offset += PAGE_SIZE
+
+    def read_meta(self, table: str) -> tuple[str | None, str | None]:
+        found = self.connection.execute(
+            "SELECT high_water, reconciled_at FROM replica_meta "
+            "WHERE table_name = ?",
+            (table,),
+        ).fetchone()
+
+        return found or (None, None)
+
+    def store_rows(self, table: str, rows: list[dict]) -> None:
+        self.connection.executemany(
+            "INSERT OR REPLACE INTO replica_rows "
+            "(table_name, id, updated_at, data) VALUES (?, ?, ?, ?)",
+            [
+                (
+                    table,
+                    row["id"],
+                    row.get("updated_at"),
+                    json.dumps(row, separators=(",", ":")),
+                )
+                for row in rows
+            ],
+        )
+
+    def refresh(self, table: str) -> None:
+        """Bring the replica of table up to date; at most once per run."""
+        if table in self.refreshed:
+            return
+
+        high_water, reconciled_at = self.read_meta(table)
+        params = {"select": "*", "order": "updated_at.asc,id.asc"}
+
+        if high_water is not None:
+            since = parse_timestamp(high_water) - HIGH_WATER_OVERLAP
+            params["updated_at"] = "gte." + format_timestamp(since)
+
+        rows = self.fetch_all(table, params)
+        self.store_rows(table, rows)
+
+        stamps = [row["updated_at"] for row in rows if row.get("updated_at")]
+        if stamps:
+            newest = max(parse_timestamp(stamp) for stamp in stamps)
+            high_water = format_timestamp(newest)
+
+        now = datetime.now(timezone.utc)
+
+        if (
+            reconciled_at is None
+            or now - parse_timestamp(reconciled_at) >= RECONCILE_INTERVAL
+        ):
+            self.reconcile(table)
+            reconciled_at = format_timestamp(now)
+
+        self.connection.execute(
+            "INSERT OR REPLACE INTO replica_meta "
+            "(table_name, high_water, reconciled_at) VALUES (?, ?, ?)",
+            (table, high_water, reconciled_at),
+        )
+        self.connection.commit()
+        self.refreshed.add(table)
+
+    def reconcile(self, table: str) -> None:
+        """Drop deleted rows and refetch any row whose version differs."""
+        remote = {
+            row["id"]: row.get("updated_at")
+            for row in self.fetch_all(
+                table,
+                {"select": "id,updated_at", "order": "id.asc"},
+            )
+        }
+        local = dict(
+            self.connection.execute(
+                "SELECT id, updated_at FROM replica_rows WHERE table_name = ?",
+                (table,),
+            )
+        )
+
+        if checksum(remote.items()) == checksum(local.items()):
+            return
+
+        deleted = [row_id for row_id in local if row_id not in remote]
+        self.connection.executemany(
+            "DELETE FROM replica_rows WHERE table_name = ? AND id = ?",
+            [(table, row_id) for row_id in deleted],
+        )
+
+        stale = sorted(
+            row_id
+            for row_id, updated_at in remote.items()
+            if local.get(row_id, object()) != updated_at
+        )
+
+        for start in range(0, len(stale), 100):
+            chunk = stale[start:start + 100]
+            self.store_rows(
+                table,
+                self.fetch_all(
+                    table,
+                    {"select": "*", "id": f"in.({','.join(chunk)})"},
+                ),
+            )
+
+        print(
+            f"REPLICA {table}: reconciled {len(deleted)} deleted, "
+            f"{len(stale)} stale rows"
+        )
+
+    def rows(self, table: str, columns: list[str] | None = None) -> list[dict]:
+        """Return every cached row of table, refreshing it first."""
+        self.refresh(table)
+
+        rows = []
+        for (data,) in self.connection.execute(
+            "SELECT data FROM replica_rows WHERE table_name = ?",
+            (table,),
+        ):
+            row = json.loads(data)
+            if columns is not None:
+                row = {name: row.get(name) for name in columns}
+            rows.append(row)
+
+        return rows
@@ -0,0 +1,584 @@
+#!/usr/bin/env python3
+# scripts/schema_checks.py
+
+"""Pre-flight row validators compiled from the database schema.
+
+docs/supabase/backup/schema.sql (the pg_dump the backup workflow keeps
+current) declares each table's column types, NOT NULL columns and CHECK
+constraints. This module parses them once into a TableValidator per
+table, so a batch can be checked in one pass before it is sent, with
+every violation reported together, rather than failing on the server
+one batch and one error at a time:
+
+    get_validator("games").validate(games)
+    # ValueError: 2 rows of games violate the schema:
+    #   row 3: games_week_check failed (week=23)
+    #   row 9: spread_home must be numeric; received 'pk'
+
+Column types are checked for the integer ranges (smallint, integer,
+bigint), numeric, uuid, boolean, timestamps and text. CHECK expressions
+are compiled from the deparsed form pg_dump writes: comparisons, AND /
+OR / NOT, IS [NOT] NULL, = ANY (ARRAY[...]), length, lower, upper, trim
+and casts. They follow SQL's rule that only a false check fails, so a
+NULL passes as it does in Postgres. A constraint using anything else is
+left to the server and listed in TableValidator.skipped.
+
+Only columns present in a row are checked, except that an insert must
+carry every NOT NULL column without a default; partial=True (for
+PATCH payloads) drops that rule. Columns the dump does not know yet, for
+example one added by a migration since the last backup, pass through.
+"""
+
+import re
+import uuid
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from functools import lru_cache
+from pathlib import Path
+
+
+SCHEMA_PATH = Path("docs/supabase/backup/schema.sql")
+
+CREATE_TABLE_RE = re.compile(
+    r'^CREATE TABLE (?:IF NOT EXISTS )?"public"\."(?P<table>\w+)" \($'
+)
+COLUMN_RE = re.compile(r'^\s+"(?P<name>\w+)" (?P<definition>.+?),?$')
+CONSTRAINT_RE = re.compile(
+    r'^\s+CONSTRAINT "(?P<name>\w+)" CHECK (?P<expression>.+?),?$'
+)
+ALTER_CHECK_RE = re.compile(
+    r'^ALTER TABLE (?:ONLY )?"public"\."(?P<table>\w+)"\s+'
+    r'ADD CONSTRAINT "(?P<name>\w+)" CHECK (?P<expression>.+?);$',
+    re.MULTILINE | re.DOTALL,
+)
+CHECK_SUFFIX_RE = re.compile(r"\s+(?:NOT VALID|NO INHERIT)$")
+
+INTEGER_RANGES = {
+    "smallint": (-32768, 32767),
+    "integer": (-2147483648, 2147483647),
+    "bigint": (-9223372036854775808, 9223372036854775807),
+}
+
+TOKEN_RE = re.compile(
+    r"""
+    \s*(?:
+        (?P<quoted>"(?:[^"]|"")*")
+      | (?P<string>'(?:[^']|'')*')
+      | (?P<number>\d+(?:\.\d+)?)
+      | (?P<operator><=|>=|<>|!=|::|[=<>(),\[\]])
+      | (?P<word>[A-Za-z_]\w*)
+    )
+    """,
+    re.VERBOSE,
+)
+
+COMPARISONS = {
+    "=": lambda left, right: left == right,
+    "<>": lambda left, right: left != right,
+    "!=": lambda left, right: left != right,
+    "<": lambda left, right: left < right,
+    "<=": lambda left, right: left <= right,
+    ">": lambda left, right: left > right,
+    ">=": lambda left, right: left >= right,
+}
+
+FUNCTIONS = {
+    "length": len,
+    "char_length": len,
+    "lower": str.lower,
+    "upper": str.upper,
+    "btrim": str.strip,
+}
+
+TRIMS = {
+    "BOTH": str.strip,
+    "LEADING": str.lstrip,
+    "TRAILING": str.rstrip,
+}
+
+
+class Unsupported(Exception):
+    """A CHECK expression this module does not compile."""
+
+
+def base_type(definition: str) -> str:
+    """The column type of a column definition, without quotes."""
+    column_type = definition.split(" DEFAULT ")[0]
+    column_type = column_type.removesuffix(" NOT NULL")
+    return column_type.replace('"', "").strip()
+
+
+def to_integer(value):
+    if isinstance(value, bool):
+        raise ValueError(value)
+    if isinstance(value, int):
+        return value
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return int(str(value).strip())
+
+
+def to_decimal(value):
+    if isinstance(value, bool):
+        raise ValueError(value)
+    try:
+        number = Decimal(str(value).strip())
+    except InvalidOperation as error:
+        raise ValueError(value) from error
+    if not number.is_finite():
+        raise ValueError(value)
+    return number
+
+
+def to_timestamp(value):
+    return datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+
+
+def to_boolean(value):
+    if not isinstance(value, bool):
+        raise ValueError(value)
+    return value
+
+
+def to_text(value):
+    if not isinstance(value, str):
+        raise ValueError(value)
+    return value
+
+
+def converter(column_type: str):
+    """Return (convert, description) for a column type; convert raises
+    ValueError for a value the column cannot hold."""
+    if column_type in INTEGER_RANGES:
+        low, high = INTEGER_RANGES[column_type]
+
+        def convert(value):
+            number = to_integer(value)
+            if not low <= number <= high:
+                raise ValueError(value)
+            return number
+
+        return convert, f"a {column_type}"
+
+    if column_type == "numeric" or column_type.startswith("numeric("):
+        return to_decimal, "numeric"
+    if column_type == "uuid":
+        return lambda value: str(uuid.UUID(str(value))), "a uuid"
+    if column_type == "boolean":
+        return to_boolean, "a boolean"
+    if column_type.startswith(("timestamp", "date")):
+        return to_timestamp, "a timestamp"
+    if column_type in ("text", "character varying") or column_type.startswith(
+        "character varying("
+    ):
+        return to_text, "text"
+
+    return None, column_type
+
+
+def tokenize(expression: str) -> list[tuple[str, str]]:
+    tokens = []
+    position = 0
+    expression = expression.strip()
+
+    while position < len(expression):
+        match = TOKEN_RE.match(expression, position)
+
+        if not match or match.end() == position:
+            raise Unsupported(expression[position:])
+
+        kind = match.lastgroup
+        text = match.group(kind)
+
+        if kind == "word":
+            text = text.upper()
+
+        tokens.append((kind, text))
+        position = match.end()
+
+    return tokens
+
+
+class CheckCompiler:
+    """Recursive-descent compiler from a deparsed CHECK expression to a
+    function of the row. Functions return True, False or None (SQL
+    NULL); the names of the columns used are collected in columns."""
+
+    def __init__(self, expression: str, converters: dict):
+        self.tokens = tokenize(expression)
+        self.position = 0
+        self.converters = converters
+        self.columns = set()
+
+    def peek(self, offset=0):
+        index = self.position + offset
+        return self.tokens[index] if index < len(self.tokens) else (None, None)
+
+    def take(self, expected=None):
+        kind, text = self.peek()
+
+        if kind is None or (expected is not None and text != expected):
+            raise Unsupported(f"expected {expected or 'more'}, got {text}")
+
+        self.position += 1
+        return kind, text
+
+    def accept(self, text):
+        if self.peek()[1] == text:
+            self.position += 1
+            return True
+        return False
+
+    def compile(self):
+        node = self.expression()
+
+        if self.position != len(self.tokens):
+            raise Unsupported(f"unexpected {self.peek()[1]}")
+
+        return node
+
+    def expression(self):
+        nodes = [self.conjunction()]
+
+        while self.accept("OR"):
+            nodes.append(self.conjunction())
+
+        if len(nodes) == 1:
+            return nodes[0]
+
+        def either(row):
+            results = [node(row) for node in nodes]
+            if True in results:
+                return True
+            return None if None in results else False
+
+        return either
+
+    def conjunction(self):
+        nodes = [self.negation()]
+
+        while self.accept("AND"):
+            nodes.append(self.negation())
+
+        if len(nodes) == 1:
+            return nodes[0]
+
+        def both(row):
+            results = [node(row) for node in nodes]
+            if False in results:
+                return False
+            return None if None in results else True
+
+        return both
+
+    def negation(self):
+        if self.accept("NOT"):
+            node = self.negation()
+            return lambda row: None if node(row) is None else not node(row)
+
+        return self.comparison()
+
+    def comparison(self):
+        left = self.value()
+        kind, text = self.peek()
+
+        if text == "IS":
+            self.take()
+            negated = self.accept("NOT")
+            self.take("NULL")
+            return lambda row: (left(row) is None) != negated
+
+        if kind != "operator" or text not in COMPARISONS:
+            return left
+
+        self.take()
+        compare = COMPARISONS[text]
+
+        if self.accept("ANY"):
+            self.take("(")
+            right = self.value()
+            self.take(")")
+
+            def any_of(row):
+                value = left(row)
+                options = right(row)
+                if value is None or options is None:
+                    return None
+                return any(compare(value, option) for option in options)
+
+            return any_of
+
+        right = self.value()
+
+        def compared(row):
+            left_value = left(row)
+            right_value = right(row)
+            if left_value is None or right_value is None:
+                return None
+            try:
+                return compare(left_value, right_value)
+            except TypeError:
+                return None
+
+        return compared
+
+    def value(self):
+        node = self.primary()
+
+        # Casts: pg_dump writes 'x'::"text", "week"::integer and so on.
+        # Values are already held as the column's Python type.
+        while self.accept("::"):
+            self.take()
+            if self.accept("["):
+                self.take("]")
+
+        return node
+
+    def primary(self):
+        kind, text = self.take()
+
+        if text == "(":
+            node = self.expression()
+            self.take(")")
+            return node
+
+        if kind == "string":
+            literal = text[1:-1].replace("''", "'")
+            return lambda row: literal
+
+        if kind == "number":
+            literal = Decimal(text) if "." in text else int(text)
+            return lambda row: literal
+
+        if text == "NULL":
+            return lambda row: None
+
+        if text in ("TRUE", "FALSE"):
+            literal = text == "TRUE"
+            return lambda row: literal
+
+        if text == "ARRAY":
+            self.take("[")
+            items = [self.value()]
+            while self.accept(","):
+                items.append(self.value())
+            self.take("]")
+            return lambda row: [item(row) for item in items]
+
+        if text == "TRIM":
+            return self.trim()
+
+        if kind == "quoted":
+            name = text[1:-1].replace('""', '"')
+
+            if self.peek()[1] == "(":
+                return self.function(name)
+
+            return self.column(name)
+
+        raise Unsupported(text)
+
+    def trim(self):
+        self.take("(")
+        strip = str.strip
+
+        if self.peek()[1] in TRIMS:
+            strip = TRIMS[self.take()[1]]
+
+        self.take("FROM")
+        argument = self.value()
+        self.take(")")
+
+        def trimmed(row):
+            value = argument(row)
+            return None if value is None else strip(value)
+
+        return trimmed
+
+    def function(self, name):
+        if name not in FUNCTIONS:
+            raise Unsupported(f"function {name}")
+
+        apply = FUNCTIONS[name]
+        self.take("(")
+        argument = self.value()
+        self.take(")")
+
+        def call(row):
+            value = argument(row)
+            return None if value is None else apply(value)
+
+        return call
+
+    def column(self, name):
+        self.columns.add(name)
+        convert = self.converters.get(name)
+
+        def read(row):
+            value = row.get(name)
+            if value is None or convert is None:
+                return value
+            try:
+                return convert(value)
+            except (TypeError, ValueError):
+                # Reported by the column's type check instead.
+                return None
+
+        return read
+
+
+class TableValidator:
+    """Column type, NOT NULL and CHECK validation for one table."""
+
+    def __init__(self, table: str, columns: dict, checks: dict):
+        self.table = table
+        self.columns = {}
+        self.required = []
+        self.not_null = set()
+        self.checks = []
+        self.skipped = []
+
+        converters = {}
+
+        for name, definition in columns.items():
+            convert, description = converter(base_type(definition))
+            self.columns[name] = (convert, description)
+            converters[name] = convert
+
+            if " NOT NULL" in definition:
+                self.not_null.add(name)
+
+                if " DEFAULT " not in definition:
+                    self.required.append(name)
+
+        for name, expression in checks.items():
+            compiler = CheckCompiler(expression, converters)
+
+            try:
+                node = compiler.compile()
+            except Unsupported:
+                self.skipped.append(name)
+                continue
+
+            self.checks.append(
+                (name, node, sorted(compiler.columns))
+            )
+
+    def row_violations(self, row: dict, partial: bool = False) -> list[str]:
+        violations = []
+
+        if not partial:
+            for name in self.required:
+                if name not in row:
+                    violations.append(f"{name} is required")
+
+        for name, value in row.items():
+            if name not in self.columns:
+                continue
+
+            convert, description = self.columns[name]
+
+            if value is None:
+                if name in self.not_null:
+                    violations.append(f"{name} cannot be null")
+                continue
+
+            if convert is None:
+                continue
+
+            try:
+                convert(value)
+            except (TypeError, ValueError):
+                violations.append(
+                    f"{name} must be {description}; received {value!r}"
+                )
+
+        for name, node, columns in self.checks:
+            if any(column not in row for column in columns):
+                continue
+
+            if node(row) is False:
+                values = ", ".join(
+                    f"{column}={row[column]!r}" for column in columns
+                )
+                violations.append(f"{name} failed ({values})")
+
+        return violations
+
+    def violations(self, rows, partial: bool = False) -> list[str]:
+        """Every violation in rows, one line each, numbered from 1."""
+        return [
+            f"row {number}: {violation}"
+            for number, row in enumerate(rows, start=1)
+            for violation in self.row_violations(row, partial)
+        ]
+
+    def validate(self, rows, partial: bool = False) -> None:
+        """Raise ValueError listing every violation in rows, if any."""
+        violations = self.violations(rows, partial)
+
+        if violations:
+            failed = len({line.split(":")[0] for line in violations})
+            raise ValueError(
+                f"{failed} rows of {self.table} violate the schema:\n  "
+                + "\n  ".join(violations)
+            )
+
+
+def parse_schema(text: str) -> dict[str, tuple[dict, dict]]:
+    """Return {table: (columns, checks)} from a pg_dump schema, with
+    columns as {name: definition} and checks as {name: expression}."""
+    tables = {}
+    table = None
+
+    for line in text.splitlines():
+        if table is None:
+            match = CREATE_TABLE_RE.match(line)
+            if match:
+                table = match.group("table")
+                tables[table] = ({}, {})
+            continue
+
+        if line.startswith(")"):
+            table = None
+            continue
+
+        columns, checks = tables[table]
+        match = CONSTRAINT_RE.match(line)
+
+        if match:
+            checks[match.group("name")] = CHECK_SUFFIX_RE.sub(
+                "", match.group("expression")
+            )
+            continue
+
+        match = COLUMN_RE.match(line)
+
+        if match:
+            columns[match.group("name")] = match.group("definition")
+
+    for match in ALTER_CHECK_RE.finditer(text):
+        if match.group("table") in tables:
+            tables[match.group("table")][1][match.group("name")] = (
+                CHECK_SUFFIX_RE.sub("", match.group("expression"))
+            )
+
+    return tables
+
+
+def load_validators(path: Path = SCHEMA_PATH) -> dict[str, TableValidator]:
+    return {
+        table: TableValidator(table, columns, checks)
+        for table, (columns, checks) in parse_schema(
+            path.read_text(encoding="utf-8")
+        ).items()
+    }
+
+
+@lru_cache(maxsize=None)
+def get_validators() -> dict[str, TableValidator]:
+    return load_validators()
+
+
+def get_validator(table: str) -> TableValidator:
+    return get_validators()[table]
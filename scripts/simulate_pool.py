@@ -0,0 +1,372 @@
+#!/usr/bin/env python3
+# scripts/simulate_pool.py
+
+"""Estimate each user's chance of finishing first on the leaderboard.
+
+Every game of the season that has picks but no final score is simulated
+from the odds archive: the home margin is drawn from a normal centred on
+the projected margin, with its spread set so that the home team wins
+with the market file's home_prob, and the combined score from a normal
+centred on total_projected_score. Scores are rounded to whole points
+and every pending pick is graded with the grade_picks.py rules. Users
+are ranked as leaderboard.js ranks them, by combined spread and total
+wins; a tie for first shares the win.
+
+Simulations run in fixed-size chunks on a process pool. Chunk i always
+draws from the stream seeded with (--seed, i), so a seed gives the same
+result whatever --workers is. NumPy is used for batched sampling when it
+is installed; otherwise each chunk falls back to the random module.
+
+    python scripts/simulate_pool.py --sims 1000000 --seed 7
+
+writes docs/data/pool/<season>.json. Reads through grade_picks.
+SupabaseSource, or from backup files with --snapshot.
+"""
+
+import argparse
+import csv
+import json
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from statistics import NormalDist
+
+from grade_picks import (
+    SnapshotSource,
+    SupabaseSource,
+    grade_spread,
+    grade_total,
+    to_number,
+)
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+ODDS_DIR = Path("docs/data/weekly")
+OUT_DIR = Path("docs/data/pool")
+
+CHUNK_SIMS = 50_000
+
+# NFL margins and totals spread out by roughly two touchdowns.
+DEFAULT_MARGIN_SD = 13.5
+MIN_MARGIN_SD = 7.0
+MAX_MARGIN_SD = 20.0
+TOTAL_SD = 10.0
+
+POOL_PICK_COLUMNS = (
+    "user_id,game_id,spread_pick,total_pick,spread_result,total_result"
+)
+
+
+def margin_sd(projected_margin: float, home_prob: float | None) -> float:
+    """The spread that gives the home side home_prob of winning."""
+    if home_prob is None or not 0 < home_prob < 1 or home_prob == 0.5:
+        return DEFAULT_MARGIN_SD
+
+    z = NormalDist().inv_cdf(home_prob)
+
+    if projected_margin == 0 or (projected_margin > 0) != (z > 0):
+        return DEFAULT_MARGIN_SD
+
+    return min(max(projected_margin / z, MIN_MARGIN_SD), MAX_MARGIN_SD)
+
+
+def load_projections(odds_dir: Path, season: int) -> dict:
+    """Return {game_id: (projected_margin, projected_total, home_prob)}."""
+    projections = {}
+
+    for path in sorted(odds_dir.glob(f"{season}_wk*_odds.csv")):
+        with path.open("r", encoding="utf-8", newline="") as file:
+            for row in csv.DictReader(file):
+                if row.get("is_consensus") != "1":
+                    continue
+
+                home = to_number(row.get("home_projected_score"))
+                away = to_number(row.get("away_projected_score"))
+
+                if home is None or away is None:
+                    continue
+
+                projections[row["game_id"]] = (
+                    home - away,
+                    home + away,
+                    to_number(row.get("home_prob")),
+                )
+
+    return projections
+
+
+def build_model(source, season: int | None, odds_dir: Path) -> dict:
+    """Collect current standings and the pending games to simulate."""
+    games = source.get_all("games", "id,game_id,season,spread_home,total")
+
+    if season is None:
+        season = max(int(game["season"]) for game in games)
+
+    games = {
+        game["id"]: game for game in games if int(game["season"]) == season
+    }
+
+    final = set()
+    scores = source.get_all("scores", "game_id,away_score,home_score,status")
+
+    for row in scores:
+        if (
+            row.get("status") != "live"
+            and to_number(row.get("away_score")) is not None
+            and to_number(row.get("home_score")) is not None
+        ):
+            final.add(row["game_id"])
+
+    profiles = {
+        row["id"]: row.get("display_name") or "(no name)"
+        for row in source.get_all("profiles", "id,display_name,status")
+        if row.get("status") == "active"
+    }
+
+    users = sorted(profiles, key=lambda user: profiles[user].lower())
+    user_index = {user: index for index, user in enumerate(users)}
+    wins = [0] * len(users)
+    pending = {}
+
+    projections = load_projections(odds_dir, season)
+
+    for pick in source.get_all("picks", POOL_PICK_COLUMNS, season):
+        game = games.get(pick.get("game_id"))
+        index = user_index.get(pick.get("user_id"))
+
+        if game is None or index is None:
+            continue
+
+        if game["id"] in final:
+            wins[index] += (pick.get("spread_result") == "W")
+            wins[index] += (pick.get("total_result") == "W")
+            continue
+
+        spread_home = to_number(game.get("spread_home"))
+        total_line = to_number(game.get("total"))
+
+        if spread_home is None or total_line is None:
+            continue
+
+        entry = pending.get(game["id"])
+
+        if entry is None:
+            margin, total, home_prob = projections.get(
+                game["game_id"], (-spread_home, total_line, None)
+            )
+            entry = pending[game["id"]] = {
+                "spread_home": spread_home,
+                "total": total_line,
+                "margin": margin,
+                "margin_sd": margin_sd(margin, home_prob),
+                "projected_total": total,
+                "home": [],
+                "away": [],
+                "over": [],
+                "under": [],
+            }
+
+        for side in (pick.get("spread_pick"), pick.get("total_pick")):
+            if side in ("home", "away", "over", "under"):
+                entry[side].append(index)
+
+    return {
+        "season": season,
+        "users": users,
+        "names": [profiles[user] for user in users],
+        "wins": wins,
+        "games": list(pending.values()),
+    }
+
+
+def simulate_chunk_numpy(model: dict, seed: int, chunk: int, sims: int):
+    rng = numpy.random.default_rng([seed, chunk])
+    games = model["games"]
+    user_count = len(model["users"])
+
+    def column(name):
+        return numpy.array([game[name] for game in games], dtype=float)
+
+    def picked(side):
+        matrix = numpy.zeros((len(games), user_count), dtype=numpy.int32)
+        for row, game in enumerate(games):
+            for user in game[side]:
+                matrix[row, user] += 1
+        return matrix
+
+    shape = (sims, len(games))
+    margin = rng.normal(column("margin"), column("margin_sd"), shape)
+    total = rng.normal(column("projected_total"), TOTAL_SD, shape)
+    home = numpy.maximum(numpy.rint((total + margin) / 2), 0)
+    away = numpy.maximum(numpy.rint((total - margin) / 2), 0)
+
+    # Same tests as grade_spread / grade_total, a game per column.
+    cover = home + column("spread_home") - away
+    over = home + away - column("total")
+
+    wins = numpy.asarray(model["wins"], dtype=numpy.int32)
+    wins = (
+        wins
+        + (cover > 0).astype(numpy.int32) @ picked("home")
+        + (cover < 0).astype(numpy.int32) @ picked("away")
+        + (over > 0).astype(numpy.int32) @ picked("over")
+        + (over < 0).astype(numpy.int32) @ picked("under")
+    )
+
+    leaders = wins == wins.max(axis=1, keepdims=True)
+    shares = leaders / leaders.sum(axis=1, keepdims=True)
+    return shares.sum(axis=0).tolist(), wins.sum(axis=0).tolist()
+
+
+def simulate_chunk_python(model: dict, seed: int, chunk: int, sims: int):
+    rng = random.Random(f"{seed}:{chunk}")
+    user_count = len(model["users"])
+    first = [0.0] * user_count
+    total_wins = [0] * user_count
+
+    for _ in range(sims):
+        wins = list(model["wins"])
+
+        for game in model["games"]:
+            margin = rng.gauss(game["margin"], game["margin_sd"])
+            total = rng.gauss(game["projected_total"], TOTAL_SD)
+            home = max(round((total + margin) / 2), 0)
+            away = max(round((total - margin) / 2), 0)
+
+            spread = grade_spread("home", game["spread_home"], away, home)
+            totals = grade_total("over", game["total"], away, home)
+
+            winners = []
+            if spread != "P":
+                winners.append(game["home"] if spread == "W" else game["away"])
+            if totals != "P":
+                winners.append(game["over"] if totals == "W" else game["under"])
+
+            for users in winners:
+                for user in users:
+                    wins[user] += 1
+
+        best = max(wins)
+        leaders = [user for user, count in enumerate(wins) if count == best]
+
+        for user in leaders:
+            first[user] += 1 / len(leaders)
+
+        for user, count in enumerate(wins):
+            total_wins[user] += count
+
+    return first, total_wins
+
+
+def simulate_chunk(model: dict, seed: int, chunk: int, sims: int):
+    if numpy is not None:
+        return simulate_chunk_numpy(model, seed, chunk, sims)
+    return simulate_chunk_python(model, seed, chunk, sims)
+
+
+def simulate(model: dict, sims: int, seed: int, workers: int) -> dict:
+    user_count = len(model["users"])
+    first = [0.0] * user_count
+    expected = [0.0] * user_count
+
+    chunks = [
+        (chunk, min(CHUNK_SIMS, sims - start))
+        for chunk, start in enumerate(range(0, sims, CHUNK_SIMS))
+    ]
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(simulate_chunk, model, seed, chunk, size)
+            for chunk, size in chunks
+        ]
+
+        for future in futures:
+            chunk_first, chunk_wins = future.result()
+            for user in range(user_count):
+                first[user] += chunk_first[user]
+                expected[user] += chunk_wins[user]
+
+    return {
+        user: {
+            "name": model["names"][index],
+            "wins": model["wins"][index],
+            "expected_wins": round(expected[index] / sims, 2),
+            "first_probability": round(first[index] / sims, 4),
+        }
+        for index, user in enumerate(model["users"])
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--season", type=int)
+    parser.add_argument("--sims", type=int, default=1_000_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--snapshot", action="append", default=[])
+    parser.add_argument("--odds-dir", default=str(ODDS_DIR))
+    parser.add_argument("--out-dir", default=str(OUT_DIR))
+    args = parser.parse_args()
+
+    if args.sims < 1:
+        parser.error("--sims must be at least 1")
+
+    if args.snapshot:
+        source = SnapshotSource(args.snapshot)
+    else:
+        source = SupabaseSource()
+
+    try:
+        model = build_model(source, args.season, Path(args.odds_dir))
+    finally:
+        source.close()
+
+    if not model["users"]:
+        raise SystemExit("No active users to simulate")
+
+    started = time.perf_counter()
+    results = simulate(model, args.sims, args.seed, args.workers)
+    elapsed = time.perf_counter() - started
+
+    for result in sorted(
+        results.values(),
+        key=lambda result: -result["first_probability"],
+    ):
+        print(
+            f"{result['name']:<24} {result['first_probability']:7.2%}  "
+            f"wins {result['wins']:>3}  expected {result['expected_wins']:6.2f}"
+        )
+
+    print(
+        f"SIMULATED {args.sims} seasons over {len(model['games'])} pending "
+        f"games in {elapsed:.2f}s "
+        f"({'numpy' if numpy is not None else 'random'})"
+    )
+
+    out_path = Path(args.out_dir) / f"{model['season']}.json"
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    out_path.write_text(
+        json.dumps(
+            {
+                "season": model["season"],
+                "sims": args.sims,
+                "seed": args.seed,
+                "pending_games": len(model["games"]),
+                "users": results,
+            },
+            separators=(",", ":"),
+            sort_keys=True,
+        ),
+        encoding="utf-8",
+    )
+    print(f"WROTE {out_path}")
+
+
+if __name__ == "__main__":
+    main()
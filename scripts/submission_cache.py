@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+# scripts/submission_cache.py
+
+"""Content-addressed cache of raw paste submissions.
+
+A submission is keyed by the SHA-256 of its kind, league, season, week,
+book (odds only) and raw text, with line endings, surrounding whitespace
+and blank lines normalized away; each book's odds are compared with that
+book's last paste. Each entry holds the parsed rows and the result of the
+last sync, so when the same paste is submitted again:
+
+    duplicate   the same key is the week's last successful sync;
+                nothing runs
+    unchanged   a different paste whose rows match the last synced
+                submission for that week; nothing runs either
+    changed     some games differ from (or are missing in) the last
+                synced submission for the week; only those game_ids are
+                written to the changed-games file for the sync steps
+    new         nothing synced yet for the week; every game goes on
+
+Rows are compared without updated_at_utc, which is stamped at parse
+time. The cache lives under SUBMISSION_CACHE_DIR (default
+.cache/submissions). In the workflow:
+
+    python scripts/submission_cache.py check --kind odds --league NFL \
+        --season 2026 --week 1 --book NA --raw-file raw_input.txt \
+        >> "$GITHUB_ENV"
+    ...
+    python scripts/submission_cache.py record --key "$SUBMISSION_KEY"
+
+check prints SUBMISSION_KEY, SUBMISSION_STATUS, SUBMISSION_SKIP and
+CHANGED_GAMES_FILE as environment lines; sync_games_to_supabase.py and
+sync_scores_to_supabase.py read CHANGED_GAMES_FILE through
+changed_games(). record marks the entry synced once the run succeeded.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+import manual_nfl_final_scores
+import manual_nfl_odds
+
+
+CACHE_DIR = Path(os.environ.get("SUBMISSION_CACHE_DIR", ".cache/submissions"))
+
+KINDS = ("odds", "scores")
+
+VOLATILE_FIELDS = ("updated_at_utc",)
+
+SKIP_STATUSES = ("duplicate", "unchanged")
+
+
+def normalize_raw(text: str) -> str:
+    lines = (line.strip() for line in text.replace("\r\n", "\n").split("\n"))
+    return "\n".join(line for line in lines if line)
+
+
+def submission_key(
+    kind: str,
+    league: str,
+    season: str,
+    week: str,
+    text: str,
+    book: str = manual_nfl_odds.DEFAULT_BOOK,
+) -> str:
+    header = f"{kind}\n{league}\n{int(season)}\n{int(week)}\n"
+
+    # The default book keys as before, so existing entries still match.
+    if book != manual_nfl_odds.DEFAULT_BOOK:
+        header += f"{book}\n"
+    return hashlib.sha256(
+        (header + normalize_raw(text)).encode("utf-8")
+    ).hexdigest()
+
+
+def parse_submission(
+    kind: str,
+    league: str,
+    season: str,
+    week: str,
+    text: str,
+    book: str = manual_nfl_odds.DEFAULT_BOOK,
+) -> list[dict]:
+    lines = text.splitlines()
+
+    if kind == "odds":
+        updated_at_utc = datetime.now(timezone.utc).isoformat(
+            timespec="seconds"
+        )
+        return manual_nfl_odds.parse_rows(
+            lines,
+            season,
+            week,
+            updated_at_utc,
+            book,
+            league,
+        )
+
+    return manual_nfl_final_scores.parse_rows(lines, season, week, league)
+
+
+def comparable(row: dict) -> dict:
+    return {
+        name: value
+        for name, value in row.items()
+        if name not in VOLATILE_FIELDS
+    }
+
+
+def changed_game_ids(rows: list[dict], previous: list[dict]) -> list[str]:
+    """game_ids whose rows are new or differ from previous."""
+    before = {}
+    for row in previous:
+        before.setdefault(row["game_id"], []).append(comparable(row))
+
+    after = {}
+    for row in rows:
+        after.setdefault(row["game_id"], []).append(comparable(row))
+
+    return sorted(
+        game_id
+        for game_id, game_rows in after.items()
+        if before.get(game_id) != game_rows
+    )
+
+
+def changed_games() -> set[str] | None:
+    """The game_ids named by CHANGED_GAMES_FILE, or None for all."""
+    path = os.environ.get("CHANGED_GAMES_FILE", "").strip()
+
+    if not path:
+        return None
+
+    return set(Path(path).read_text(encoding="utf-8").split("\n")) - {""}
+
+
+class SubmissionCache:
+    def __init__(self, cache_dir: Path = CACHE_DIR):
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        self.cache_dir = cache_dir
+
+    def entry_path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.json"
+
+    def slot_path(
+        self,
+        kind: str,
+        league: str,
+        season,
+        week,
+        book: str = manual_nfl_odds.DEFAULT_BOOK,
+    ) -> Path:
+        name = f"{league}_{kind}_{season}_wk{int(week):02d}"
+
+        if book != manual_nfl_odds.DEFAULT_BOOK:
+            name += f"_{book}"
+
+        return self.cache_dir / name
+
+    def changed_path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.changed"
+
+    def load(self, key: str) -> dict | None:
+        path = self.entry_path(key)
+
+        if not path.exists():
+            return None
+
+        try:
+            return json.loads(path.read_text(encoding="utf-8"))
+        except json.JSONDecodeError:
+            return None
+
+    def save(self, key: str, entry: dict) -> None:
+        path = self.entry_path(key)
+        temporary = path.with_suffix(".tmp")
+        temporary.write_text(
+            json.dumps(entry, separators=(",", ":")),
+            encoding="utf-8",
+        )
+        temporary.replace(path)
+
+    def last_synced_key(self, kind: str, league: str, season, week, book):
+        slot = self.slot_path(kind, league, season, week, book)
+
+        if not slot.exists():
+            return None
+
+        return slot.read_text(encoding="utf-8").strip()
+
+    def check(
+        self,
+        kind: str,
+        league: str,
+        season: str,
+        week: str,
+        text: str,
+        book: str = manual_nfl_odds.DEFAULT_BOOK,
+    ) -> dict:
+        key = submission_key(kind, league, season, week, text, book)
+        last_key = self.last_synced_key(kind, league, season, week, book)
+
+        if key == last_key and self.entry_path(key).exists():
+            return {"key": key, "status": "duplicate", "changed": []}
+
+        # A paste seen before (a failed run, or one since superseded)
+        # keeps its parsed rows.
+        entry = self.load(key)
+        if entry is not None:
+            rows = entry["rows"]
+        else:
+            rows = parse_submission(kind, league, season, week, text, book)
+
+        previous = self.load(last_key) if last_key else None
+
+        if previous is None:
+            status = "new"
+            changed = sorted({row["game_id"] for row in rows})
+        else:
+            changed = changed_game_ids(rows, previous["rows"])
+            status = "changed" if changed else "unchanged"
+
+        self.save(
+            key,
+            {
+                "kind": kind,
+                "league": league,
+                "season": str(int(season)),
+                "week": str(int(week)),
+                "book": book,
+                "rows": rows,
+                "sync": entry.get("sync") if entry else None,
+            },
+        )
+        self.changed_path(key).write_text(
+            "".join(f"{game_id}\n" for game_id in changed),
+            encoding="utf-8",
+        )
+
+        return {"key": key, "status": status, "changed": changed}
+
+    def record(self, key: str, ok: bool = True) -> None:
+        """Store the sync result; a success becomes the week's baseline."""
+        entry = self.load(key)
+
+        if entry is None:
+            raise ValueError(f"No cached submission {key}")
+
+        entry["sync"] = {
+            "ok": ok,
+            "at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        }
+        self.save(key, entry)
+
+        if ok:
+            self.slot_path(
+                entry["kind"],
+                entry["league"],
+                entry["season"],
+                entry["week"],
+                entry.get("book", manual_nfl_odds.DEFAULT_BOOK),
+            ).write_text(key, encoding="utf-8")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    check = commands.add_parser("check")
+    check.add_argument("--kind", required=True, choices=KINDS)
+    check.add_argument("--league", default="NFL")
+    check.add_argument("--season", required=True)
+    check.add_argument("--week", required=True)
+    check.add_argument("--book", default=manual_nfl_odds.DEFAULT_BOOK)
+    check.add_argument("--raw-file", required=True)
+
+    record = commands.add_parser("record")
+    record.add_argument("--key", required=True)
+    record.add_argument("--failed", action="store_true")
+
+    args = parser.parse_args()
+    cache = SubmissionCache()
+
+    if args.command == "record":
+        cache.record(args.key, ok=not args.failed)
+        print(f"RECORDED submission {args.key}", file=sys.stderr)
+        return
+
+    text = Path(args.raw_file).read_text(encoding="utf-8", errors="replace")
+    if args.kind == "odds":
+        book = manual_nfl_odds.book_name(args.book)
+    else:
+        book = manual_nfl_odds.DEFAULT_BOOK
+
+    result = cache.check(
+        args.kind, args.league, args.season, args.week, text, book
+    )
+
+    print(
+        f"SUBMISSION {result['status']}: {len(result['changed'])} games "
+        "to sync",
+        file=sys.stderr,
+    )
+
+    # Environment lines for $GITHUB_ENV.
+    print(f"SUBMISSION_KEY={result['key']}")
+    print(f"SUBMISSION_STATUS={result['status']}")
+    print(f"SUBMISSION_SKIP={str(result['status'] in SKIP_STATUSES).lower()}")
+    print(f"CHANGED_GAMES_FILE={cache.changed_path(result['key'])}")
+
+
+if __name__ == "__main__":
+    main()
@@ -12,9 +12,24 @@ from urllib.error import HTTPError, URLError
 from urllib.parse import urlencode
 from urllib.request import Request, urlopen
 
+from consensus import build_consensus
+from parser_engine import week_bounds, week_type
+from schema_checks import get_validator
+from submission_cache import changed_games
+from teams import get_registry
+from write_scheduler import (
+    RETRY_STATUSES,
+    Throttled,
+    WriteScheduler,
+    retry_after,
+)
+
 
 CSV_PATH = Path("docs/data/weekly/latest.csv")
 
+# Games per upsert request.
+WRITE_BATCH_ROWS = 500
+
 REQUIRED_HEADERS = {
     "game_id",
     "season",
@@ -93,16 +108,18 @@ def validate_timestamp(
 def week_type_for_week(
     week_number: int,
     row_number: int,
+    league: str = "NFL",
 ) -> str:
-    if 1 <= week_number <= 18:
-        return "regular"
+    week_type_name = week_type(league, week_number)
 
-    if 19 <= week_number <= 22:
-        return "playoff"
+    if week_type_name is not None:
+        return week_type_name
+
+    first_week, last_week = week_bounds(league)
 
     raise ValueError(
-        f"Row {row_number}: week must be between 1 and 22; "
-        f"received {week_number}"
+        f"Row {row_number}: week must be between {first_week} and "
+        f"{last_week}; received {week_number}"
     )
 
 
@@ -130,21 +147,40 @@ def load_consensus_games(path: Path) -> list[dict]:
                 + ", ".join(missing_headers)
             )
 
-        games = []
-        seen_game_ids = set()
+        # Multi-book CSVs get their consensus rows derived here, so
+        # nobody has to flag them by hand.
+        first_row_numbers = {}
+        book_rows = []
 
         for row_number, row in enumerate(
             reader,
             start=2,
         ):
+            first_row_numbers.setdefault(
+                row.get("game_id"),
+                row_number,
+            )
+            book_rows.append(row)
+
+        games = []
+        seen_game_ids = set()
+        teams = get_registry()
+
+        for row in build_consensus(book_rows):
+            row_number = first_row_numbers[
+                row.get("game_id")
+            ]
+
             if (
                 row.get("is_consensus") or ""
             ).strip() != "1":
                 continue
 
-            game_id = (
-                row.get("game_id") or ""
-            ).strip()
+            game_id = teams.canonical_game_id(
+                (
+                    row.get("game_id") or ""
+                ).strip()
+            )
 
             away_team = (
                 row.get("away_team") or ""
@@ -187,6 +223,14 @@ def load_consensus_games(path: Path) -> list[dict]:
                     f"Row {row_number}: home_team is blank"
                 )
 
+            try:
+                away_team = teams.canonical(away_team)
+                home_team = teams.canonical(home_team)
+            except ValueError as error:
+                raise ValueError(
+                    f"Row {row_number}: {error}"
+                ) from error
+
             if away_team == home_team:
                 raise ValueError(
                     f"Row {row_number}: away_team and "
@@ -264,22 +308,11 @@ def load_consensus_games(path: Path) -> list[dict]:
     return games
 
 
-def upsert_games(
-    supabase_url: str,
+def post_games(
+    endpoint: str,
     service_role_key: str,
     games: list[dict],
 ) -> None:
-    query = urlencode(
-        {
-            "on_conflict": "game_id",
-        }
-    )
-
-    endpoint = (
-        f"{supabase_url.rstrip('/')}"
-        f"/rest/v1/games?{query}"
-    )
-
     body = json.dumps(
         games,
         separators=(",", ":"),
@@ -331,18 +364,70 @@ def upsert_games(
             errors="replace",
         )
 
+        if error.code in RETRY_STATUSES:
+            raise Throttled(
+                "Supabase upsert throttled with "
+                f"HTTP {error.code}",
+                retry_after(
+                    error.headers.get("Retry-After")
+                ),
+            ) from error
+
         raise RuntimeError(
             "Supabase upsert failed with "
             f"HTTP {error.code}: {response_body}"
         ) from error
 
-    except URLError as error:
-        raise RuntimeError(
+    except (URLError, TimeoutError) as error:
+        # A merge-duplicates upsert is idempotent, so a timed-out or
+        # dropped request is safe to send again.
+        raise Throttled(
             "Could not connect to Supabase: "
-            f"{error.reason}"
+            f"{getattr(error, 'reason', error)}"
         ) from error
 
 
+def upsert_games(
+    supabase_url: str,
+    service_role_key: str,
+    games: list[dict],
+) -> WriteScheduler:
+    # Every schema violation at once, before any batch is sent.
+    get_validator("games").validate(games)
+
+    query = urlencode(
+        {
+            "on_conflict": "game_id",
+        }
+    )
+
+    endpoint = (
+        f"{supabase_url.rstrip('/')}"
+        f"/rest/v1/games?{query}"
+    )
+
+    scheduler = WriteScheduler()
+
+    scheduler.map(
+        lambda batch: post_games(
+            endpoint,
+            service_role_key,
+            batch,
+        ),
+        [
+            games[start:start + WRITE_BATCH_ROWS]
+            for start in range(
+                0,
+                len(games),
+                WRITE_BATCH_ROWS,
+            )
+        ],
+        weight=len,
+    )
+
+    return scheduler
+
+
 def main() -> None:
     supabase_url = require_environment_variable(
         "SUPABASE_URL"
@@ -358,12 +443,24 @@ def main() -> None:
         CSV_PATH
     )
 
-    upsert_games(
+    # Set by submission_cache.py when only some games changed.
+    only_games = changed_games()
+
+    if only_games is not None:
+        games = [
+            game
+            for game in games
+            if game["game_id"] in only_games
+        ]
+
+    scheduler = upsert_games(
         supabase_url,
         service_role_key,
         games,
     )
 
+    scheduler.report()
+
     print(
         f"UPSERTED {len(games)} games "
         f"from {CSV_PATH}"
@@ -0,0 +1,440 @@
+#!/usr/bin/env python3
+# scripts/sync_live_scores.py
+
+"""Stream in-progress scores to Supabase and grade picks provisionally.
+
+Reads one JSON object per line from a feed:
+
+    {"game_id": "2026_09_13_Detroit Lions_New Orleans Saints",
+     "away_score": 7, "home_score": 10, "status": "live"}
+
+The feed is either a file that is tailed as it grows (--feed PATH) or a
+local TCP socket that accepts newline-delimited updates
+(--listen HOST:PORT). Updates are coalesced per game and flushed at
+most once every --interval seconds; only games whose score or status
+changed since the last flush are upserted.
+
+On each flush the games that changed are graded against the week's
+picks, which are read once at start-up. The provisional spread and
+total state of each game, with W / L / P counts of the picks on it, is
+written to docs/data/live/<season>_wk<week>_live.json. When a game
+arrives with status "final" its picks are graded for real with the same
+conditional write grade_picks.py uses, so the full table never needs a
+re-grade during the day.
+
+Requires SUPABASE_URL, SUPABASE_SERVICE_ROLE_KEY, SEASON and WEEK.
+"""
+
+import argparse
+import json
+import selectors
+import socket
+import time
+import urllib.parse
+from datetime import datetime, timezone
+from pathlib import Path
+
+from grade_picks import PICK_COLUMNS, grade_spread, grade_total
+from sync_scores_to_supabase import (
+    batches,
+    fetch_page,
+    load_games,
+    parse_score,
+    request_supabase,
+    require_environment,
+    set_games_status,
+    upsert_scores,
+)
+from teams import get_registry
+
+
+OUT_DIR = Path("docs/data/live")
+
+LIVE_STATUSES = {"live", "final"}
+
+POLL_SECONDS = 0.25
+
+# Values per in.(...) filter, well under URL length limits, and rows per
+# page of each filter's read.
+IN_BATCH = 100
+PAGE_SIZE = 1000
+
+
+def tail_lines(path: Path, once: bool):
+    """Yield lines appended to path; None while idle so callers can flush."""
+    partial = ""
+
+    with path.open("r", encoding="utf-8") as file:
+        while True:
+            partial += file.readline()
+
+            if partial.endswith("\n"):
+                yield partial
+                partial = ""
+                continue
+
+            if once:
+                if partial:
+                    yield partial
+                return
+
+            yield None
+            time.sleep(POLL_SECONDS)
+
+
+def socket_lines(address: str):
+    """Yield lines sent by any client of a local TCP listener.
+
+    Clients may connect at any time and stay connected side by side;
+    None is yielded whenever nothing arrives for POLL_SECONDS, so
+    callers can flush while every client is quiet."""
+    host, _, port = address.rpartition(":")
+    selector = selectors.DefaultSelector()
+    partial = {}
+
+    with socket.create_server((host or "127.0.0.1", int(port))) as server:
+        server.setblocking(False)
+        selector.register(server, selectors.EVENT_READ)
+
+        try:
+            while True:
+                events = selector.select(POLL_SECONDS)
+
+                if not events:
+                    yield None
+                    continue
+
+                for key, _ in events:
+                    if key.fileobj is server:
+                        connection, _ = server.accept()
+                        connection.setblocking(False)
+                        selector.register(connection, selectors.EVENT_READ)
+                        partial[connection] = b""
+                        continue
+
+                    connection = key.fileobj
+                    try:
+                        data = connection.recv(65536)
+                    except ConnectionError:
+                        data = b""
+
+                    if not data:
+                        # The client hung up: its last line may lack a
+                        # newline.
+                        selector.unregister(connection)
+                        connection.close()
+                        data = partial.pop(connection)
+                        if data:
+                            yield data.decode("utf-8", "replace")
+                        continue
+
+                    *lines, partial[connection] = (
+                        partial[connection] + data
+                    ).split(b"\n")
+
+                    for line in lines:
+                        yield line.decode("utf-8", "replace") + "\n"
+        finally:
+            for connection in partial:
+                selector.unregister(connection)
+                connection.close()
+            selector.close()
+
+
+def parse_update(line: str) -> dict:
+    record = json.loads(line)
+    game_id = get_registry().canonical_game_id(
+        str(record.get("game_id") or "").strip()
+    )
+    status = str(record.get("status") or "live").strip()
+
+    if not game_id:
+        raise ValueError(f"Feed update has no game_id: {line.strip()}")
+
+    if status not in LIVE_STATUSES:
+        raise ValueError(f"Feed update has invalid status {status!r}")
+
+    return {
+        "game_id": game_id,
+        "away_score": parse_score(str(record["away_score"]), "away_score"),
+        "home_score": parse_score(str(record["home_score"]), "home_score"),
+        "status": status,
+    }
+
+
+def get_in(
+    table: str,
+    select: str,
+    column: str,
+    values: list[str],
+    filters: dict | None = None,
+) -> list[dict]:
+    """Rows whose column is one of values, IN_BATCH values per filter.
+    Each filter is read in pages ordered by id, as grade_picks.py does,
+    since a filter can match more rows than PostgREST returns at once."""
+    rows = []
+
+    for batch in batches(values, IN_BATCH):
+        params = {
+            "select": select,
+            column: f"in.({','.join(batch)})",
+            **(filters or {}),
+            "order": "id",
+        }
+        offset = 0
+
+        while True:
+            page = list(
+                fetch_page(
+                    table,
+                    dict(params, offset=str(offset), limit=str(PAGE_SIZE)),
+                )
+            )
+            rows.extend(page)
+
+            if len(page) < PAGE_SIZE:
+                break
+
+            offset += PAGE_SIZE
+
+    return rows
+
+
+def load_lines(game_uuids: list[str]) -> dict[str, tuple]:
+    rows = get_in("games", "id,spread_home,total", "id", game_uuids)
+
+    return {
+        row["id"]: (row.get("spread_home"), row.get("total"))
+        for row in rows
+    }
+
+
+def load_picks(game_uuids: list[str], season: int) -> dict[str, list[dict]]:
+    rows = get_in(
+        "picks",
+        PICK_COLUMNS,
+        "game_id",
+        game_uuids,
+        # Keeps the read on the season's partition.
+        filters={"season": f"eq.{season}"},
+    )
+
+    picks_by_game = {}
+    for row in rows:
+        picks_by_game.setdefault(row["game_id"], []).append(row)
+
+    return picks_by_game
+
+
+def patch_pick(pick: dict, spread_result, total_result) -> bool:
+    """Conditional write, as in grade_picks.py; False on a conflict."""
+    params = {"id": f"eq.{pick['id']}"}
+
+    for column in ("spread_result", "total_result"):
+        read_value = pick.get(column)
+        params[column] = "is.null" if read_value is None else f"eq.{read_value}"
+
+    query = urllib.parse.urlencode(params, safe=",.*()-")
+    updated = request_supabase(
+        "PATCH",
+        f"/rest/v1/picks?{query}",
+        payload={"spread_result": spread_result, "total_result": total_result},
+        prefer="return=representation",
+    )
+
+    return bool(updated)
+
+
+class LiveBoard:
+    def __init__(self, season: int, week: int):
+        self.season = season
+        self.week = week
+        self.game_ids = load_games(season, week)
+
+        if not self.game_ids:
+            raise ValueError(f"No games found for {season} week {week}")
+
+        uuids = list(self.game_ids.values())
+        self.lines = load_lines(uuids)
+        self.picks_by_game = load_picks(uuids, season)
+        self.pending = {}
+        self.sent = {}
+        self.board = {}
+        self.output_path = OUT_DIR / f"{season}_wk{week:02d}_live.json"
+
+    def add(self, update: dict) -> None:
+        if update["game_id"] not in self.game_ids:
+            print(f"SKIPPED unknown game_id: {update['game_id']}")
+            return
+
+        self.pending[update["game_id"]] = update
+
+    def flush(self) -> None:
+        changed = [
+            update
+            for game_id, update in self.pending.items()
+            if self.sent.get(game_id) != update
+        ]
+        self.pending = {}
+
+        if not changed:
+            return
+
+        upsert_scores(changed, self.game_ids, self.season)
+
+        for status in LIVE_STATUSES:
+            uuids = [
+                self.game_ids[update["game_id"]]
+                for update in changed
+                if update["status"] == status
+                and (self.sent.get(update["game_id"]) or {}).get("status")
+                != status
+            ]
+            if uuids:
+                set_games_status(uuids, status)
+
+        finals = 0
+        for update in changed:
+            self.sent[update["game_id"]] = update
+            self.board[update["game_id"]] = self.grade_game(update)
+
+            if update["status"] == "final":
+                finals += self.finalize_game(update)
+
+        self.write_board()
+        print(
+            f"FLUSHED {len(changed)} games "
+            f"({finals} picks graded final)"
+        )
+
+    def grade_game(self, update: dict) -> dict:
+        """Provisional state of one game and the picks on it."""
+        uuid = self.game_ids[update["game_id"]]
+        spread_home, total_line = self.lines.get(uuid, (None, None))
+        away = update["away_score"]
+        home = update["home_score"]
+
+        entry = {
+            "away_score": away,
+            "home_score": home,
+            "status": update["status"],
+            "spread": None,
+            "total": None,
+            "spread_picks": {"W": 0, "L": 0, "P": 0},
+            "total_picks": {"W": 0, "L": 0, "P": 0},
+        }
+
+        if spread_home is not None:
+            spread_home = float(spread_home)
+            leader = grade_spread("home", spread_home, away, home)
+            entry["spread"] = {"W": "home", "L": "away", "P": "push"}[leader]
+
+        if total_line is not None:
+            total_line = float(total_line)
+            leader = grade_total("over", total_line, away, home)
+            entry["total"] = {"W": "over", "L": "under", "P": "push"}[leader]
+
+        for pick in self.picks_by_game.get(uuid, []):
+            if spread_home is not None:
+                result = grade_spread(pick["spread_pick"], spread_home, away, home)
+                if result:
+                    entry["spread_picks"][result] += 1
+
+            if total_line is not None:
+                result = grade_total(pick["total_pick"], total_line, away, home)
+                if result:
+                    entry["total_picks"][result] += 1
+
+        return entry
+
+    def finalize_game(self, update: dict) -> int:
+        uuid = self.game_ids[update["game_id"]]
+        spread_home, total_line = self.lines.get(uuid, (None, None))
+
+        if spread_home is None or total_line is None:
+            return 0
+
+        graded = 0
+        away = update["away_score"]
+        home = update["home_score"]
+
+        for pick in self.picks_by_game.get(uuid, []):
+            spread_result = grade_spread(
+                pick["spread_pick"], float(spread_home), away, home
+            )
+            total_result = grade_total(
+                pick["total_pick"], float(total_line), away, home
+            )
+
+            if (
+                spread_result == pick.get("spread_result")
+                and total_result == pick.get("total_result")
+            ):
+                continue
+
+            if patch_pick(pick, spread_result, total_result):
+                pick["spread_result"] = spread_result
+                pick["total_result"] = total_result
+                graded += 1
+            else:
+                print(f"CONFLICT on pick {pick['id']}; left for grade_picks.py")
+
+        return graded
+
+    def write_board(self) -> None:
+        self.output_path.parent.mkdir(parents=True, exist_ok=True)
+        document = {
+            "season": self.season,
+            "week": self.week,
+            "updated_at_utc": datetime.now(timezone.utc).isoformat(
+                timespec="seconds"
+            ),
+            "games": self.board,
+        }
+        temporary_path = self.output_path.with_suffix(".json.tmp")
+        temporary_path.write_text(
+            json.dumps(document, separators=(",", ":"), sort_keys=True),
+            encoding="utf-8",
+        )
+        temporary_path.replace(self.output_path)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--feed")
+    source.add_argument("--listen")
+    parser.add_argument("--interval", type=float, default=5.0)
+    parser.add_argument("--once", action="store_true")
+    args = parser.parse_args()
+
+    season = int(require_environment("SEASON"))
+    week = int(require_environment("WEEK"))
+    board = LiveBoard(season, week)
+
+    if args.feed:
+        lines = tail_lines(Path(args.feed), args.once)
+    else:
+        lines = socket_lines(args.listen)
+
+    last_flush = time.monotonic()
+
+    try:
+        for line in lines:
+            if line is not None and line.strip():
+                try:
+                    board.add(parse_update(line))
+                except (ValueError, KeyError) as error:
+                    print(f"SKIPPED bad update: {error}")
+
+            if time.monotonic() - last_flush >= args.interval:
+                board.flush()
+                last_flush = time.monotonic()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        board.flush()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,32 @@
 #!/usr/bin/env python3
 
 import csv
-import json
 import os
 import urllib.error
 import urllib.parse
 import urllib.request
 from pathlib import Path
+from typing import Iterator
 
+from json_stream import dumps, iter_array, loads, read_chunks
+from replica_cache import ReplicaCache
+from schema_checks import get_validator
+from submission_cache import changed_games
+from teams import get_registry
+from write_scheduler import (
+    RETRY_STATUSES,
+    Throttled,
+    WriteScheduler,
+    retry_after,
+)
+
+
+REQUEST_TIMEOUT = 60
+
+# Rows per upsert request, and game ids per status PATCH (kept well
+# under URL length limits).
+WRITE_BATCH_ROWS = 500
+STATUS_BATCH_IDS = 100
 
 REQUIRED_HEADERS = {
     "season",
@@ -27,12 +46,12 @@ def require_environment(name: str) -> str:
     return value
 
 
-def request_supabase(
+def build_request(
     method: str,
     path: str,
     payload=None,
     prefer: str | None = None,
-):
+) -> urllib.request.Request:
     supabase_url = require_environment("SUPABASE_URL").rstrip("/")
     service_role_key = require_environment("SUPABASE_SERVICE_ROLE_KEY")
 
@@ -46,32 +65,74 @@ def request_supabase(
 
     if payload is not None:
         headers["Content-Type"] = "application/json"
-        data = json.dumps(payload).encode("utf-8")
+        data = dumps(payload)
 
     if prefer:
         headers["Prefer"] = prefer
 
-    request = urllib.request.Request(
+    return urllib.request.Request(
         url=f"{supabase_url}{path}",
         data=data,
         headers=headers,
         method=method,
     )
 
+
+def request_failed(error: urllib.error.HTTPError) -> RuntimeError:
+    error_text = error.read().decode("utf-8", errors="replace")
+    message = (
+        f"Supabase request failed: {error.code} {error.reason}\n"
+        f"{error_text}"
+    )
+
+    if error.code in RETRY_STATUSES:
+        return Throttled(
+            message, retry_after(error.headers.get("Retry-After"))
+        )
+
+    return RuntimeError(message)
+
+
+def request_supabase(
+    method: str,
+    path: str,
+    payload=None,
+    prefer: str | None = None,
+):
+    request = build_request(method, path, payload, prefer)
+
     try:
-        with urllib.request.urlopen(request) as response:
-            response_text = response.read().decode("utf-8").strip()
+        with urllib.request.urlopen(
+            request, timeout=REQUEST_TIMEOUT
+        ) as response:
+            response_body = response.read().strip()
     except urllib.error.HTTPError as error:
-        error_text = error.read().decode("utf-8", errors="replace")
-        raise RuntimeError(
-            f"Supabase request failed: {error.code} {error.reason}\n"
-            f"{error_text}"
-        ) from error
+        raise request_failed(error) from error
+    except (urllib.error.URLError, TimeoutError, ConnectionError) as error:
+        raise Throttled(f"Supabase request failed: {error}") from error
 
-    if not response_text:
+    if not response_body:
         return None
 
-    return json.loads(response_text)
+    return loads(response_body)
+
+
+def stream_supabase(path: str) -> Iterator[dict]:
+    """GET path and yield the rows of the response as they arrive.
+
+    Fails as request_supabase() does, also when the connection drops or
+    times out partway through the body."""
+    request = build_request("GET", path)
+
+    try:
+        with urllib.request.urlopen(
+            request, timeout=REQUEST_TIMEOUT
+        ) as response:
+            yield from iter_array(read_chunks(response))
+    except urllib.error.HTTPError as error:
+        raise request_failed(error) from error
+    except (urllib.error.URLError, TimeoutError, ConnectionError) as error:
+        raise Throttled(f"Supabase request failed: {error}") from error
 
 
 def parse_score(value: str, field_name: str) -> int:
@@ -110,7 +171,7 @@ def read_score_rows(path: Path, season: int, week: int) -> list[dict]:
         for line_number, row in enumerate(reader, start=2):
             row_season = row["season"].strip()
             row_week = row["week"].strip()
-            game_id = row["game_id"].strip()
+            game_id = get_registry().canonical_game_id(row["game_id"].strip())
 
             if row_season != str(season):
                 raise ValueError(
@@ -152,68 +213,125 @@ def read_score_rows(path: Path, season: int, week: int) -> list[dict]:
     return rows
 
 
+def fetch_page(table: str, params: dict) -> Iterator[dict]:
+    query = urllib.parse.urlencode(params, safe=",.*()-:")
+    return stream_supabase(f"/rest/v1/{table}?{query}")
+
+
 def load_games(season: int, week: int) -> dict[str, str]:
-    query = urllib.parse.urlencode(
-        {
-            "select": "id,game_id",
-            "season": f"eq.{season}",
-            "week": f"eq.{week}",
-        },
-        safe=",.*()-",
-    )
+    cache = ReplicaCache(fetch_page)
 
-    rows = request_supabase(
-        "GET",
-        f"/rest/v1/games?{query}",
-    )
+    try:
+        rows = cache.rows("games", ["id", "game_id", "season", "week"])
+    finally:
+        cache.close()
+
+    # Keyed by canonical game_id, so a team spelled differently in the
+    # score paste and in the games table still matches.
+    canonical_game_id = get_registry().canonical_game_id
 
     return {
-        row["game_id"]: row["id"]
-        for row in rows or []
+        canonical_game_id(row["game_id"]): row["id"]
+        for row in rows
+        if row["season"] == season and row["week"] == week
     }
 
 
-def upsert_scores(score_rows: list[dict], game_ids: dict[str, str]) -> None:
+def batches(values: list, size: int) -> list[list]:
+    return [
+        values[start:start + size]
+        for start in range(0, len(values), size)
+    ]
+
+
+def upsert_scores(
+    score_rows: list[dict],
+    game_ids: dict[str, str],
+    season: int,
+    scheduler: WriteScheduler | None = None,
+) -> None:
+    # The conflict target becomes (game_id, season) once season is
+    # backfilled, before the partition swap (step 3 of the
+    # season_partitions migration).
     payload = [
         {
             "game_id": game_ids[row["game_id"]],
+            "season": season,
             "home_score": row["home_score"],
             "away_score": row["away_score"],
-            "status": "final",
+            "status": row.get("status", "final"),
         }
         for row in score_rows
     ]
 
-    request_supabase(
-        "POST",
-        "/rest/v1/scores?on_conflict=game_id",
-        payload=payload,
-        prefer="resolution=merge-duplicates,return=minimal",
+    # Every schema violation at once, before any batch is sent.
+    get_validator("scores").validate(payload)
+
+    # Upserts with merge-duplicates are idempotent, so the scheduler may
+    # retry a batch.
+    (scheduler or WriteScheduler()).map(
+        lambda batch: request_supabase(
+            "POST",
+            "/rest/v1/scores?on_conflict=game_id",
+            payload=batch,
+            prefer="resolution=merge-duplicates,return=minimal",
+        ),
+        batches(payload, WRITE_BATCH_ROWS),
+        weight=len,
     )
 
 
-def mark_games_final(game_uuids: list[str]) -> None:
-    filter_value = f"in.({','.join(game_uuids)})"
+def mark_games_final(
+    game_uuids: list[str],
+    scheduler: WriteScheduler | None = None,
+) -> None:
+    set_games_status(game_uuids, "final", scheduler)
 
-    query = urllib.parse.urlencode(
-        {"id": filter_value},
-        safe=",.*()-",
-    )
 
-    request_supabase(
-        "PATCH",
-        f"/rest/v1/games?{query}",
-        payload={"status": "final"},
-        prefer="return=minimal",
-    )
+def set_games_status(
+    game_uuids: list[str],
+    status: str,
+    scheduler: WriteScheduler | None = None,
+) -> None:
+    get_validator("games").validate([{"status": status}], partial=True)
 
+    def patch(batch: list[str]) -> None:
+        query = urllib.parse.urlencode(
+            {"id": f"in.({','.join(batch)})"},
+            safe=",.*()-",
+        )
 
-def main() -> None:
-    output_path = Path(require_environment("OUTPUT_PATH"))
-    season = int(require_environment("SEASON"))
-    week = int(require_environment("WEEK"))
+        request_supabase(
+            "PATCH",
+            f"/rest/v1/games?{query}",
+            payload={"status": status},
+            prefer="return=minimal",
+        )
 
+    (scheduler or WriteScheduler()).map(
+        patch,
+        batches(game_uuids, STATUS_BATCH_IDS),
+        weight=len,
+    )
+
+
+def sync_scores(
+    output_path: Path,
+    season: int,
+    week: int,
+    only_games: set[str] | None = None,
+) -> int:
+    """Sync the week's scores; with only_games, just those game_ids."""
     score_rows = read_score_rows(output_path, season, week)
+
+    if only_games is not None:
+        score_rows = [
+            row for row in score_rows if row["game_id"] in only_games
+        ]
+
+        if not score_rows:
+            return 0
+
     games_by_game_id = load_games(season, week)
 
     missing_game_ids = [
@@ -229,16 +347,28 @@ def main() -> None:
             + "\n".join(missing_game_ids)
         )
 
-    upsert_scores(score_rows, games_by_game_id)
+    scheduler = WriteScheduler()
+    upsert_scores(score_rows, games_by_game_id, season, scheduler)
 
     game_uuids = [
         games_by_game_id[row["game_id"]]
         for row in score_rows
     ]
 
-    mark_games_final(game_uuids)
+    mark_games_final(game_uuids, scheduler)
+    scheduler.report()
+
+    return len(score_rows)
+
+
+def main() -> None:
+    output_path = Path(require_environment("OUTPUT_PATH"))
+    season = int(require_environment("SEASON"))
+    week = int(require_environment("WEEK"))
+
+    synced = sync_scores(output_path, season, week, changed_games())
 
-    print(f"SYNCED SCORES: {len(score_rows)} rows")
+    print(f"SYNCED SCORES: {synced} rows")
 
 
 if __name__ == "__main__":
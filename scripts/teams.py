@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+# scripts/teams.py
+
+"""Canonical team registry.
+
+docs/mappings/team_abbr.csv lists every NFL team once, with its
+abbreviation and a small integer id that never changes (add new teams
+at the end with the next id). docs/mappings/team_aliases.csv maps
+historical names, short forms and other abbreviations to a team's
+abbreviation.
+
+TeamRegistry precomputes one dict from normalized text (lowercase,
+punctuation and a trailing "(3-1)" record dropped) to team id, covering
+each full name, abbreviation, nickname and alias, so every lookup is a
+single hash probe:
+
+    registry = get_registry("NFL")
+    registry.team_id("Washington Redskins")     # 32
+    registry.canonical("SF")                    # "San Francisco 49ers"
+
+Parsers store canonical names, so a renamed or misspelled team still
+builds the game_id the games table already has; canonical_game_id()
+rewrites an existing one the same way. Leagues without a team file in
+parser_engine.LAYOUTS get an empty registry that passes names through.
+"""
+
+import csv
+import re
+from functools import lru_cache
+from pathlib import Path
+
+from parser_engine import LAYOUTS
+
+
+RECORD_RE = re.compile(r"\s*\([^)]*\)\s*$")
+KEY_RE = re.compile(r"[^0-9a-z]+")
+
+GAME_ID_PARTS = 5
+
+
+def team_key(name: str) -> str:
+    return KEY_RE.sub(" ", RECORD_RE.sub("", name).casefold()).strip()
+
+
+class TeamRegistry:
+    __slots__ = ("names", "abbrs", "ids")
+
+    def __init__(self, teams: list[tuple], aliases: list[tuple]):
+        size = max((team_id for team_id, _, _ in teams), default=0) + 1
+        # Id 0 is never assigned.
+        self.names = [""] * size
+        self.abbrs = [""] * size
+        self.ids = {}
+
+        by_abbr = {}
+
+        for team_id, name, abbr in teams:
+            if self.names[team_id]:
+                raise ValueError(f"Duplicate team id {team_id}")
+
+            self.names[team_id] = name
+            self.abbrs[team_id] = abbr
+            by_abbr[abbr] = team_id
+
+            for key in (name, abbr, name.rsplit(" ", 1)[-1]):
+                self.add(key, team_id)
+
+        for alias, abbr in aliases:
+            if abbr not in by_abbr:
+                raise ValueError(f"Alias {alias!r} names unknown team {abbr}")
+            self.add(alias, by_abbr[abbr])
+
+    def add(self, name: str, team_id: int) -> None:
+        key = team_key(name)
+
+        if self.ids.get(key, team_id) != team_id:
+            raise ValueError(f"Team name {name!r} is ambiguous")
+
+        self.ids[key] = team_id
+
+    def resolve(self, name: str) -> int | None:
+        return self.ids.get(team_key(name))
+
+    def team_id(self, name: str) -> int:
+        team_id = self.resolve(name)
+
+        if team_id is None:
+            raise ValueError(f"Unknown team: {name!r}")
+
+        return team_id
+
+    def name(self, team_id: int) -> str:
+        return self.names[team_id]
+
+    def abbr(self, team_id: int) -> str:
+        return self.abbrs[team_id]
+
+    def canonical(self, name: str) -> str:
+        """The registry's full name; unchanged when there is no registry."""
+        if not self.ids:
+            return RECORD_RE.sub("", name).strip()
+
+        return self.names[self.team_id(name)]
+
+    def key(self, name: str) -> int | str:
+        """A compact grouping key: the id, or the name if unknown."""
+        team_id = self.resolve(name)
+        return name if team_id is None else team_id
+
+    def label(self, key: int | str) -> str:
+        return self.names[key] if isinstance(key, int) else key
+
+    def canonical_game_id(self, game_id: str) -> str:
+        """Rewrite <yyyy>_<mm>_<dd>_<home>_<away> with canonical names;
+        ids in any other shape, or with unknown teams, are unchanged."""
+        parts = game_id.split("_")
+
+        if len(parts) != GAME_ID_PARTS or not self.ids:
+            return game_id
+
+        home = self.resolve(parts[3])
+        away = self.resolve(parts[4])
+
+        if home is None or away is None:
+            return game_id
+
+        return "_".join(parts[:3] + [self.names[home], self.names[away]])
+
+
+def read_csv(path: Path) -> list[dict]:
+    with path.open("r", encoding="utf-8-sig", newline="") as file:
+        return list(csv.DictReader(file))
+
+
+def load_registry(team_file: Path, alias_file: Path | None = None):
+    teams = [
+        (int(row["Id"]), row["Team"].strip(), row["Abbr"].strip())
+        for row in read_csv(team_file)
+    ]
+    aliases = []
+
+    if alias_file is not None and alias_file.exists():
+        aliases = [
+            (row["Alias"].strip(), row["Abbr"].strip())
+            for row in read_csv(alias_file)
+        ]
+
+    return TeamRegistry(teams, aliases)
+
+
+@lru_cache(maxsize=None)
+def get_registry(league: str = "NFL") -> TeamRegistry:
+    spec = LAYOUTS.get(league, {})
+
+    if not spec.get("team_file"):
+        return TeamRegistry([], [])
+
+    alias_file = spec.get("alias_file")
+    return load_registry(
+        Path(spec["team_file"]),
+        Path(alias_file) if alias_file else None,
+    )
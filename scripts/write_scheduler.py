@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+# scripts/write_scheduler.py
+
+"""Adaptive concurrency for Supabase writes.
+
+WriteScheduler.map(function, items) runs function(item) for every item
+on a thread pool, like ThreadPoolExecutor.map, but keeps the number of
+requests in flight at a limit it adjusts as it goes (AIMD, as TCP does):
+
+    a write that succeeds within TARGET_LATENCY   limit += 1 / limit
+    while the limit is in use                     (about +1 per round)
+    a slower write, or one that raises            limit *= DECREASE
+                                                  (at most once per round)
+
+where a round is the smoothed latency of recent writes, so a bulk
+regrade or backfill climbs to whatever rate the project allows and
+settles just under it, without a hand-picked --workers.
+
+A function signals back-pressure by raising Throttled: for HTTP 429,
+502, 503 and 504 (see RETRY_STATUSES) and for timeouts and dropped
+connections. The item is then retried after Retry-After or an
+exponential backoff with jitter, up to MAX_ATTEMPTS times. Retrying is
+only safe for idempotent writes: every caller either upserts with
+merge-duplicates, sets a fixed value, or makes a conditional PATCH that
+also accepts the row already holding the new value. Any other exception
+is raised from map() unchanged.
+
+report() prints what was achieved: requests, retries, elapsed time,
+requests and rows per second, and the peak and final limit.
+"""
+
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+RETRY_STATUSES = {429, 502, 503, 504}
+
+MAX_CONCURRENCY = 32
+START_CONCURRENCY = 2
+TARGET_LATENCY = 2.0
+DECREASE = 0.5
+# Weight of the newest write in the smoothed latency.
+LATENCY_SMOOTHING = 0.2
+
+MAX_ATTEMPTS = 6
+BASE_DELAY = 0.5
+MAX_DELAY = 30.0
+
+
+class Throttled(RuntimeError):
+    """The server pushed back; the write may be retried later."""
+
+    def __init__(self, message: str, retry_after: float | None = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def retry_after(value) -> float | None:
+    """Seconds from a Retry-After header; HTTP dates are ignored."""
+    try:
+        return max(float(value), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+class WriteScheduler:
+    def __init__(
+        self,
+        max_concurrency: int = MAX_CONCURRENCY,
+        start: int = START_CONCURRENCY,
+        target_latency: float = TARGET_LATENCY,
+        max_attempts: int = MAX_ATTEMPTS,
+    ):
+        self.max_concurrency = max(max_concurrency, 1)
+        self.limit = float(min(max(start, 1), self.max_concurrency))
+        self.target_latency = target_latency
+        self.max_attempts = max_attempts
+
+        self.condition = threading.Condition()
+        self.in_flight = 0
+        self.last_decrease = 0.0
+        self.latency = 0.0
+
+        self.requests = 0
+        self.retries = 0
+        self.throttled = 0
+        self.rows = 0
+        self.peak = int(self.limit)
+        self.busy = 0.0
+
+    def acquire(self) -> None:
+        with self.condition:
+            while self.in_flight >= int(self.limit):
+                self.condition.wait()
+            self.in_flight += 1
+
+    def release(self, healthy: bool, latency: float) -> None:
+        with self.condition:
+            saturated = self.in_flight >= int(self.limit)
+            self.in_flight -= 1
+            self.requests += 1
+            self.latency += LATENCY_SMOOTHING * (latency - self.latency)
+
+            if healthy and latency <= self.target_latency:
+                # Only grow a limit that is actually being reached.
+                if saturated:
+                    self.limit = min(
+                        self.limit + 1 / self.limit, self.max_concurrency
+                    )
+                    self.peak = max(self.peak, int(self.limit))
+            else:
+                now = time.monotonic()
+                if now - self.last_decrease >= self.latency:
+                    self.limit = max(self.limit * DECREASE, 1.0)
+                    self.last_decrease = now
+
+            self.condition.notify_all()
+
+    def backoff(self, attempt: int, error: Throttled) -> float:
+        if error.retry_after is not None:
+            return min(error.retry_after, MAX_DELAY)
+        delay = min(BASE_DELAY * 2 ** (attempt - 1), MAX_DELAY)
+        return random.uniform(delay / 2, delay)
+
+    def call(self, function, item):
+        for attempt in range(1, self.max_attempts + 1):
+            self.acquire()
+            started = time.monotonic()
+
+            try:
+                result = function(item)
+            except Throttled as error:
+                self.release(False, time.monotonic() - started)
+                with self.condition:
+                    self.throttled += 1
+
+                if attempt == self.max_attempts:
+                    raise
+
+                with self.condition:
+                    self.retries += 1
+                time.sleep(self.backoff(attempt, error))
+                continue
+            except BaseException:
+                self.release(False, time.monotonic() - started)
+                raise
+
+            self.release(True, time.monotonic() - started)
+            return result
+
+    def map(self, function, items, weight=None) -> list:
+        """function(item) for every item, in order. weight(item) gives
+        the number of rows an item writes, for the report."""
+        items = list(items)
+
+        if not items:
+            return []
+
+        started = time.monotonic()
+
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as pool:
+            futures = [
+                pool.submit(self.call, function, item) for item in items
+            ]
+            try:
+                results = [future.result() for future in futures]
+            except BaseException:
+                for future in futures:
+                    future.cancel()
+                raise
+            finally:
+                self.busy += time.monotonic() - started
+
+        if weight is None:
+            self.rows += len(items)
+        else:
+            self.rows += sum(weight(item) for item in items)
+
+        return results
+
+    def report(self, label: str = "WRITES") -> None:
+        rate = self.requests / self.busy if self.busy else 0.0
+        row_rate = self.rows / self.busy if self.busy else 0.0
+        print(
+            f"{label}: {self.requests} requests ({self.retries} retried, "
+            f"{self.throttled} throttled), {self.rows} rows in "
+            f"{self.busy:.2f}s = {rate:.1f} req/s, {row_rate:.1f} rows/s; "
+            f"concurrency peak {self.peak}, final {int(self.limit)}"
+        )
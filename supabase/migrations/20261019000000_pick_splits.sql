@@ -0,0 +1,209 @@
+-- supabase/migrations/20261019000000_pick_splits.sql
+--
+-- Per-game pick splits, kept current by a trigger on picks.
+--
+-- Every insert, update or delete on picks applies a -1 to the counters
+-- of the old pick and a +1 to those of the new one, so readers get the
+-- home / away and over / under split of a game from one row instead of
+-- scanning its picks. scripts/check_pick_splits.py reports the drift
+-- pick_split_drift() finds; with --fix it calls recount_pick_splits(),
+-- which repairs it inside the database.
+
+CREATE TABLE IF NOT EXISTS "public"."pick_splits" (
+    "game_id" "uuid" NOT NULL,
+    "home_picks" integer DEFAULT 0 NOT NULL,
+    "away_picks" integer DEFAULT 0 NOT NULL,
+    "over_picks" integer DEFAULT 0 NOT NULL,
+    "under_picks" integer DEFAULT 0 NOT NULL,
+    "updated_at" timestamp with time zone DEFAULT "now"() NOT NULL,
+    CONSTRAINT "pick_splits_pkey" PRIMARY KEY ("game_id"),
+    CONSTRAINT "pick_splits_game_id_fkey" FOREIGN KEY ("game_id") REFERENCES "public"."games"("id") ON DELETE CASCADE,
+    CONSTRAINT "pick_splits_nonnegative" CHECK ((("home_picks" >= 0) AND ("away_picks" >= 0) AND ("over_picks" >= 0) AND ("under_picks" >= 0)))
+);
+
+ALTER TABLE "public"."pick_splits" OWNER TO "postgres";
+
+CREATE OR REPLACE FUNCTION "public"."apply_pick_split_delta"("p_game_id" "uuid", "p_spread_pick" "text", "p_total_pick" "text", "p_delta" integer) RETURNS "void"
+    LANGUAGE "plpgsql" SECURITY DEFINER
+    SET "search_path" TO ''
+    AS $$
+begin
+  if p_game_id is null then
+    return;
+  end if;
+
+  update public.pick_splits set
+    home_picks = home_picks
+      + case when p_spread_pick = 'home' then p_delta else 0 end,
+    away_picks = away_picks
+      + case when p_spread_pick = 'away' then p_delta else 0 end,
+    over_picks = over_picks
+      + case when p_total_pick = 'over' then p_delta else 0 end,
+    under_picks = under_picks
+      + case when p_total_pick = 'under' then p_delta else 0 end,
+    updated_at = now()
+  where game_id = p_game_id;
+
+  -- Only a game's first pick creates its row. An insert of a -1 row
+  -- would fail the nonnegative check before ON CONFLICT is considered.
+  if found or p_delta < 0 then
+    return;
+  end if;
+
+  insert into public.pick_splits as splits (
+    game_id, home_picks, away_picks, over_picks, under_picks
+  )
+  values (
+    p_game_id,
+    case when p_spread_pick = 'home' then p_delta else 0 end,
+    case when p_spread_pick = 'away' then p_delta else 0 end,
+    case when p_total_pick = 'over' then p_delta else 0 end,
+    case when p_total_pick = 'under' then p_delta else 0 end
+  )
+  on conflict (game_id) do update set
+    home_picks = splits.home_picks + excluded.home_picks,
+    away_picks = splits.away_picks + excluded.away_picks,
+    over_picks = splits.over_picks + excluded.over_picks,
+    under_picks = splits.under_picks + excluded.under_picks,
+    updated_at = now();
+end;
+$$;
+
+ALTER FUNCTION "public"."apply_pick_split_delta"("uuid", "text", "text", integer) OWNER TO "postgres";
+
+REVOKE ALL ON FUNCTION "public"."apply_pick_split_delta"("uuid", "text", "text", integer) FROM PUBLIC, "anon", "authenticated";
+
+CREATE OR REPLACE FUNCTION "public"."track_pick_splits"() RETURNS "trigger"
+    LANGUAGE "plpgsql" SECURITY DEFINER
+    SET "search_path" TO ''
+    AS $$
+begin
+  if tg_op = 'UPDATE'
+     and new.game_id is not distinct from old.game_id
+     and new.spread_pick is not distinct from old.spread_pick
+     and new.total_pick is not distinct from old.total_pick
+  then
+    -- Grading and visibility changes leave the split alone.
+    return null;
+  end if;
+
+  if tg_op in ('UPDATE', 'DELETE') then
+    perform public.apply_pick_split_delta(
+      old.game_id, old.spread_pick, old.total_pick, -1
+    );
+  end if;
+
+  if tg_op in ('INSERT', 'UPDATE') then
+    perform public.apply_pick_split_delta(
+      new.game_id, new.spread_pick, new.total_pick, 1
+    );
+  end if;
+
+  return null;
+end;
+$$;
+
+ALTER FUNCTION "public"."track_pick_splits"() OWNER TO "postgres";
+
+REVOKE ALL ON FUNCTION "public"."track_pick_splits"() FROM PUBLIC;
+
+CREATE OR REPLACE TRIGGER "picks_track_splits" AFTER INSERT OR DELETE OR UPDATE ON "public"."picks" FOR EACH ROW EXECUTE FUNCTION "public"."track_pick_splits"();
+
+-- Recount every game's split from picks and return the recounted split
+-- of each game whose stored row differs, or is missing while the game
+-- has picks. One statement, so the recount and the stored rows are read
+-- from the same snapshot and a pick written meanwhile is never reported
+-- as drift. Writes nothing.
+CREATE OR REPLACE FUNCTION "public"."pick_split_drift"() RETURNS TABLE("game_id" "uuid", "home_picks" integer, "away_picks" integer, "over_picks" integer, "under_picks" integer)
+    LANGUAGE "sql" STABLE SECURITY DEFINER
+    SET "search_path" TO ''
+    AS $$
+  with counted as (
+    select
+      game_id,
+      (count(*) filter (where spread_pick = 'home'))::integer as home_picks,
+      (count(*) filter (where spread_pick = 'away'))::integer as away_picks,
+      (count(*) filter (where total_pick = 'over'))::integer as over_picks,
+      (count(*) filter (where total_pick = 'under'))::integer as under_picks
+    from public.picks
+    where game_id is not null
+    group by game_id
+  ), expected as (
+    select
+      coalesce(counted.game_id, splits.game_id) as game_id,
+      coalesce(counted.home_picks, 0) as home_picks,
+      coalesce(counted.away_picks, 0) as away_picks,
+      coalesce(counted.over_picks, 0) as over_picks,
+      coalesce(counted.under_picks, 0) as under_picks,
+      splits.game_id is not null as stored,
+      splits.home_picks as stored_home_picks,
+      splits.away_picks as stored_away_picks,
+      splits.over_picks as stored_over_picks,
+      splits.under_picks as stored_under_picks
+    from counted
+    full join public.pick_splits as splits
+      on splits.game_id = counted.game_id
+  )
+  select game_id, home_picks, away_picks, over_picks, under_picks
+  from expected
+  where case
+    when stored then (
+      stored_home_picks, stored_away_picks,
+      stored_over_picks, stored_under_picks
+    ) is distinct from (home_picks, away_picks, over_picks, under_picks)
+    else home_picks + away_picks + over_picks + under_picks > 0
+  end
+  order by game_id;
+$$;
+
+ALTER FUNCTION "public"."pick_split_drift"() OWNER TO "postgres";
+
+REVOKE ALL ON FUNCTION "public"."pick_split_drift"() FROM PUBLIC, "anon", "authenticated";
+
+-- Overwrite the rows pick_split_drift() reports; games without picks are
+-- reset to zero. Writes to picks wait while it runs, so no trigger delta
+-- lands between the count and the overwrite. Returns the number of rows
+-- fixed.
+CREATE OR REPLACE FUNCTION "public"."recount_pick_splits"() RETURNS integer
+    LANGUAGE "plpgsql" SECURITY DEFINER
+    SET "search_path" TO ''
+    AS $$
+declare
+  fixed_rows integer;
+begin
+  lock table public.picks in share mode;
+
+  with fixed as (
+    insert into public.pick_splits as splits (
+      game_id, home_picks, away_picks, over_picks, under_picks
+    )
+    select game_id, home_picks, away_picks, over_picks, under_picks
+    from public.pick_split_drift()
+    on conflict (game_id) do update set
+      home_picks = excluded.home_picks,
+      away_picks = excluded.away_picks,
+      over_picks = excluded.over_picks,
+      under_picks = excluded.under_picks,
+      updated_at = now()
+    returning 1
+  )
+  select count(*) into fixed_rows from fixed;
+
+  return fixed_rows;
+end;
+$$;
+
+ALTER FUNCTION "public"."recount_pick_splits"() OWNER TO "postgres";
+
+REVOKE ALL ON FUNCTION "public"."recount_pick_splits"() FROM PUBLIC, "anon", "authenticated";
+
+-- Seed from the picks already stored.
+SELECT "public"."recount_pick_splits"();
+
+ALTER TABLE "public"."pick_splits" ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "pick_splits_read" ON "public"."pick_splits" FOR SELECT TO "authenticated", "anon" USING (true);
+
+GRANT SELECT ON TABLE "public"."pick_splits" TO "anon";
+GRANT SELECT ON TABLE "public"."pick_splits" TO "authenticated";
+GRANT ALL ON TABLE "public"."pick_splits" TO "service_role";
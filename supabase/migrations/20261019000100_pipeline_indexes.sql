@@ -0,0 +1,36 @@
+-- supabase/migrations/20261019000100_pipeline_indexes.sql
+--
+-- Indexes matched to the queries the pipeline and the site actually run.
+--
+-- games(season, week)        load_games() in sync_scores_to_supabase.py
+--                            and the season filter on the leaderboard
+--                            and insights pages; covers id and game_id
+--                            so the week's games come from the index
+-- games / scores(updated_at)  the replica cache delta reads
+--                            (updated_at=gte.X, order=updated_at,id)
+-- picks(updated_at, ...)     backup_incremental.py, which orders by
+--                            updated_at nulls first, created_at, id
+-- picks(game_id) covering    the leaderboard and insights reads of a
+--                            season's picks (user_id, game_id and the
+--                            results); replaces picks_game_id_idx
+-- picks(game_id) ungraded    picks still missing a result, the only ones
+--                            live grading and score syncs touch
+--
+-- The on_conflict=game_id upserts of games and scores are already served
+-- by games_game_id_key and scores_game_id_key, and a user's picks by
+-- picks_user_game_unique. scripts/explain_queries.py records the plans
+-- and timings of these queries before and after this migration.
+
+CREATE INDEX IF NOT EXISTS "games_season_week_idx" ON "public"."games" USING "btree" ("season", "week") INCLUDE ("id", "game_id");
+
+CREATE INDEX IF NOT EXISTS "games_updated_at_idx" ON "public"."games" USING "btree" ("updated_at", "id");
+
+CREATE INDEX IF NOT EXISTS "scores_updated_at_idx" ON "public"."scores" USING "btree" ("updated_at", "id");
+
+CREATE INDEX IF NOT EXISTS "picks_updated_at_idx" ON "public"."picks" USING "btree" ("updated_at" NULLS FIRST, "created_at", "id");
+
+CREATE INDEX IF NOT EXISTS "picks_game_id_covering_idx" ON "public"."picks" USING "btree" ("game_id") INCLUDE ("user_id", "spread_result", "total_result");
+
+DROP INDEX IF EXISTS "public"."picks_game_id_idx";
+
+CREATE INDEX IF NOT EXISTS "picks_ungraded_game_id_idx" ON "public"."picks" USING "btree" ("game_id") WHERE (("spread_result" IS NULL) OR ("total_result" IS NULL));
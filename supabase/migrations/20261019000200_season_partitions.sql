@@ -0,0 +1,435 @@
+-- supabase/migrations/20261019000200_season_partitions.sql
+--
+-- Partition picks and scores by season.
+--
+-- Both tables get a season column, filled from games by a trigger and
+-- checked against the game on every write, and a partitioned twin
+-- (picks_partitioned, scores_partitioned) listed by season with one
+-- partition per season of games. The move happens in four steps so the
+-- site keeps working throughout:
+--
+--   1. this migration: add the columns and the twins; every write to
+--      picks or scores is mirrored into its twin from now on
+--   2. scripts/partition_seasons.py backfill: fill season on existing
+--      rows in small batches; each filled row is mirrored too. Filling
+--      season alone does not move updated_at.
+--   3. once status reports no row missing season, switch the writers
+--      to the new conflict targets, as a change of its own: picks on
+--      (user_id, game_id, season) in docs/make_picks.js and
+--      docs/apps.js, scores on (game_id, season) in
+--      sync_scores_to_supabase.py and bulk_load.py, and restores on
+--      (id, season) in backup_incremental.py and bulk_load.py
+--   4. scripts/partition_seasons.py swap: under a short lock, check the
+--      twins hold every row, rename picks / scores to *_unpartitioned
+--      and the twins into their place, and move the triggers over
+--
+-- Writers stay on the old targets until step 3: a row without its
+-- season does not match the new ones, and the insert would fail on the
+-- old unique key instead. After step 4 only the new targets exist. The
+-- swap refuses while any row lacks a season, as such rows are never
+-- mirrored.
+--
+-- A partitioned table's unique keys must contain the partition key, so
+-- the keys become (id, season), (user_id, game_id, season) and
+-- (game_id, season). Unique indexes with those columns are added to the
+-- current tables as well, so writers can switch their on_conflict
+-- targets (step 3) before the swap. comments.pick_id loses its foreign
+-- key, which cannot point at (id) alone any more.
+--
+-- New seasons get their partitions when their first game is written.
+
+ALTER TABLE "public"."picks" ADD COLUMN IF NOT EXISTS "season" integer;
+
+ALTER TABLE "public"."scores" ADD COLUMN IF NOT EXISTS "season" integer;
+
+CREATE OR REPLACE FUNCTION "public"."set_row_season"() RETURNS "trigger"
+    LANGUAGE "plpgsql"
+    SET "search_path" TO ''
+    AS $$
+declare
+  game_season integer;
+begin
+  select season into game_season from public.games where id = new.game_id;
+
+  if new.season is null then
+    new.season = game_season;
+  elsif game_season is not null and new.season <> game_season then
+    raise exception 'season % does not match game % (season %)',
+      new.season, new.game_id, game_season;
+  end if;
+
+  return new;
+end;
+$$;
+
+ALTER FUNCTION "public"."set_row_season"() OWNER TO "postgres";
+
+CREATE OR REPLACE FUNCTION "public"."set_updated_at_unless_backfill"() RETURNS "trigger"
+    LANGUAGE "plpgsql"
+    SET "search_path" TO ''
+    AS $$
+begin
+  -- Filling in season on an older row is not a change to the row.
+  if old.season is null
+     and new.season is not null
+     and (to_jsonb(new) - 'season') = (to_jsonb(old) - 'season')
+  then
+    return new;
+  end if;
+
+  new.updated_at = now();
+  return new;
+end;
+$$;
+
+ALTER FUNCTION "public"."set_updated_at_unless_backfill"() OWNER TO "postgres";
+
+CREATE OR REPLACE TRIGGER "picks_set_season" BEFORE INSERT OR UPDATE ON "public"."picks" FOR EACH ROW EXECUTE FUNCTION "public"."set_row_season"();
+
+CREATE OR REPLACE TRIGGER "scores_set_season" BEFORE INSERT OR UPDATE ON "public"."scores" FOR EACH ROW EXECUTE FUNCTION "public"."set_row_season"();
+
+CREATE OR REPLACE TRIGGER "picks_set_updated_at" BEFORE UPDATE ON "public"."picks" FOR EACH ROW EXECUTE FUNCTION "public"."set_updated_at_unless_backfill"();
+
+CREATE OR REPLACE TRIGGER "scores_set_updated_at" BEFORE UPDATE ON "public"."scores" FOR EACH ROW EXECUTE FUNCTION "public"."set_updated_at_unless_backfill"();
+
+CREATE UNIQUE INDEX IF NOT EXISTS "picks_id_season_key" ON "public"."picks" USING "btree" ("id", "season");
+
+CREATE UNIQUE INDEX IF NOT EXISTS "picks_user_game_season_key" ON "public"."picks" USING "btree" ("user_id", "game_id", "season");
+
+CREATE UNIQUE INDEX IF NOT EXISTS "scores_id_season_key" ON "public"."scores" USING "btree" ("id", "season");
+
+CREATE UNIQUE INDEX IF NOT EXISTS "scores_game_id_season_key" ON "public"."scores" USING "btree" ("game_id", "season");
+
+-- The partitioned twins.
+
+CREATE TABLE IF NOT EXISTS "public"."picks_partitioned" (
+    LIKE "public"."picks" INCLUDING DEFAULTS INCLUDING CONSTRAINTS
+) PARTITION BY LIST ("season");
+
+ALTER TABLE "public"."picks_partitioned" OWNER TO "postgres";
+
+ALTER TABLE "public"."picks_partitioned" ALTER COLUMN "season" SET NOT NULL;
+
+ALTER TABLE "public"."picks_partitioned"
+    ADD CONSTRAINT "picks_season_pkey" PRIMARY KEY ("id", "season");
+
+ALTER TABLE "public"."picks_partitioned"
+    ADD CONSTRAINT "picks_season_user_game_key" UNIQUE ("user_id", "game_id", "season");
+
+ALTER TABLE "public"."picks_partitioned"
+    ADD CONSTRAINT "picks_season_game_id_fkey" FOREIGN KEY ("game_id") REFERENCES "public"."games"("id");
+
+ALTER TABLE "public"."picks_partitioned"
+    ADD CONSTRAINT "picks_season_updated_by_fkey" FOREIGN KEY ("updated_by") REFERENCES "public"."profiles"("id");
+
+ALTER TABLE "public"."picks_partitioned"
+    ADD CONSTRAINT "picks_season_user_id_fkey" FOREIGN KEY ("user_id") REFERENCES "public"."profiles"("id");
+
+CREATE INDEX IF NOT EXISTS "picks_season_game_id_idx" ON "public"."picks_partitioned" USING "btree" ("game_id") INCLUDE ("user_id", "spread_result", "total_result");
+
+CREATE INDEX IF NOT EXISTS "picks_season_ungraded_game_id_idx" ON "public"."picks_partitioned" USING "btree" ("game_id") WHERE (("spread_result" IS NULL) OR ("total_result" IS NULL));
+
+CREATE INDEX IF NOT EXISTS "picks_season_updated_at_idx" ON "public"."picks_partitioned" USING "btree" ("updated_at" NULLS FIRST, "created_at", "id");
+
+CREATE INDEX IF NOT EXISTS "picks_season_updated_by_idx" ON "public"."picks_partitioned" USING "btree" ("updated_by");
+
+CREATE TABLE IF NOT EXISTS "public"."scores_partitioned" (
+    LIKE "public"."scores" INCLUDING DEFAULTS INCLUDING CONSTRAINTS
+) PARTITION BY LIST ("season");
+
+ALTER TABLE "public"."scores_partitioned" OWNER TO "postgres";
+
+ALTER TABLE "public"."scores_partitioned" ALTER COLUMN "season" SET NOT NULL;
+
+ALTER TABLE "public"."scores_partitioned"
+    ADD CONSTRAINT "scores_season_pkey" PRIMARY KEY ("id", "season");
+
+ALTER TABLE "public"."scores_partitioned"
+    ADD CONSTRAINT "scores_season_game_id_key" UNIQUE ("game_id", "season");
+
+ALTER TABLE "public"."scores_partitioned"
+    ADD CONSTRAINT "scores_season_game_id_fkey" FOREIGN KEY ("game_id") REFERENCES "public"."games"("id");
+
+ALTER TABLE "public"."scores_partitioned"
+    ADD CONSTRAINT "scores_season_updated_by_fkey" FOREIGN KEY ("updated_by") REFERENCES "public"."profiles"("id");
+
+CREATE INDEX IF NOT EXISTS "scores_season_updated_at_idx" ON "public"."scores_partitioned" USING "btree" ("updated_at", "id");
+
+CREATE INDEX IF NOT EXISTS "scores_season_updated_by_idx" ON "public"."scores_partitioned" USING "btree" ("updated_by");
+
+-- The same access rules as picks and scores; they only take effect once
+-- the twins are swapped in.
+
+ALTER TABLE "public"."picks_partitioned" ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "picks_delete" ON "public"."picks_partitioned" FOR DELETE TO "authenticated" USING (((EXISTS ( SELECT 1
+   FROM "public"."profiles"
+  WHERE (("profiles"."id" = ( SELECT "auth"."uid"() AS "uid")) AND ("profiles"."status" = 'active'::"text")))) AND (( SELECT "public"."is_master"() AS "is_master") OR (("user_id" = ( SELECT "auth"."uid"() AS "uid")) AND (EXISTS ( SELECT 1
+   FROM "public"."games"
+  WHERE (("games"."id" = "picks_partitioned"."game_id") AND ("now"() < "games"."kickoff_utc"))))))));
+
+CREATE POLICY "picks_insert" ON "public"."picks_partitioned" FOR INSERT TO "authenticated" WITH CHECK (((EXISTS ( SELECT 1
+   FROM "public"."profiles"
+  WHERE (("profiles"."id" = ( SELECT "auth"."uid"() AS "uid")) AND ("profiles"."status" = 'active'::"text")))) AND (( SELECT "public"."is_master"() AS "is_master") OR (("user_id" = ( SELECT "auth"."uid"() AS "uid")) AND (EXISTS ( SELECT 1
+   FROM "public"."games"
+  WHERE (("games"."id" = "picks_partitioned"."game_id") AND ("now"() < "games"."kickoff_utc"))))))));
+
+CREATE POLICY "picks_read" ON "public"."picks_partitioned" FOR SELECT TO "authenticated", "anon" USING (true);
+
+CREATE POLICY "picks_update" ON "public"."picks_partitioned" FOR UPDATE TO "authenticated" USING (((EXISTS ( SELECT 1
+   FROM "public"."profiles"
+  WHERE (("profiles"."id" = ( SELECT "auth"."uid"() AS "uid")) AND ("profiles"."status" = 'active'::"text")))) AND (( SELECT "public"."is_master"() AS "is_master") OR (("user_id" = ( SELECT "auth"."uid"() AS "uid")) AND (EXISTS ( SELECT 1
+   FROM "public"."games"
+  WHERE (("games"."id" = "picks_partitioned"."game_id") AND ("now"() < "games"."kickoff_utc")))))))) WITH CHECK (((EXISTS ( SELECT 1
+   FROM "public"."profiles"
+  WHERE (("profiles"."id" = ( SELECT "auth"."uid"() AS "uid")) AND ("profiles"."status" = 'active'::"text")))) AND (( SELECT "public"."is_master"() AS "is_master") OR (("user_id" = ( SELECT "auth"."uid"() AS "uid")) AND (EXISTS ( SELECT 1
+   FROM "public"."games"
+  WHERE (("games"."id" = "picks_partitioned"."game_id") AND ("now"() < "games"."kickoff_utc"))))))));
+
+ALTER TABLE "public"."scores_partitioned" ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "scores_master_delete" ON "public"."scores_partitioned" FOR DELETE TO "authenticated" USING ("public"."is_master"());
+
+CREATE POLICY "scores_master_insert" ON "public"."scores_partitioned" FOR INSERT TO "authenticated" WITH CHECK ("public"."is_master"());
+
+CREATE POLICY "scores_master_update" ON "public"."scores_partitioned" FOR UPDATE TO "authenticated" USING ("public"."is_master"()) WITH CHECK ("public"."is_master"());
+
+CREATE POLICY "scores_read" ON "public"."scores_partitioned" FOR SELECT TO "authenticated", "anon" USING (true);
+
+GRANT ALL ON TABLE "public"."picks_partitioned" TO "anon";
+GRANT ALL ON TABLE "public"."picks_partitioned" TO "authenticated";
+GRANT ALL ON TABLE "public"."picks_partitioned" TO "service_role";
+
+GRANT SELECT,REFERENCES,TRIGGER,TRUNCATE,MAINTAIN ON TABLE "public"."scores_partitioned" TO "anon";
+GRANT SELECT,REFERENCES,TRIGGER,TRUNCATE,MAINTAIN ON TABLE "public"."scores_partitioned" TO "authenticated";
+GRANT SELECT,REFERENCES,TRIGGER,TRUNCATE,MAINTAIN ON TABLE "public"."scores_partitioned" TO "service_role";
+
+-- One partition per season, named picks_<season> and scores_<season>.
+-- Partitions are only reached through their parent: row level security
+-- without policies and no grants keep PostgREST clients off them.
+
+CREATE OR REPLACE FUNCTION "public"."ensure_season_partitions"("p_season" integer) RETURNS "void"
+    LANGUAGE "plpgsql" SECURITY DEFINER
+    SET "search_path" TO ''
+    AS $$
+declare
+  table_name text;
+  parent text;
+  partition_name text;
+begin
+  if p_season is null then
+    return;
+  end if;
+
+  foreach table_name in array array['picks', 'scores'] loop
+    -- The twin until the swap, the table itself afterwards.
+    select relname into parent
+    from pg_catalog.pg_class
+    where relnamespace = 'public'::regnamespace
+      and relkind = 'p'
+      and relname in (table_name, table_name || '_partitioned');
+
+    partition_name = table_name || '_' || p_season;
+
+    if parent is null
+       or to_regclass(format('public.%I', partition_name)) is not null
+    then
+      continue;
+    end if;
+
+    execute format(
+      'create table public.%I partition of public.%I for values in (%s)',
+      partition_name, parent, p_season
+    );
+    execute format(
+      'alter table public.%I enable row level security', partition_name
+    );
+    execute format(
+      'revoke all on table public.%I from anon, authenticated',
+      partition_name
+    );
+  end loop;
+end;
+$$;
+
+ALTER FUNCTION "public"."ensure_season_partitions"(integer) OWNER TO "postgres";
+
+CREATE OR REPLACE FUNCTION "public"."ensure_game_season_partitions"() RETURNS "trigger"
+    LANGUAGE "plpgsql" SECURITY DEFINER
+    SET "search_path" TO ''
+    AS $$
+declare
+  game_season integer;
+begin
+  for game_season in select distinct season from new_games loop
+    perform public.ensure_season_partitions(game_season);
+  end loop;
+
+  return null;
+end;
+$$;
+
+ALTER FUNCTION "public"."ensure_game_season_partitions"() OWNER TO "postgres";
+
+CREATE OR REPLACE TRIGGER "games_insert_season_partitions" AFTER INSERT ON "public"."games" REFERENCING NEW TABLE AS "new_games" FOR EACH STATEMENT EXECUTE FUNCTION "public"."ensure_game_season_partitions"();
+
+CREATE OR REPLACE TRIGGER "games_update_season_partitions" AFTER UPDATE ON "public"."games" REFERENCING NEW TABLE AS "new_games" FOR EACH STATEMENT EXECUTE FUNCTION "public"."ensure_game_season_partitions"();
+
+SELECT "public"."ensure_season_partitions"("season")
+FROM (SELECT DISTINCT "season" FROM "public"."games") AS "seasons";
+
+-- Mirror every write to picks and scores into the twin. Rows without a
+-- season (no game yet, or not backfilled) are left for the backfill.
+-- The triggers run once per statement over its transition tables, so a
+-- bulk load or a backfill batch costs one set-based write to the twin
+-- rather than a dynamic statement per row.
+
+CREATE OR REPLACE FUNCTION "public"."mirror_season_rows"() RETURNS "trigger"
+    LANGUAGE "plpgsql" SECURITY DEFINER
+    SET "search_path" TO ''
+    AS $$
+declare
+  target text = tg_table_name || '_partitioned';
+  column_list text;
+  assignments text;
+begin
+  if tg_op = 'DELETE' then
+    execute format(
+      'delete from public.%I as twin using old_rows '
+      'where twin.id = old_rows.id',
+      target
+    );
+    return null;
+  end if;
+
+  if tg_op = 'UPDATE' then
+    execute format(
+      'delete from public.%I as twin '
+      'using old_rows join new_rows on new_rows.id = old_rows.id '
+      'where twin.id = old_rows.id '
+      'and new_rows.season is distinct from old_rows.season',
+      target
+    );
+  end if;
+
+  select
+    string_agg(format('%I', attname), ', ' order by attnum),
+    string_agg(format('%I = excluded.%I', attname, attname), ', '
+      order by attnum) filter (where attname not in ('id', 'season'))
+  into column_list, assignments
+  from pg_catalog.pg_attribute
+  where attrelid = format('public.%I', target)::regclass
+    and attnum > 0
+    and not attisdropped;
+
+  execute format(
+    'insert into public.%I (%s) select %s from new_rows '
+    'where season is not null '
+    'on conflict (id, season) do update set %s',
+    target, column_list, column_list, assignments
+  );
+
+  return null;
+end;
+$$;
+
+ALTER FUNCTION "public"."mirror_season_rows"() OWNER TO "postgres";
+
+CREATE OR REPLACE TRIGGER "picks_mirror_season_insert" AFTER INSERT ON "public"."picks" REFERENCING NEW TABLE AS "new_rows" FOR EACH STATEMENT EXECUTE FUNCTION "public"."mirror_season_rows"();
+
+CREATE OR REPLACE TRIGGER "picks_mirror_season_update" AFTER UPDATE ON "public"."picks" REFERENCING OLD TABLE AS "old_rows" NEW TABLE AS "new_rows" FOR EACH STATEMENT EXECUTE FUNCTION "public"."mirror_season_rows"();
+
+CREATE OR REPLACE TRIGGER "picks_mirror_season_delete" AFTER DELETE ON "public"."picks" REFERENCING OLD TABLE AS "old_rows" FOR EACH STATEMENT EXECUTE FUNCTION "public"."mirror_season_rows"();
+
+CREATE OR REPLACE TRIGGER "scores_mirror_season_insert" AFTER INSERT ON "public"."scores" REFERENCING NEW TABLE AS "new_rows" FOR EACH STATEMENT EXECUTE FUNCTION "public"."mirror_season_rows"();
+
+CREATE OR REPLACE TRIGGER "scores_mirror_season_update" AFTER UPDATE ON "public"."scores" REFERENCING OLD TABLE AS "old_rows" NEW TABLE AS "new_rows" FOR EACH STATEMENT EXECUTE FUNCTION "public"."mirror_season_rows"();
+
+CREATE OR REPLACE TRIGGER "scores_mirror_season_delete" AFTER DELETE ON "public"."scores" REFERENCING OLD TABLE AS "old_rows" FOR EACH STATEMENT EXECUTE FUNCTION "public"."mirror_season_rows"();
+
+-- Step 4, run by scripts/partition_seasons.py swap.
+
+CREATE OR REPLACE FUNCTION "public"."swap_season_partitions"() RETURNS "void"
+    LANGUAGE "plpgsql"
+    SET "search_path" TO ''
+    AS $$
+declare
+  table_name text;
+  source_rows bigint;
+  copied_rows bigint;
+begin
+  if (select relkind from pg_catalog.pg_class
+      where oid = 'public.picks'::regclass) = 'p' then
+    raise notice 'picks and scores are already partitioned';
+    return;
+  end if;
+
+  lock table public.picks, public.scores,
+    public.picks_partitioned, public.scores_partitioned
+    in access exclusive mode;
+
+  foreach table_name in array array['picks', 'scores'] loop
+    execute format('select count(*) from public.%I', table_name)
+      into source_rows;
+    execute format('select count(*) from public.%I', table_name || '_partitioned')
+      into copied_rows;
+
+    if source_rows <> copied_rows then
+      raise exception '% has % rows, %_partitioned %; run the backfill '
+        '(rows without a game are never copied)',
+        table_name, source_rows, table_name, copied_rows;
+    end if;
+
+    execute format('drop trigger %I on public.%I',
+      table_name || '_mirror_season_insert', table_name);
+    execute format('drop trigger %I on public.%I',
+      table_name || '_mirror_season_update', table_name);
+    execute format('drop trigger %I on public.%I',
+      table_name || '_mirror_season_delete', table_name);
+    execute format('alter table public.%I rename to %I',
+      table_name, table_name || '_unpartitioned');
+    execute format('alter table public.%I rename to %I',
+      table_name || '_partitioned', table_name);
+  end loop;
+
+  alter table public.comments drop constraint if exists comments_pick_id_fkey;
+
+  create trigger "picks_set_season" before insert or update on public.picks
+    for each row execute function public.set_row_season();
+  create trigger "picks_set_updated_at" before update on public.picks
+    for each row execute function public.set_updated_at();
+  create trigger "picks_set_updated_by" before insert or update on public.picks
+    for each row execute function public.set_updated_by();
+  create trigger "picks_track_splits" after insert or delete or update on public.picks
+    for each row execute function public.track_pick_splits();
+
+  create trigger "scores_set_season" before insert or update on public.scores
+    for each row execute function public.set_row_season();
+  create trigger "scores_set_updated_at" before update on public.scores
+    for each row execute function public.set_updated_at();
+  create trigger "scores_set_updated_by" before insert or update on public.scores
+    for each row execute function public.set_updated_by();
+
+  -- The old tables stay as *_unpartitioned until a later migration drops
+  -- them; nothing writes to them any more.
+  drop trigger "picks_track_splits" on public.picks_unpartitioned;
+  revoke all on table public.picks_unpartitioned, public.scores_unpartitioned
+    from anon, authenticated;
+
+  notify pgrst, 'reload schema';
+end;
+$$;
+
+ALTER FUNCTION "public"."swap_season_partitions"() OWNER TO "postgres";
+
+REVOKE ALL ON FUNCTION "public"."ensure_season_partitions"(integer) FROM PUBLIC, "anon", "authenticated";
+
+REVOKE ALL ON FUNCTION "public"."swap_season_partitions"() FROM PUBLIC, "anon", "authenticated";
+
+REVOKE ALL ON FUNCTION "public"."set_row_season"() FROM PUBLIC;
+
+REVOKE ALL ON FUNCTION "public"."set_updated_at_unless_backfill"() FROM PUBLIC;
+
+REVOKE ALL ON FUNCTION "public"."ensure_game_season_partitions"() FROM PUBLIC;
+
+REVOKE ALL ON FUNCTION "public"."mirror_season_rows"() FROM PUBLIC;
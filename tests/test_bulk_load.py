@@ -0,0 +1,236 @@
+import csv
+import os
+import shutil
+from urllib.parse import urlparse
+
+import pytest
+
+import bulk_load
+from explain_queries import DB_URL, LOCAL_HOSTS
+from postgres import psql
+
+
+# Runs against the local database explain_queries.py uses, migrated to
+# the latest schema (supabase db reset). Every row written is in SEASON,
+# which is removed before and after each test.
+DB_URL = os.environ.get("LOCAL_DB_URL", DB_URL)
+
+SEASON = 2099
+
+GAMES = [
+    ("Detroit Lions", "New Orleans Saints", "-3.5", "47.5"),
+    ("Chicago Bears", "Green Bay Packers", "-6.0", "41.0"),
+    ("Dallas Cowboys", "New York Giants", "2.5", "44.0"),
+]
+
+ODDS_HEADERS = [
+    "season",
+    "week",
+    "game_id",
+    "commence_time_utc",
+    "home_team",
+    "away_team",
+    "book",
+    "spread_home",
+    "total",
+    "is_consensus",
+]
+
+CLEANUP_SQL = f"""
+DELETE FROM public.scores
+WHERE game_id IN (SELECT id FROM public.games WHERE season = {SEASON});
+DELETE FROM public.games WHERE season = {SEASON};
+DROP TABLE IF EXISTS public.picks_{SEASON}, public.scores_{SEASON};
+"""
+
+
+def game_id(away: str, home: str) -> str:
+    return f"{SEASON}_09_13_{away}_{home}"
+
+
+def query(sql: str) -> list[str]:
+    return psql(DB_URL, sql).strip().splitlines()
+
+
+@pytest.fixture(scope="module")
+def database():
+    if shutil.which("psql") is None:
+        pytest.skip("psql is not installed")
+
+    if urlparse(DB_URL).hostname not in LOCAL_HOSTS:
+        pytest.skip("LOCAL_DB_URL is not a local database")
+
+    try:
+        migrated = query(
+            "SELECT to_regclass('public.scores_partitioned') IS NOT NULL;"
+        )
+    except SystemExit:
+        pytest.skip(f"no database at {DB_URL}")
+
+    if migrated != ["t"]:
+        pytest.skip("the local database is not migrated")
+
+    return DB_URL
+
+
+@pytest.fixture
+def db_url(database):
+    psql(database, CLEANUP_SQL)
+    yield database
+    psql(database, CLEANUP_SQL)
+
+
+def write_odds(path, games=GAMES):
+    with path.open("w", encoding="utf-8", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(ODDS_HEADERS)
+
+        for away, home, spread_home, total in games:
+            writer.writerow(
+                [
+                    SEASON,
+                    1,
+                    game_id(away, home),
+                    f"{SEASON}-09-13T17:00:00+00:00",
+                    home,
+                    away,
+                    "NA",
+                    spread_home,
+                    total,
+                    1,
+                ]
+            )
+
+    return path
+
+
+def write_scores(path, games=GAMES):
+    with path.open("w", encoding="utf-8", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(["season", "week", "game_id", "home_score", "away_score"])
+
+        for number, (away, home, _, _) in enumerate(games):
+            writer.writerow([SEASON, 1, game_id(away, home), 20 + number, 17])
+
+    return path
+
+
+def stored(table: str, *ignored: str) -> list[str]:
+    row = f"to_jsonb({table})" + "".join(f" - '{name}'" for name in ignored)
+    return query(
+        f"SELECT ({row})::text FROM public.{table} "
+        f"WHERE season = {SEASON} ORDER BY id;"
+    )
+
+
+def dump(table: str) -> str:
+    """One COPY block of table's SEASON rows, as pg_dump writes it."""
+    columns = query(
+        "SELECT string_agg(quote_ident(column_name), ', ' "
+        "ORDER BY ordinal_position) FROM information_schema.columns "
+        f"WHERE table_schema = 'public' AND table_name = '{table}';"
+    )[0]
+    data = psql(
+        DB_URL,
+        f"COPY (SELECT {columns} FROM public.{table} "
+        f"WHERE season = {SEASON} ORDER BY id) TO STDOUT;",
+    )
+
+    return f"COPY public.{table} ({columns}) FROM stdin;\n{data}\\.\n\n"
+
+
+def test_games_load_then_rerun_writes_nothing(db_url, tmp_path, capsys):
+    path = write_odds(tmp_path / f"{SEASON}_wk01_odds.csv")
+
+    bulk_load.load_games(db_url, [path])
+    assert "UPSERTED 3 games (0 unchanged)" in capsys.readouterr().out
+    loaded = stored("games")
+
+    bulk_load.load_games(db_url, [path])
+    assert "UPSERTED 0 games (3 unchanged)" in capsys.readouterr().out
+    assert stored("games") == loaded
+
+
+def test_games_last_file_wins(db_url, tmp_path, capsys):
+    first = write_odds(tmp_path / f"{SEASON}_wk01_odds.csv")
+    moved = [GAMES[0][:2] + ("-4.5", "46.5"), *GAMES[1:]]
+    second = write_odds(tmp_path / "latest.csv", moved)
+
+    bulk_load.load_games(db_url, [first])
+    bulk_load.load_games(db_url, [first, second])
+
+    assert "UPSERTED 1 games (2 unchanged)" in capsys.readouterr().out
+    assert query(
+        "SELECT spread_home || '|' || total FROM public.games "
+        f"WHERE game_id = '{game_id(*GAMES[0][:2])}';"
+    ) == ["-4.5|46.5"]
+
+
+def test_scores_load_then_rerun_writes_nothing(db_url, tmp_path, capsys):
+    bulk_load.load_games(db_url, [write_odds(tmp_path / "odds.csv")])
+    path = write_scores(tmp_path / f"{SEASON}_wk01_scores.csv")
+
+    bulk_load.load_scores(db_url, [path])
+    assert (
+        "UPSERTED 3 scores (0 unchanged) from 1 files; 3 games marked final"
+        in capsys.readouterr().out
+    )
+    assert query(
+        "SELECT count(*) FROM public.games "
+        f"WHERE season = {SEASON} AND status = 'final';"
+    ) == ["3"]
+    # Mirrored into the season's partition by the migration's triggers.
+    assert query(
+        f"SELECT count(*) FROM public.scores_partitioned "
+        f"WHERE season = {SEASON};"
+    ) == ["3"]
+    loaded = stored("scores")
+
+    bulk_load.load_scores(db_url, [path])
+    assert (
+        "UPSERTED 0 scores (3 unchanged) from 1 files; 0 games marked final"
+        in capsys.readouterr().out
+    )
+    assert stored("scores") == loaded
+
+
+def test_scores_for_a_missing_game_load_nothing(db_url, tmp_path):
+    bulk_load.load_games(db_url, [write_odds(tmp_path / "odds.csv", GAMES[:2])])
+
+    with pytest.raises(SystemExit, match="missing from public.games"):
+        bulk_load.load_scores(db_url, [write_scores(tmp_path / "scores.csv")])
+
+    assert stored("scores") == []
+
+
+def test_restore_then_rerun_writes_nothing(db_url, tmp_path, capsys):
+    bulk_load.load_games(db_url, [write_odds(tmp_path / "odds.csv")])
+    bulk_load.load_scores(db_url, [write_scores(tmp_path / "scores.csv")])
+    # A write sets updated_at whatever the dump says.
+    games = stored("games", "updated_at")
+    scores = stored("scores", "updated_at")
+
+    path = tmp_path / "data.sql"
+    path.write_text(dump("games") + dump("scores"), encoding="utf-8")
+
+    psql(
+        db_url,
+        "UPDATE public.scores SET home_score = 0 "
+        f"WHERE season = {SEASON};"
+        "DELETE FROM public.scores WHERE game_id = (SELECT id FROM "
+        f"public.games WHERE game_id = '{game_id(*GAMES[0][:2])}');"
+        f"UPDATE public.games SET total = 30 WHERE season = {SEASON};",
+    )
+    capsys.readouterr()
+
+    bulk_load.restore(db_url, path)
+    output = capsys.readouterr().out
+    assert "RESTORED 3 games (0 unchanged)" in output
+    assert "RESTORED 3 scores (0 unchanged)" in output
+    assert stored("games", "updated_at") == games
+    assert stored("scores", "updated_at") == scores
+
+    bulk_load.restore(db_url, path)
+    output = capsys.readouterr().out
+    assert "RESTORED 0 games (3 unchanged)" in output
+    assert "RESTORED 0 scores (3 unchanged)" in output
@@ -0,0 +1,68 @@
+import json
+
+import pytest
+
+from json_stream import iter_array
+
+
+PAYLOAD = json.dumps(
+    [
+        {"id": 1, "spread_home": -3.5, "total": 44.5, "team": "Jets ½"},
+        44.5,
+        -1e10,
+        0,
+        12345,
+        True,
+        False,
+        None,
+        "São Paulo \"quoted\" \\ é",
+        [1, [2.25, "x"], {}],
+        [],
+        -0.75,
+    ],
+    ensure_ascii=False,
+).encode("utf-8")
+
+
+def split_at(data: bytes, offsets) -> list[bytes]:
+    bounds = [0, *offsets, len(data)]
+    return [data[start:end] for start, end in zip(bounds, bounds[1:])]
+
+
+@pytest.mark.parametrize("offset", range(len(PAYLOAD) + 1))
+def test_iter_array_at_every_chunk_boundary(offset):
+    chunks = split_at(PAYLOAD, [offset])
+
+    assert list(iter_array(chunks)) == json.loads(PAYLOAD)
+
+
+def test_iter_array_one_byte_at_a_time():
+    chunks = [PAYLOAD[index:index + 1] for index in range(len(PAYLOAD))]
+
+    assert list(iter_array(chunks)) == json.loads(PAYLOAD)
+
+
+@pytest.mark.parametrize(
+    "body",
+    [b"[1,44.5]", b"[44.5, 7]", b"[true,null]", b"[-1e+10 ]"],
+)
+def test_iter_array_scalars_at_every_pair_of_boundaries(body):
+    expected = json.loads(body)
+
+    for first in range(len(body) + 1):
+        for second in range(first, len(body) + 1):
+            chunks = split_at(body, [first, second])
+            assert list(iter_array(chunks)) == expected, chunks
+
+
+@pytest.mark.parametrize("body", [b"", b"[]", b" [ ] "])
+def test_iter_array_empty(body):
+    assert list(iter_array([body])) == []
+
+
+@pytest.mark.parametrize(
+    "body", [b"[1,", b"[44.", b"[1 2]", b"[44.x]", b"{}"]
+)
+def test_iter_array_malformed(body):
+    with pytest.raises(ValueError):
+        list(iter_array([body]))
@@ -0,0 +1,14 @@
+import pytest
+
+from bench_parsers import golden, round_trip
+
+
+# The checks of bench_parsers.py --check: each seed draws 20 random
+# pastes per parser, and the golden CSVs pin the output bytes.
+@pytest.mark.parametrize("seed", range(10))
+def test_parse_rows_round_trip(seed, capsys):
+    assert round_trip(20, seed) == 0, capsys.readouterr().out
+
+
+def test_csv_output_matches_golden(capsys):
+    assert golden() == 0, capsys.readouterr().out